@@ -2,32 +2,27 @@ import numpy as np
 import mediapipe as mp
 import flet as ft
 import asyncio
-import base64
+import os
 import time
 from typing import Optional, Tuple
 import cv2
-from collections import deque
-from dataclasses import dataclass
 from typing import Optional, Tuple, Callable, Awaitable
-from utils.camera import open_camera
-from utils.classify import classify_body_shape
+from utils.frame_source import FrameSource, default_source
+from utils.body_measure import BodyMeasurementEngine
+from utils.blur import BlurEngine
+from utils.camera_service import Frame
+from utils.composite import SegmentationCompositor
+from utils.perf import StageTimer
+from utils.pose_tracker import PoseTracker
+from utils.pose_worker import PoseWorker
+from utils.preview import PreviewOutput
+from utils.session import get_recorder
 
 PIXEL_BASE64 = (
     "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR4n"
     "GNgYAAAAAMAASsJTYQAAAAASUVORK5CYII="
 )
 
-@dataclass
-class _Measures:
-    shoulder: float = 0.0
-    pelvis: float = 0.0
-    waist: float = 0.0
-    abdomen: float = 0.0
-    y_waist: int = 0
-    y_abdomen: int = 0
-    xw0: int = 0; xw1: int = 0
-    xa0: int = 0; xa1: int = 0
-
 class BodyShapeBackground(ft.Stack):
     """
     Flet 이미지 위젯에 실시간 카메라 프레임을 올리고,
@@ -46,6 +41,11 @@ class BodyShapeBackground(ft.Stack):
         # ▼ 추가
         stable_secs: float = 3.0,
         on_shape_stable: Optional[Callable[[str, dict], None | Awaitable[None]]] = None,
+        source: Optional[FrameSource] = None,
+        inference: Optional[str] = None,
+        roi_tracking: Optional[bool] = None,
+        blur: Optional[str] = None,
+        measure_scale: Optional[float] = None,
     ):
         super().__init__()
         self.expand = True
@@ -58,24 +58,33 @@ class BodyShapeBackground(ft.Stack):
         self.running: bool = False
         self.paused: bool = False
         self.mirror: bool = True
-        self.cap: Optional[cv2.VideoCapture] = None
+        self.source = source or default_source()
+        self._last_seq = 0
         self.last_frame = None
 
-        # smoothing
-        self._s_hist = deque(maxlen=12)
-        self._h_hist = deque(maxlen=12)
-        self._w_hist = deque(maxlen=12)
-        self._a_hist = deque(maxlen=12)
-
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
+        # "inline": UI 루프에서 pose.process() / "process": 별도 워커 프로세스 (SYLO_INFERENCE)
+        self.inference = inference or os.environ.get("SYLO_INFERENCE", "inline")
+        self._pose_kwargs = dict(
             model_complexity=1,
             min_detection_confidence=0.7,
             min_tracking_confidence=0.5,
             smooth_landmarks=True,
             enable_segmentation=self.enable_segmentation,
         )
+        # 직전 랜드마크 주변만 잘라 추론 (SYLO_POSE_ROI=1)
+        if roi_tracking is None:
+            roi_tracking = os.environ.get("SYLO_POSE_ROI", "0") not in ("0", "false", "no")
+        self.roi_tracking = bool(roi_tracking)
+        self._tracker: Optional[PoseTracker] = None
+        eager = self.inference == "inline" and not self.roi_tracking
+        self.pose = self.mp_pose.Pose(**self._pose_kwargs) if eager else None
+        self._worker: Optional[PoseWorker] = None
+        # 배경 블러 방식 "method:quality" (utils.blur, SYLO_BLUR). "gaussian:exact"가 기존 55x55 블러
+        self.blur = BlurEngine.from_spec(blur or os.environ.get("SYLO_BLUR"))
+        # 반전/마스크/합성 결과 버퍼 재사용 (프레임마다 전체 크기 배열을 새로 만들지 않음)
+        self.compositor = SegmentationCompositor(fg_threshold=0.1, body_threshold=0.3)
 
         self.video = ft.Container(
             content=ft.Image(
@@ -87,6 +96,7 @@ class BodyShapeBackground(ft.Stack):
             width=None,
             height=None,
         )
+        self.preview = PreviewOutput(self.video.content, "body-shape", fps=self.fps)
         self.fps_text = ft.Text("0 fps", size=12, opacity=0.85)
         self.controls = [
             self.video,
@@ -98,43 +108,36 @@ class BodyShapeBackground(ft.Stack):
         self.show_reason_text = show_reason_text
         self.stable_secs = float(stable_secs)
         self.on_shape_stable = on_shape_stable
-        self._shape_last: Optional[str] = None
-        self._shape_last_change_ts: float = 0.0
-        self._shape_fired_for: set[str] = set()
-
-    async def _maybe_fire_stable(self, shape: str, measures: dict):
+        # 측정/분류/스무딩/안정 판정 (UI와 무관). measure_scale: 측정용 마스크 해상도 배율 (SYLO_MEASURE_SCALE)
+        if measure_scale is None:
+            measure_scale = float(os.environ.get("SYLO_MEASURE_SCALE", 0.5))
+        self.engine = BodyMeasurementEngine(gender=self.gender, measure_scale=measure_scale,
+                                            stable_secs=self.stable_secs)
+        self.last_shape: Optional[str] = None
+        self.timer = StageTimer()
+
+    async def _maybe_fire_stable(self, shape: str, measures: dict, now: Optional[float] = None):
         """
         shape가 self.stable_secs 동안 변하지 않았으면 on_shape_stable 호출.
         on_shape_stable 이 async이면 task로 실행, sync면 즉시 호출.
         동일 shape에 대해서는 상태가 바뀌기 전까지 1회만 호출.
         """
-        if not shape or shape == "UNKNOWN" or self.on_shape_stable is None:
+        if self.on_shape_stable is None:
             return
-
-        now = time.time()
-        if self._shape_last != shape:
-            # 상태 변경: 타이머 리셋 및 fired 기록 초기화 조건
-            self._shape_last = shape
-            self._shape_last_change_ts = now
-            # 상태가 바뀌면 동일 shape 재안정을 위해 fired 기록에서 제거
-            # (그 전 shape가 아니라 방금 shape를 지울 필요는 없음 — 아래 로직은 set 체크로 처리)
+        if not self.engine.stable.update(shape, time.time() if now is None else now):
             return
-
-        # 같은 상태 유지 중
-        if (now - self._shape_last_change_ts) >= self.stable_secs:
-            if shape not in self._shape_fired_for:
-                cb = self.on_shape_stable
-                try:
-                    if asyncio.iscoroutinefunction(cb):
-                        # Flet 이벤트 루프에서 안전하게 태스크로 실행
-                        await cb(shape, measures, self.last_frame)
-                    else:
-                        cb(shape, measures)
-                except Exception as e:
-                    # 안전을 위해 콘솔에만 기록
-                    print(f"[on_shape_stable error] {e}")
-                finally:
-                    self._shape_fired_for.add(shape)  # 동일 상태 재호출 방지
+        cb = self.on_shape_stable
+        try:
+            if asyncio.iscoroutinefunction(cb):
+                # Flet 이벤트 루프에서 안전하게 태스크로 실행
+                # last_frame은 재사용 버퍼이므로 콜백에는 복사본을 넘김
+                frame = self.last_frame.copy() if self.last_frame is not None else None
+                await cb(shape, measures, frame)
+            else:
+                cb(shape, measures)
+        except Exception as e:
+            # 안전을 위해 콘솔에만 기록
+            print(f"[on_shape_stable error] {e}")
 
     # ----------------- Flet lifecycle -----------------
     def did_mount(self):
@@ -143,78 +146,21 @@ class BodyShapeBackground(ft.Stack):
 
     def will_unmount(self):
         self.running = False
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        self.source.stop(self)
+        self.preview.detach()
         try:
-            self.pose.close()
+            if self.pose:
+                self.pose.close()
         except Exception:
             pass
+        if self._worker is not None:
+            self._worker.close()
+            self._worker = None
+        if self._tracker is not None:
+            self._tracker.close()
+            self._tracker = None
 
     # ----------------- Geometry helpers -----------------
-    @staticmethod
-    def _euclidean(p1, p2, w, h) -> float:
-        x1, y1 = int(p1.x * w), int(p1.y * h)
-        x2, y2 = int(p2.x * w), int(p2.y * h)
-        return float(np.hypot(x2 - x1, y2 - y1))
-
-    @staticmethod
-    def _largest_run_width(row_binary):
-        xs = np.where(row_binary)[0]
-        if xs.size < 2:
-            return 0, 0, 0
-        splits = np.where(np.diff(xs) > 1)[0]
-        starts = np.r_[xs[0], xs[splits + 1]]
-        ends   = np.r_[xs[splits], xs[-1]]
-        lens   = ends - starts + 1
-        k = np.argmax(lens)
-        return int(lens[k]), int(starts[k]), int(ends[k])
-
-    @classmethod
-    def _width_from_mask(cls, binary_mask, y, pad=2):
-        h, w = binary_mask.shape
-        y0 = max(0, y - pad)
-        y1 = min(h - 1, y + pad)
-        if y0 >= h or y1 < 0:
-            return 0, 0, 0
-        row = binary_mask[y0:y1 + 1, :]
-        col_any = np.max(row, axis=0) > 0
-        width, x0, x1 = cls._largest_run_width(col_any)
-        return width, x0, x1
-
-    @classmethod
-    def _profile_min_max(cls, binary_mask, y_top, y_bottom, y_step=4, pad=2):
-        h, _ = binary_mask.shape
-        y_top = max(0, min(h - 1, int(y_top)))
-        y_bottom = max(0, min(h - 1, int(y_bottom)))
-        if y_top > y_bottom:
-            y_top, y_bottom = y_bottom, y_top
-        min_w = 10**9; min_pos = (0, 0, 0, y_top)
-        max_w = 0;     max_pos = (0, 0, 0, y_top)
-        for y in range(y_top, y_bottom + 1, y_step):
-            w, x0, x1 = cls._width_from_mask(binary_mask, y, pad=pad)
-            if w > 0 and w < min_w:
-                min_w, min_pos = w, (w, x0, x1, y)
-            if w > max_w:
-                max_w, max_pos = w, (w, x0, x1, y)
-        return min_pos, max_pos  # (w,x0,x1,y)
-
-    def _smooth_append(self, deq: deque, val: float) -> float:
-        if val > 0:
-            deq.append(val)
-        return float(np.mean(deq)) if len(deq) else val
-
-    def _torso_x_roi(self, w, S_px, H_px, LSH, RSH, LHP, RHP, frac):
-        """
-        가로 스캔을 몸통 중심에서 어깨폭의 frac*2 범위로 제한.
-        frac=0.45 → 총 폭이 어깨폭의 90%.
-        """
-        cx = int(((LSH.x + RSH.x + LHP.x + RHP.x) / 4.0) * w)
-        half = int(max(20, frac * max(S_px, H_px)))  # 최소 20px 확보
-        xL = max(0, cx - half)
-        xR = min(w - 1, cx + half)
-        return xL, xR
-
     @staticmethod
     def _draw_width_overlay(frame, y, x0, x1, label, color=(0, 255, 0), draw_text=False):
         if x1 > x0 and 0 <= y < frame.shape[0]:
@@ -224,12 +170,81 @@ class BodyShapeBackground(ft.Stack):
                             (x0, max(0, y - 6)), cv2.FONT_HERSHEY_SIMPLEX,
                             0.5, color, 1, cv2.LINE_AA)
 
+    async def process_frame(self, latest: Frame, results=None) -> np.ndarray:
+        """
+        프레임 한 장을 처리(포즈 추론 → 배경 블러 → 측정/분류 → 그리기)하고 표시용 이미지를 반환합니다.
+        Flet 페이지 없이도 호출할 수 있어 세션 리플레이에서 그대로 사용합니다.
+        results를 넘기면 포즈 추론을 건너뜁니다 (녹화된 랜드마크 재생).
+        """
+        frame = latest.image
+        if self.mirror:
+            frame = self.compositor.flip(frame)
+
+        h, w = frame.shape[:2]
+        output = self.compositor.next_output(frame.shape)
+
+        # ---- Pose inference ----
+        if results is None:
+            if self.roi_tracking:
+                if self._tracker is None:
+                    self._tracker = PoseTracker(self._pose_kwargs)
+                with self.timer.stage("pose"):
+                    results = self._tracker.process(frame)
+            else:
+                if self.pose is None:
+                    self.pose = self.mp_pose.Pose(**self._pose_kwargs)
+                with self.timer.stage("pose"):
+                    image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                    image_rgb.flags.writeable = False
+                    results = self.pose.process(image_rgb)
+                    image_rgb.flags.writeable = True
+            recorder = get_recorder()
+            if recorder is not None:
+                recorder.pose(latest.seq, results)
+
+        # ---- Optional: background blur with segmentation (visual) ----
+        has_mask = self.enable_segmentation and results.segmentation_mask is not None
+        if has_mask:
+            with self.timer.stage("blur"):
+                self.compositor.set_mask(results.segmentation_mask)
+                self.compositor.blur_composite(frame, self.blur, output)
+        else:
+            np.copyto(output, frame)
+
+        # ---- Landmarks + measurement (utils.body_measure) ----
+        self.timer.start("measure")
+        lm = results.pose_landmarks.landmark if results.pose_landmarks else None
+        m = self.engine.measure(lm, frame.shape, results.segmentation_mask if has_mask else None)
+        self.last_shape = m.shape if m is not None else None   # 사람이 없으면 이전 판정을 남기지 않음
+        if m is not None:
+            await self._maybe_fire_stable(m.shape, m.widths(), now=latest.ts)
+            # draw pose
+            self.mp_drawing.draw_landmarks(
+                output, results.pose_landmarks, self.mp_pose.POSE_CONNECTIONS,
+                landmark_drawing_spec=self.mp_drawing.DrawingSpec(color=(245,117,66), thickness=2, circle_radius=2),
+                connection_drawing_spec=self.mp_drawing.DrawingSpec(color=(245,66,230), thickness=2, circle_radius=2),
+            )
+            # shoulder/hip lines
+            LSH, RSH = lm[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value], lm[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
+            LHP, RHP = lm[self.mp_pose.PoseLandmark.LEFT_HIP.value], lm[self.mp_pose.PoseLandmark.RIGHT_HIP.value]
+            cv2.line(output, (int(LSH.x*w), int(LSH.y*h)), (int(RSH.x*w), int(RSH.y*h)), (255,0,0), 2)
+            cv2.line(output, (int(LHP.x*w), int(LHP.y*h)), (int(RHP.x*w), int(RHP.y*h)), (0,165,255), 2)
+
+            # width overlays
+            self._draw_width_overlay(output, m.y_waist, int(m.xw0), int(m.xw1), "Waist", (0,255,0),
+                                    draw_text=self.show_distance_label)
+            self._draw_width_overlay(output, m.y_abdomen, int(m.xa0), int(m.xa1), "Abd",   (0,200,255),
+                                    draw_text=self.show_distance_label)
+        self.timer.stop("measure")
+
+        self.last_frame = output
+        return output
+
     # ----------------- Main async camera loop -----------------
     async def _camera_loop(self):
         self.fps_text.value = "Opening camera..."
         self.fps_text.update()
-        self.cap = await open_camera()
-        if not self.cap:
+        if not await self.source.start(self, consumer="scan"):
             self.fps_text.value = "Camera open failed (check device/permission)"
             self.fps_text.color = "red"
             self.fps_text.update()
@@ -237,145 +252,53 @@ class BodyShapeBackground(ft.Stack):
             return
         else:
             self.page.update()
-
-        encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 75]  # 전송량 줄이기
+        recorder = get_recorder()
+        if recorder is not None:
+            recorder.mount(
+                "BodyShapeBackground",
+                gender=self.gender,
+                enable_segmentation=self.enable_segmentation,
+                mirror=self.mirror,
+                stable_secs=self.stable_secs,
+                blur=self.blur.describe(),
+                measure_scale=self.engine.measure_scale,
+            )
+
+        if self.inference == "process" and self._worker is None:
+            self._worker = PoseWorker(roi=self.roi_tracking, **self._pose_kwargs)
+            self._worker.start()
+
+        self.preview.attach(track_page=True)
         last_sec = time.time()
         frame_counter = 0
 
         while self.running:
             if not self.paused:
-                ok, frame = self.cap.read()
-                if not ok:
+                latest = await self.source.next_frame(self._last_seq)
+                if latest is None:
                     await asyncio.sleep(0.02)
                     continue
-                if self.mirror:
-                    frame = cv2.flip(frame, 1)
-
-                h, w = frame.shape[:2]
-                output = frame.copy()
-
-                # ---- Pose inference ----
-                image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                image_rgb.flags.writeable = False
-                results = self.pose.process(image_rgb)
-                image_rgb.flags.writeable = True
-
-                measure = _Measures()
-
-                # ---- Optional: background blur with segmentation (visual) ----
-                if self.enable_segmentation and results.segmentation_mask is not None:
-                    condition = (np.stack((results.segmentation_mask,) * 3, axis=-1) > 0.1)
-                    bg_image = cv2.GaussianBlur(output, (55, 55), 0)
-                    output = np.where(condition, output, bg_image)
-
-                # ---- Landmarks + measurement ----
-                if results.pose_landmarks:
-                    lm = results.pose_landmarks.landmark
-                    LSH = lm[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-                    RSH = lm[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
-                    LHP = lm[self.mp_pose.PoseLandmark.LEFT_HIP.value]
-                    RHP = lm[self.mp_pose.PoseLandmark.RIGHT_HIP.value]
-
-                    vis_ok = (LSH.visibility > 0.5 and RSH.visibility > 0.5 and
-                              LHP.visibility > 0.5 and RHP.visibility > 0.5)
-
-                    if vis_ok:
-                        S = self._euclidean(LSH, RSH, w, h)
-                        Hpel = self._euclidean(LHP, RHP, w, h)
-                        y_sh = int(((LSH.y + RSH.y) / 2.0) * h)
-                        y_hp = int(((LHP.y + RHP.y) / 2.0) * h)
-
-                        # 기본값
-                        W_val, A_val = 0.0, 0.0
-                        y_w = y_a = int((y_sh + y_hp) / 2)
-                        xw0 = xw1 = xa0 = xa1 = int(w/2)
-
-                        if self.enable_segmentation and results.segmentation_mask is not None and y_hp > y_sh + 10:
-                            # segmentation mask -> binary -> morphology
-                            mask = results.segmentation_mask
-                            binmask = (mask > 0.3).astype(np.uint8) * 255
-                            kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-                            binmask = cv2.morphologyEx(binmask, cv2.MORPH_OPEN, kernel, iterations=1)
-                            binmask = cv2.morphologyEx(binmask, cv2.MORPH_CLOSE, kernel, iterations=2)
-
-                            xL, xR = self._torso_x_roi(w, S, Hpel, LSH, RSH, LHP, RHP, frac=0.65)
-                            binROI = binmask[:, xL:xR]   # 가로 제한
-
-                            torso = (y_hp - y_sh)
-                            # 허리: 상부-중부 사이의 최소 폭
-                            yW_top = y_sh + int(0.50 * torso)
-                            yW_bot = y_sh + int(0.72 * torso)
-                            # 복부: 허리 아래쪽 최대 폭
-                            yA_top = y_sh + int(0.58 * torso)
-                            yA_bot = y_sh + int(0.84 * torso)
-
-                            (w_min, xw0, xw1, y_w), _ = self._profile_min_max(binROI, yW_top, yW_bot, y_step=3, pad=2)
-                            _, (w_max, xa0, xa1, y_a) = self._profile_min_max(binROI, yA_top, yA_bot, y_step=3, pad=2)
-                            
-                            xw0 += xL; xw1 += xL
-                            xa0 += xL; xa1 += xL
-                            
-                            W_val = float(w_min)
-                            A_val = float(w_max)
-                        else:
-                            # 세그멘테이션이 없거나 범위가 불안정: 임시 추정
-                            W_val = S * 0.75
-                            A_val = max(S, Hpel) * 0.95
-                            y_w = int(y_sh + 0.6 * (y_hp - y_sh))
-                            y_a = int(y_sh + 0.75 * (y_hp - y_sh))
-                            xw0, xw1 = int(w/2 - W_val/2), int(w/2 + W_val/2)
-                            xa0, xa1 = int(w/2 - A_val/2), int(w/2 + A_val/2)
-
-                        # smoothing
-                        S_s = self._smooth_append(self._s_hist, S)
-                        H_s = self._smooth_append(self._h_hist, Hpel)
-                        W_s = self._smooth_append(self._w_hist, W_val)
-                        A_s = self._smooth_append(self._a_hist, A_val)
-
-                        # classify
-                        shape = classify_body_shape(self.gender, S_s, H_s, W_s, A_s)
-                        
-                        measures_dict = {
-                            "shoulder": S_s,
-                            "pelvis": H_s,
-                            "waist": W_s,
-                            "abdomen": A_s,
-                        }
-                        await self._maybe_fire_stable(shape, measures_dict)
-                        # draw pose
-                        self.mp_drawing.draw_landmarks(
-                            output, results.pose_landmarks, self.mp_pose.POSE_CONNECTIONS,
-                            landmark_drawing_spec=self.mp_drawing.DrawingSpec(color=(245,117,66), thickness=2, circle_radius=2),
-                            connection_drawing_spec=self.mp_drawing.DrawingSpec(color=(245,66,230), thickness=2, circle_radius=2),
-                        )
-                        # shoulder/hip lines
-                        cv2.line(output, (int(LSH.x*w), int(LSH.y*h)), (int(RSH.x*w), int(RSH.y*h)), (255,0,0), 2)
-                        cv2.line(output, (int(LHP.x*w), int(LHP.y*h)), (int(RHP.x*w), int(RHP.y*h)), (0,165,255), 2)
-
-                        # width overlays
-                        self._draw_width_overlay(output, y_w, int(xw0), int(xw1), "Waist", (0,255,0),
-                                                draw_text=self.show_distance_label)
-                        self._draw_width_overlay(output, y_a, int(xa0), int(xa1), "Abd",   (0,200,255),
-                                                draw_text=self.show_distance_label)
-
-                    else:
-                        # 가시성 낮음 분기
-                        self._shape_last = None
-                        self._shape_last_change_ts = 0.0
-                        self._shape_fired_for.clear()
+                self._last_seq = latest.seq
+                recorder = get_recorder()
+                if recorder is not None:
+                    recorder.frame(latest)
+                if self._worker is not None:
+                    # 추론은 워커 프로세스에서 — 이 프레임을 제출하고 직전 프레임의 결과를 받아
+                    # 합성/인코딩하는 동안 워커는 이 프레임을 추론 (한 프레임 늦게 표시)
+                    with self.timer.stage("pose_wait"):
+                        res = await self._worker.pipeline(latest.image, latest.seq, flip=self.mirror, tag=latest)
+                    if res is None or res.tag is None:
+                        continue
+                    self.timer.add("pose", res.infer_ms / 1000.0)
+                    if recorder is not None:
+                        recorder.pose(res.seq, res.results)
+                    output = await self.process_frame(res.tag, res.results)
                 else:
-                    # 사람 미검출 분기
-                    self._shape_last = None
-                    self._shape_last_change_ts = 0.0
-                    self._shape_fired_for.clear()
+                    output = await self.process_frame(latest)
 
                 # ---- push to Flet Image ----
-                self.last_frame = output
-                ok, jpg = cv2.imencode(".jpg", output, encode_param)
-                if ok:
-                    b64 = base64.b64encode(jpg).decode("ascii")
-                    self.video.content.src_base64 = b64
-                    self.video.content.update()
+                self.preview.push(output, timer=self.timer)
+                self.timer.frame_done()
 
                 frame_counter += 1
                 now = time.time()
@@ -387,9 +310,10 @@ class BodyShapeBackground(ft.Stack):
 
             await asyncio.sleep(1 / max(1, self.fps))
 
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        self.source.stop(self)
+        if self._worker is not None:
+            self._worker.close()
+            self._worker = None
 
     def quit_app(self, _):
         self.page.window.close()
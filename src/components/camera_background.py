@@ -1,10 +1,10 @@
 import flet as ft
 import asyncio
-import base64
 import time
 from typing import Optional
 import cv2
-from utils.camera import open_camera
+from utils.frame_source import FrameSource, default_source
+from utils.preview import PreviewOutput
 
 PIXEL_BASE64 = (
     "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR4n"
@@ -12,27 +12,45 @@ PIXEL_BASE64 = (
 )
 
 class CameraBackground(ft.Stack):
-    def __init__(self, overlay: ft.Container, fps: int = 24, cam_index_hint: int = 0):
+    # visibility(배경이 보이는 정도, 1 - 스크림 불투명도)가 이보다 낮으면 백드롭 모드:
+    # 작게 줄여 미리 흐린 프레임을 낮은 fps로 보내고 클라이언트에서 확대해 그립니다.
+    BACKDROP_THRESHOLD = 0.5
+    BACKDROP_FPS = 8
+    BACKDROP_HEIGHT = 96
+    BACKDROP_QUALITY = 60
+
+    def __init__(self, overlay: ft.Container, fps: int = 24, cam_index_hint: int = 0, source: Optional[FrameSource] = None,
+                 visibility: float = 1.0):
         super().__init__()
         self.expand = True
         self.fit = ft.StackFit.EXPAND
-        self.fps = fps
+        self.visibility = float(visibility)
+        self.backdrop = self.visibility < self.BACKDROP_THRESHOLD
+        self.fps = min(fps, self.BACKDROP_FPS) if self.backdrop else fps
         self.cam_index_hint = cam_index_hint
         self.running: bool = False
         self.paused: bool = False
         self.mirror: bool = True
-        self.cap: Optional[cv2.VideoCapture] = None
+        self.source = source or default_source()
+        self._last_seq = 0
         self.last_frame = None
         self.video = ft.Container(
             content=ft.Image(
                 src_base64=PIXEL_BASE64,
                 fit=ft.ImageFit.COVER,
                 gapless_playback=True,
+                # 백드롭은 아주 작은 이미지를 확대하므로 부드럽게 보간
+                filter_quality=ft.FilterQuality.MEDIUM if self.backdrop else ft.FilterQuality.LOW,
             ),
             expand=True,
             width=None,
             height=None,
         )
+        if self.backdrop:
+            self.preview = PreviewOutput(self.video.content, "backdrop", quality=self.BACKDROP_QUALITY,
+                                         fps=self.fps, adaptive=False)
+        else:
+            self.preview = PreviewOutput(self.video.content, "camera", fps=fps)
         self.fps_text = ft.Text("0 fps", size=12, opacity=0.8)
         self.controls = [
             self.video,
@@ -46,15 +64,13 @@ class CameraBackground(ft.Stack):
 
     def will_unmount(self):
         self.running = False
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        self.source.stop(self)
+        self.preview.detach()
 
     async def _camera_loop(self):
         self.fps_text.value = "Opening camera..."
         self.fps_text.update()
-        self.cap = await open_camera()
-        if not self.cap:
+        if not await self.source.start(self, consumer="backdrop" if self.backdrop else "preview"):
             self.fps_text.value = "Camera open failed (check device/permission)"
             self.fps_text.color = "red"
             self.fps_text.update()
@@ -65,24 +81,24 @@ class CameraBackground(ft.Stack):
             self.fps_text.color = "white"
             self.fps_text.update()
             self.page.update()
-        encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 75]
+        self.preview.attach(track_page=True)
         last_sec = time.time()
         frame_counter = 0
         while self.running:
             if not self.paused:
-                ok, frame = self.cap.read()
-                if not ok:
+                latest = await self.source.next_frame(self._last_seq)
+                if latest is None:
                     await asyncio.sleep(0.02)
                     continue
+                self._last_seq = latest.seq
+                frame = latest.image
+                if self.backdrop:
+                    frame = self._backdrop_frame(frame)
                 if self.mirror:
                     frame = cv2.flip(frame, 1)
                 output_frame = frame
                 self.last_frame = output_frame
-                ok, jpg = cv2.imencode(".jpg", output_frame, encode_param)
-                if ok:
-                    b64 = base64.b64encode(jpg).decode("ascii")
-                    self.video.content.src_base64 = b64
-                    self.video.update()
+                self.preview.push(output_frame)
                 frame_counter += 1
                 now = time.time()
                 if now - last_sec >= 1.0:
@@ -91,9 +107,13 @@ class CameraBackground(ft.Stack):
                     frame_counter = 0
                     last_sec = now
             await asyncio.sleep(1 / max(1, self.fps))
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        self.source.stop(self)
+
+    def _backdrop_frame(self, frame):
+        h, w = frame.shape[:2]
+        th = min(self.BACKDROP_HEIGHT, h)
+        small = cv2.resize(frame, (max(1, w * th // h), th), interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(small, (0, 0), 2.0)
 
     def quit_app(self, _):
         self.page.window.close()
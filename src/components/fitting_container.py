@@ -1,5 +1,5 @@
-import base64
 import asyncio
+import base64
 import time
 import math
 import os
@@ -9,7 +9,14 @@ import cv2
 import numpy as np
 import flet as ft
 
-from utils.camera import open_camera
+from utils.camera_service import Frame
+from utils.frame_source import FrameSource, default_source
+from utils.overlay import GarmentWarper, blend_premultiplied, premultiply
+from utils.perf import StageTimer
+from utils.pose_tracker import PoseTracker
+from utils.pose_worker import PoseWorker
+from utils.preview import PreviewOutput
+from utils.session import get_recorder
 
 # ==== 투명 1x1 PNG (placeholder) ====
 TRANSPARENT_1PX_PNG_B64 = (
@@ -49,12 +56,28 @@ class FittingContainer(ft.Image): # Inherit from ft.Image
 
     JPEG_QUALITY = 75
 
+    # 추론 사이 프레임에서 앵커를 외삽할 최대 시간 (마지막 추론이 이보다 오래되면 외삽하지 않고 마지막 스무딩 값 유지)
+    MAX_EXTRAPOLATE_SECS = 0.25
+
+    POSE_KWARGS = dict(
+        static_image_mode=False,
+        model_complexity=1,
+        enable_segmentation=False,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.5,
+    )
+
     def __init__(
         self,
         overlay_path: str,
         width: int,
         height: int,
         fps: int = 24,
+        source: Optional[FrameSource] = None,
+        inference: Optional[str] = None,
+        infer_fps: Optional[float] = None,
+        roi_tracking: Optional[bool] = None,
+        warp_cache: Optional[int] = None,
         **kwargs,
     ):
         super().__init__(
@@ -63,6 +86,7 @@ class FittingContainer(ft.Image): # Inherit from ft.Image
             src_base64=TRANSPARENT_1PX_PNG_B64,
             fit=ft.ImageFit.FILL,
             repeat=ft.ImageRepeat.NO_REPEAT,
+            gapless_playback=True,   # "frame" transport에서 src URL이 바뀌는 동안 이전 프레임 유지
             **kwargs,
         )
         self.overlay_path = overlay_path
@@ -72,16 +96,43 @@ class FittingContainer(ft.Image): # Inherit from ft.Image
 
         # 내부 상태
         self._stop_event = asyncio.Event()
-        self._cap: Optional[cv2.VideoCapture] = None
+        self._source = source or default_source()
         self._pose: Optional[mp.solutions.pose.Pose] = None
+        # "inline" | "process" (별도 워커 프로세스에서 추론, SYLO_INFERENCE)
+        self.inference = inference or os.environ.get("SYLO_INFERENCE", "inline")
+        self._worker: Optional[PoseWorker] = None
+        # 직전 어깨/엉덩이 주변만 잘라 추론 (SYLO_POSE_ROI=1)
+        if roi_tracking is None:
+            roi_tracking = os.environ.get("SYLO_POSE_ROI", "0") not in ("0", "false", "no")
+        self.roi_tracking = bool(roi_tracking)
+        self._tracker: Optional[PoseTracker] = None
+        # 포즈 추론 빈도. None/0이면 매 프레임, 아니면 그 사이 프레임은 앵커를 예측해 합성 (SYLO_INFER_FPS)
+        if infer_fps is None and os.environ.get("SYLO_INFER_FPS"):
+            infer_fps = float(os.environ["SYLO_INFER_FPS"])
+        self.infer_fps = float(infer_fps) if infer_fps else 0.0
+        self._last_infer_ts = float("-inf")
 
         self._sm_sh_center = None
         self._sm_sh_dist = None
         self._sm_torso_len = None
         self._sm_angle_deg = None
-
-        # 오버레이 이미지
-        self._overlay_rgba = self._load_rgba_image(self.overlay_path)
+        # 최근 두 번의 추론 직후 스무딩 값: (ts, center, dist, torso_len, angle)
+        self._anchor_prev = None
+        self._anchor_last = None
+        self._preview = PreviewOutput(self, "fitting", quality=self.JPEG_QUALITY, fps=self.fps)
+        # 저장용 마지막 합성 프레임 (미리보기 JPEG 은 부하에 따라 화질/크기가 낮아질 수 있음)
+        self._last_display: Optional[np.ndarray] = None
+        self.timer = StageTimer()
+
+        # 오버레이 이미지 (로드 시 1회 premultiplied 로 변환, OPACITY 포함)
+        self._overlay_pm = premultiply(self._load_rgba_image(self.overlay_path), opacity=self.OPACITY)
+        # 배율/회전/앵커를 warpAffine 한 번으로. 양자화한 (배율, 각도) LRU 캐시 개수 (SYLO_WARP_CACHE, 0이면 끔)
+        if warp_cache is None:
+            warp_cache = int(os.environ.get("SYLO_WARP_CACHE", 32))
+        self._warper = (
+            GarmentWarper(self._overlay_pm, anchor=(0.5, self.ANCHOR_TOP_RATIO), cache_size=warp_cache)
+            if self._overlay_pm is not None else None
+        )
         
         # Use a default white background for cropping, as ft.Image has no bgcolor
         self._bg_bgr = (255, 255, 255)
@@ -93,17 +144,14 @@ class FittingContainer(ft.Image): # Inherit from ft.Image
         """
         # 카메라 루프 중지 및 리소스 해제
         self._stop_event.set()
-        try:
-            if self._cap:
-                self._cap.release()
-        except Exception:
-            pass
-        try:
-            if self._pose:
-                self._pose.close()
-        except Exception:
-            pass
-        return self._last_frame_base64
+        self._source.stop(self)
+        self._close_pose()
+        self._preview.detach()
+        if self._last_display is None:
+            return None
+        # 미리보기의 적응형 JPEG 이 아니라 원래 크기 / JPEG_QUALITY 로 다시 인코딩
+        ok, buf = cv2.imencode(".jpg", self._last_display, [int(cv2.IMWRITE_JPEG_QUALITY), self.JPEG_QUALITY])
+        return base64.b64encode(buf).decode("utf-8") if ok else None
 
     # ==== Flet lifecycle ====
     def did_mount(self):
@@ -112,115 +160,212 @@ class FittingContainer(ft.Image): # Inherit from ft.Image
 
     def will_unmount(self):
         self._stop_event.set()
-        try:
-            if self._cap:
-                self._cap.release()
-        except Exception:
-            pass
-        try:
-            if self._pose:
-                self._pose.close()
-        except Exception:
-            pass
+        self._source.stop(self)
+        self._close_pose()
+        self._preview.detach()
 
     # ==== 메인 루프 ====
     async def _run_loop(self):
-        cap = await open_camera()
-        if cap is None:
+        self._preview.attach()
+        if not await self._source.start(self, consumer="fitting", min_size=(self.CAM_WIDTH, self.CAM_HEIGHT)):
             self._show_text_frame("No camera found")
             return
 
-        self._cap = cap
-
-        pose = mp.solutions.pose.Pose(
-            static_image_mode=False,
-            model_complexity=1,
-            enable_segmentation=False,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5,
-        )
-        self._pose = pose
+        if self.inference == "process":
+            if self._worker is None:
+                self._worker = PoseWorker(roi=self.roi_tracking, **self.POSE_KWARGS)
+                self._worker.start()
+        elif not self.roi_tracking:
+            self._ensure_pose()
+        recorder = get_recorder()
+        if recorder is not None:
+            recorder.mount(
+                "FittingContainer",
+                overlay_path=self.overlay_path,
+                width=self.width_px,
+                height=self.height_px,
+                fps=self.fps,
+                infer_fps=self.infer_fps,
+            )
 
         last_t = 0.0
+        last_seq = 0
         target_interval = 1.0 / float(self.fps)
 
         while not self._stop_event.is_set():
-            ok, frame = cap.read()
-            if not ok or frame is None:
+            latest = await self._source.next_frame(last_seq)
+            if latest is None:
                 await asyncio.sleep(0.01)
                 continue
+            last_seq = latest.seq
+            recorder = get_recorder()
+            if recorder is not None:
+                recorder.frame(latest)
+            if self._worker is not None and self.infer_fps:
+                # 추론 주기마다 제출만 하고 기다리지 않음. 도착한 결과로 앵커를 갱신하고
+                # 표시 프레임은 매번 예측 앵커로 합성
+                if self.inference_due(latest.ts) and not self._worker.submit(latest.image, latest.seq, tag=latest):
+                    self._last_infer_ts = float("-inf")   # slot이 비면 다음 프레임에서 다시 시도
+                res = await self._worker.next_result(timeout=0.0)
+                if res is not None and res.tag is not None:
+                    self.timer.add("pose", res.infer_ms / 1000.0)
+                    if recorder is not None:
+                        recorder.pose(res.seq, res.results)
+                    self._update_anchors(res.results, res.tag.image.shape, res.tag.ts)
+                display = self.process_frame(latest, infer=False)
+            elif self._worker is not None:
+                # 추론은 워커 프로세스에서 — 이 프레임을 제출하고 직전 프레임의 결과를 받아
+                # 합성/인코딩하는 동안 워커는 이 프레임을 추론 (한 프레임 늦게 표시)
+                with self.timer.stage("pose_wait"):
+                    res = await self._worker.pipeline(latest.image, latest.seq, tag=latest)
+                if res is None or res.tag is None:
+                    continue
+                self.timer.add("pose", res.infer_ms / 1000.0)
+                if recorder is not None:
+                    recorder.pose(res.seq, res.results)
+                display = self.process_frame(res.tag, res.results)
+            else:
+                display = self.process_frame(latest, infer=self.inference_due(latest.ts))
+            self._push_frame(display)
+            self.timer.frame_done()
 
-            proc = frame
-            
-            results = pose.process(cv2.cvtColor(proc, cv2.COLOR_BGR2RGB))
-            metrics = self._extract_pose_metrics(results, proc.shape, self.VIS_TH)
-
-            if metrics is not None:
-                sh_center = np.array(metrics["shoulder_center"], dtype=np.float32)
-                sh_dist = float(metrics["shoulder_dist"])
-                torso_len = float(metrics["torso_len"])
-                angle_deg = float(metrics["angle_deg"])
-
-                self._sm_sh_center = self._ema(self._sm_sh_center, sh_center, self.SMOOTH_ALPHA) if self._sm_sh_center is not None else sh_center
-                self._sm_sh_dist   = self._ema(self._sm_sh_dist, sh_dist, self.SMOOTH_ALPHA) if self._sm_sh_dist is not None else sh_dist
-                self._sm_torso_len = self._ema(self._sm_torso_len, torso_len, self.SMOOTH_ALPHA) if self._sm_torso_len is not None else torso_len
-                self._sm_angle_deg = self._angle_smooth(self._sm_angle_deg, angle_deg, self.SMOOTH_ALPHA)
-
-                if self._overlay_rgba is not None and self._sm_sh_dist and self._sm_torso_len:
-                    if self._sm_sh_dist > 5 and self._sm_torso_len > 5:
-                        target_w = self._sm_sh_dist * self.WIDTH_SCALE
-                        target_h = self._sm_torso_len * self.HEIGHT_SCALE
-
-                        ov0 = self._overlay_rgba
-                        oh0, ow0 = ov0.shape[:2]
-                        scale_w = target_w / float(ow0)
-                        scale_h = target_h / float(oh0)
-                        scale = max(scale_w, scale_h)
-                        scale = max(scale, 0.01)
-
-                        new_w = max(1, int(round(ow0 * scale)))
-                        new_h = max(1, int(round(oh0 * scale)))
-                        ov_scaled = cv2.resize(ov0, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+            now = time.time()
+            elapsed = now - last_t
+            if elapsed < target_interval:
+                await asyncio.sleep(target_interval - elapsed)
+            last_t = now
 
-                        anchor_local = np.array([new_w / 2.0, new_h * self.ANCHOR_TOP_RATIO], dtype=np.float32)
+        self._source.stop(self)
+        self._close_pose()
 
-                        angle_total = (self._sm_angle_deg if self._sm_angle_deg is not None else 0.0) + self.ANGLE_BIAS_DEG
-                        ov_rot, M = self._rotate_bound_bgra(ov_scaled, angle_total)
-                        anchor_rot = self._transform_points(M, [anchor_local])[0]
+    def _ensure_pose(self):
+        if self._pose is None:
+            self._pose = mp.solutions.pose.Pose(**self.POSE_KWARGS)
+        return self._pose
 
-                        xoff_px = self.XOFF_RATIO * self._sm_sh_dist
-                        yoff_px = self.YOFF_RATIO * self._sm_torso_len
-                        target_anchor = (float(self._sm_sh_center[0] + xoff_px), float(self._sm_sh_center[1] + yoff_px))
+    def _close_pose(self):
+        try:
+            if self._pose:
+                self._pose.close()
+        except Exception:
+            pass
+        self._pose = None
+        if self._tracker is not None:
+            self._tracker.close()
+            self._tracker = None
+        if self._worker is not None:
+            self._worker.close()
+            self._worker = None
+
+    def inference_due(self, ts: float) -> bool:
+        """infer_fps 기준으로 이 프레임에서 포즈를 추론할 차례인지 (차례면 시각을 기록)."""
+        if not self.infer_fps:
+            return True
+        if ts - self._last_infer_ts >= 1.0 / self.infer_fps - 1e-3:
+            self._last_infer_ts = ts
+            return True
+        return False
+
+    def process_frame(self, latest: Frame, results=None, infer: bool = True) -> np.ndarray:
+        """
+        프레임 한 장에 피팅 이미지를 합성하고 컨테이너 크기로 맞춘 표시용 이미지를 반환합니다.
+        Flet 페이지 없이도 호출할 수 있어 세션 리플레이에서 그대로 사용합니다.
+        results를 넘기면 포즈 추론을 건너뜁니다 (녹화된 랜드마크 재생).
+        infer=False면 포즈를 쓰지 않고 이전 추론들로 예측한 앵커로 합성합니다.
+        """
+        # 공유 프레임이므로 합성 전에 복사
+        proc = latest.image.copy()
+
+        if infer:
+            if results is None:
+                with self.timer.stage("pose"):
+                    if self.roi_tracking:
+                        if self._tracker is None:
+                            self._tracker = PoseTracker(self.POSE_KWARGS)
+                        results = self._tracker.process(proc)
+                    else:
+                        results = self._ensure_pose().process(cv2.cvtColor(proc, cv2.COLOR_BGR2RGB))
+                recorder = get_recorder()
+                if recorder is not None:
+                    recorder.pose(latest.seq, results)
+            self._update_anchors(results, proc.shape, latest.ts)
+
+        with self.timer.stage("overlay"):
+            anchors = self._predict_anchors(latest.ts)
+            if anchors is not None:
+                proc = self._draw_garment(proc, *anchors)
+
+        with self.timer.stage("resize"):
+            show = cv2.flip(proc, 1)
+            display = self._fit_by_height_center_crop(show, self.width_px, self.height_px, self._bg_bgr)
+        return display
 
-                        top_left = (int(round(target_anchor[0] - anchor_rot[0])),
-                                    int(round(target_anchor[1] - anchor_rot[1])))
+    def _update_anchors(self, results, frame_shape, ts: float) -> None:
+        """추론 결과로 스무딩 앵커를 갱신하고 예측용 이력에 남깁니다. 포즈를 놓치면 이력을 비웁니다."""
+        metrics = self._extract_pose_metrics(results, frame_shape, self.VIS_TH)
+        if metrics is None:
+            self._anchor_prev = self._anchor_last = None
+            return
 
-                        proc = self._overlay_bgra_on_bgr(proc, ov_rot, top_left, global_opacity=self.OPACITY)
+        sh_center = np.array(metrics["shoulder_center"], dtype=np.float32)
+        sh_dist = float(metrics["shoulder_dist"])
+        torso_len = float(metrics["torso_len"])
+        angle_deg = float(metrics["angle_deg"])
 
-            show = cv2.flip(proc, 1)
-            display = self._fit_by_height_center_crop(show, self.width_px, self.height_px, self._bg_bgr)
-            self._push_frame(display)
+        self._sm_sh_center = self._ema(self._sm_sh_center, sh_center, self.SMOOTH_ALPHA) if self._sm_sh_center is not None else sh_center
+        self._sm_sh_dist   = self._ema(self._sm_sh_dist, sh_dist, self.SMOOTH_ALPHA) if self._sm_sh_dist is not None else sh_dist
+        self._sm_torso_len = self._ema(self._sm_torso_len, torso_len, self.SMOOTH_ALPHA) if self._sm_torso_len is not None else torso_len
+        self._sm_angle_deg = self._angle_smooth(self._sm_angle_deg, angle_deg, self.SMOOTH_ALPHA)
 
-            now = time.time()
-            elapsed = now - last_t
-            if elapsed < target_interval:
-                await asyncio.sleep(target_interval - elapsed)
-            last_t = now
+        self._anchor_prev = self._anchor_last
+        self._anchor_last = (float(ts), self._sm_sh_center, self._sm_sh_dist, self._sm_torso_len, self._sm_angle_deg)
 
-        if self._cap:
-            self._cap.release()
-        if self._pose:
-            self._pose.close()
+    def _predict_anchors(self, ts: float):
+        """
+        ts 시각의 (center, dist, torso_len, angle) 예측. 마지막 두 추론 사이 변화율로 선형 외삽합니다.
+        추론 프레임 자체, 또는 마지막 추론이 MAX_EXTRAPOLATE_SECS보다 오래된 경우(포즈 추론 지연/실패)는
+        마지막 스무딩 값 그대로 (오래된 속도로 계속 밀어내지 않음).
+        """
+        last = self._anchor_last
+        if last is None:
+            return None
+        prev = self._anchor_prev
+        dt = float(ts) - last[0]
+        if prev is None or dt <= 0 or dt > self.MAX_EXTRAPOLATE_SECS or last[0] <= prev[0]:
+            return last[1:]
+        k = dt / (last[0] - prev[0])
+        center = last[1] + (last[1] - prev[1]) * k
+        dist = last[2] + (last[2] - prev[2]) * k
+        torso = last[3] + (last[3] - prev[3]) * k
+        d_angle = (last[4] - prev[4] + 180.0) % 360.0 - 180.0
+        angle = last[4] + d_angle * k
+        return center, dist, torso, angle
+
+    def _draw_garment(self, proc: np.ndarray, sh_center, sh_dist: float, torso_len: float, angle_deg) -> np.ndarray:
+        if self._warper is not None and sh_dist and torso_len:
+            if sh_dist > 5 and torso_len > 5:
+                target_w = sh_dist * self.WIDTH_SCALE
+                target_h = torso_len * self.HEIGHT_SCALE
+
+                oh0, ow0 = self._warper.shape[:2]
+                scale = max(target_w / float(ow0), target_h / float(oh0), 0.01)
+                angle_total = (angle_deg if angle_deg is not None else 0.0) + self.ANGLE_BIAS_DEG
+                ov_warped, anchor = self._warper.render(scale, angle_total)
+
+                xoff_px = self.XOFF_RATIO * sh_dist
+                yoff_px = self.YOFF_RATIO * torso_len
+                target_anchor = (float(sh_center[0] + xoff_px), float(sh_center[1] + yoff_px))
+
+                top_left = (int(round(target_anchor[0] - anchor[0])),
+                            int(round(target_anchor[1] - anchor[1])))
+
+                proc = blend_premultiplied(proc, ov_warped, top_left)
+        return proc
 
     def _push_frame(self, img_bgr: np.ndarray):
+        self._last_display = img_bgr   # 매 프레임 새 배열이므로 복사하지 않음
         try:
-            ok, buf = cv2.imencode(".jpg", img_bgr, [int(cv2.IMWRITE_JPEG_QUALITY), self.JPEG_QUALITY])
-            if not ok:
-                return
-            b64 = base64.b64encode(buf).decode("utf-8")
-            self.src_base64 = b64
-            self._last_frame_base64 = b64
-            self.update()
+            self._preview.push(img_bgr, timer=self.timer)
         except Exception:
             pass
 
@@ -247,53 +392,6 @@ class FittingContainer(ft.Image): # Inherit from ft.Image
         img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
         return self._ensure_bgra(img)
 
-    @staticmethod
-    def _rotate_bound_bgra(image, angle_deg):
-        (h, w) = image.shape[:2]
-        (cX, cY) = (w / 2.0, h / 2.0)
-        M = cv2.getRotationMatrix2D((cX, cY), angle_deg, 1.0)
-        cos = abs(M[0, 0]); sin = abs(M[0, 1])
-        nW = int((h * sin) + (w * cos))
-        nH = int((h * cos) + (w * sin))
-        M[0, 2] += (nW / 2.0) - cX
-        M[1, 2] += (nH / 2.0) - cY
-        rotated = cv2.warpAffine(
-            image, M, (nW, nH),
-            flags=cv2.INTER_LINEAR,
-            borderMode=cv2.BORDER_CONSTANT,
-            borderValue=(0, 0, 0, 0)
-        )
-        return rotated, M
-
-    @staticmethod
-    def _transform_points(M, points_xy):
-        pts = np.array(points_xy, dtype=np.float32).reshape(-1, 2)
-        ones = np.ones((pts.shape[0], 1), dtype=np.float32)
-        pts_h = np.hstack([pts, ones])
-        out = pts_h @ M.T
-        return out
-
-    @staticmethod
-    def _overlay_bgra_on_bgr(base_bgr, overlay_bgra, top_left_xy, global_opacity=1.0):
-        x, y = int(top_left_xy[0]), int(top_left_xy[1])
-        if overlay_bgra is None:
-            return base_bgr
-        h, w = overlay_bgra.shape[:2]
-        H, W = base_bgr.shape[:2]
-        x1 = max(x, 0); y1 = max(y, 0)
-        x2 = min(x + w, W); y2 = min(y + h, H)
-        if x1 >= x2 or y1 >= y2:
-            return base_bgr
-        ov = overlay_bgra[(y1 - y):(y2 - y), (x1 - x):(x2 - x), :]
-        bg = base_bgr[y1:y2, x1:x2, :]
-        alpha = ov[:, :, 3:4].astype(np.float32) / 255.0
-        alpha = np.clip(alpha * float(global_opacity), 0.0, 1.0)
-        ov_rgb = ov[:, :, :3].astype(np.float32)
-        bg_rgb = bg.astype(np.float32)
-        out = alpha * ov_rgb + (1.0 - alpha) * bg_rgb
-        base_bgr[y1:y2, x1:x2, :] = out.astype(np.uint8)
-        return base_bgr
-
     @staticmethod
     def _dist(p1, p2):
         return math.hypot(p2[0] - p1[0], p2[1] - p1[1])
@@ -57,6 +57,8 @@ def main(page: ft.Page):
     page.window.maximizable = False
     show_splash_screen(page)
     _ensure_router()
+    from utils.jpeg import get_jpeg_encoder
+    get_jpeg_encoder()  # 미리보기 JPEG 백엔드 선택/처리량 로그
     page.controls.clear()
     router = Router(page)
     page.on_route_change = router.route_change
@@ -64,4 +66,6 @@ def main(page: ft.Page):
     page.go(page.route or "/")
 
 if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()  # 패키징(frozen) 빌드에서 포즈 워커 프로세스(spawn) 지원
     ft.app(target=main, assets_dir="assets")
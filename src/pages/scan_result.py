@@ -135,7 +135,7 @@ def view(page: ft.Page) -> ft.View:
     return ft.View(
         route="/scan-result",
         controls=[
-            CameraBackground(overlay=overlay),
+            CameraBackground(overlay=overlay, visibility=0.75),
         ],
         padding=0,
     )
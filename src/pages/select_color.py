@@ -139,7 +139,7 @@ def view(page: ft.Page) -> ft.View:
     return ft.View(
         route="/",
         controls=[
-            CameraBackground(overlay=overlay),
+            CameraBackground(overlay=overlay, visibility=0.25),
         ],
         padding=0,
     )
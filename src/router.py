@@ -2,6 +2,7 @@ import re
 from urllib.parse import urlparse, parse_qs
 import flet as ft
 
+from utils.session import get_recorder
 from pages import intro, input_name, select_gender, scan_body, select_fitting_type, select_style, select_color, send_image, next_menu, scan_result, fitting_result, fitting_view
 
 class Router:
@@ -31,6 +32,9 @@ class Router:
         url = urlparse(e.route or "/")
         path = url.path or "/"
         qdict = {k: v[0] if isinstance(v, list) else v for k, v in parse_qs(url.query).items()}
+        recorder = get_recorder()
+        if recorder is not None:
+            recorder.route(path)
         for pattern, builder in self._routes:
             m = pattern.match(path)
             if m:
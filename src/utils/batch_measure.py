@@ -0,0 +1,203 @@
+# utils/batch_measure.py
+"""
+이미지 폴더 일괄 체형 분석 (classify.THRESH 검증용).
+
+폴더 아래 이미지를 프로세스 풀로 나눠 MediaPipe Pose(+세그멘테이션)를 돌리고, 스캔 화면과 같은
+측정 코드(BodyMeasurementEngine)로 S/H/W/A 와 판정을 구해 JSONL 로 한 줄씩 바로 씁니다.
+각 워커는 자기 Pose 모델을 한 번 만들어 계속 사용합니다 (static_image_mode).
+
+- 라벨: 이미지의 상위 폴더 이름이 체형(H/O/Y/A/X)이면 정답 라벨로 기록
+- 성별: 경로에 MALE/FEMALE 폴더가 있으면 그 값, 없으면 --gender
+- 이어하기: 출력 파일에 결과가 확정된 경로(측정됨, no_person, read)는 건너뜀 (중단 후 같은 명령을 다시 실행).
+  추론 중 예외("pose: ...")로 끝난 경로는 일시적 실패일 수 있으므로 다시 처리하고 새 줄을 덧붙입니다
+
+    cd src
+    python -m utils.batch_measure photos/ --out results.jsonl [--workers 8] [--gender female] [--max-side 1280]
+
+결과 줄 예: {"path": "...", "label": "Y", "gender": "male", "shape": "Y", "S": .., "H": .., "W": .., "A": ..,
+            "from_mask": true, "pose_ms": .., "measure_ms": ..}
+사람을 찾지 못한 이미지는 "shape": null 과 "error" 를 기록합니다.
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import time
+from typing import Iterator, List, Optional, Set
+
+from utils.classify import SHAPES
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+FINAL_ERRORS = ("no_person", "read")   # 다시 돌려도 같은 결과인 실패
+
+_engines: dict = {}   # 워커 프로세스 안에서 성별별 엔진
+_max_side = 0
+
+
+def find_images(root: str) -> List[str]:
+    out = []
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            if name.lower().endswith(IMAGE_EXTS):
+                out.append(os.path.join(dirpath, name))
+    return sorted(out)
+
+
+def label_of(path: str) -> Optional[str]:
+    parent = os.path.basename(os.path.dirname(path)).upper()
+    return parent if parent in SHAPES and parent != "UNKNOWN" else None
+
+
+def gender_of(path: str, default: str) -> str:
+    parts = [p.upper() for p in os.path.normpath(path).split(os.sep)]
+    if "FEMALE" in parts:
+        return "female"
+    if "MALE" in parts:
+        return "male"
+    return default
+
+
+def done_paths(out_path: str) -> Set[str]:
+    """결과가 확정된 경로 (깨진 마지막 줄, 예외로 끝난 줄은 제외 → 다시 처리)."""
+    done = set()
+    if not os.path.exists(out_path):
+        return done
+    with open(out_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+                if row.get("error") and row["error"] not in FINAL_ERRORS:
+                    continue
+                done.add(row["path"])
+            except (ValueError, KeyError, AttributeError):
+                continue
+    return done
+
+
+# ----------------- 워커 프로세스 -----------------
+def _init_worker(max_side: int) -> None:
+    import cv2
+    global _max_side
+    cv2.setNumThreads(1)   # 프로세스 수만큼 병렬이므로 OpenCV 내부 스레드는 끔
+    _max_side = int(max_side)
+
+
+def _engine(gender: str):
+    from utils.body_measure import BodyMeasurementEngine
+    eng = _engines.get(gender)
+    if eng is None:
+        eng = _engines[gender] = BodyMeasurementEngine(
+            gender=gender,
+            measure_scale=float(os.environ.get("SYLO_MEASURE_SCALE", 0.5)),
+            history=1,
+            pose_kwargs=dict(static_image_mode=True, model_complexity=1,
+                             min_detection_confidence=0.5, enable_segmentation=True),
+        )
+    return eng
+
+
+def _measure_one(task) -> dict:
+    import cv2
+    path, gender, label = task
+    row = {"path": path, "label": label, "gender": gender, "shape": None}
+    img = cv2.imread(path, cv2.IMREAD_COLOR)
+    if img is None:
+        row["error"] = "read"
+        return row
+    h, w = img.shape[:2]
+    if _max_side and max(h, w) > _max_side:
+        s = _max_side / float(max(h, w))
+        img = cv2.resize(img, (int(w * s), int(h * s)), interpolation=cv2.INTER_AREA)
+    eng = _engine(gender)
+    eng.reset()   # 사진마다 독립 (스무딩/안정 판정 이력 없음)
+    try:
+        m, _ = eng.process(img)
+    except Exception as e:
+        row["error"] = f"pose: {e}"
+        return row
+    row["pose_ms"] = eng.timer.last_ms("pose")
+    row["measure_ms"] = eng.timer.last_ms("measure")
+    if m is None:
+        row["error"] = "no_person"
+        return row
+    row.update(shape=m.shape, S=round(m.shoulder, 2), H=round(m.pelvis, 2), W=round(m.waist, 2),
+               A=round(m.abdomen, 2), from_mask=m.from_mask)
+    return row
+
+
+# ----------------- 실행 -----------------
+def run_batch(root: str, out_path: str, workers: int = 0, gender: str = "male", max_side: int = 1280,
+              limit: int = 0) -> dict:
+    images = find_images(root)
+    done = done_paths(out_path)
+    todo = [p for p in images if p not in done]
+    if limit:
+        todo = todo[:limit]
+    workers = workers or os.cpu_count() or 1
+    print(f"📂 이미지 {len(images)}장 (완료 {len(done)}, 이번 {len(todo)}) — 워커 {workers}개")
+    tasks: Iterator = ((p, gender_of(p, gender), label_of(p)) for p in todo)
+
+    # 이전 실행이 줄 중간에 끊겼으면 줄바꿈부터
+    if os.path.exists(out_path) and os.path.getsize(out_path) > 0:
+        with open(out_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_nl = f.read(1) != b"\n"
+    else:
+        needs_nl = False
+
+    stats = {"processed": 0, "measured": 0, "labelled": 0, "correct": 0}
+    t0 = time.perf_counter()
+    last_log = t0
+    ctx = mp.get_context("spawn")
+    with open(out_path, "a", encoding="utf-8") as out, \
+            ctx.Pool(workers, initializer=_init_worker, initargs=(max_side,)) as pool:
+        if needs_nl:
+            out.write("\n")
+        try:
+            for row in pool.imap_unordered(_measure_one, tasks, chunksize=4):
+                out.write(json.dumps(row, ensure_ascii=False) + "\n")
+                out.flush()
+                stats["processed"] += 1
+                if row["shape"] is not None:
+                    stats["measured"] += 1
+                    if row["label"]:
+                        stats["labelled"] += 1
+                        stats["correct"] += int(row["shape"] == row["label"])
+                now = time.perf_counter()
+                if now - last_log >= 5.0:
+                    last_log = now
+                    rate = stats["processed"] / (now - t0)
+                    print(f"  {stats['processed']}/{len(todo)}  {rate:.1f} img/s")
+        except KeyboardInterrupt:
+            pool.terminate()
+            print("⚠️ 중단됨 — 같은 명령으로 다시 실행하면 이어서 처리합니다")
+    wall = time.perf_counter() - t0
+    stats.update(
+        images=len(images),
+        skipped_done=len(done),
+        workers=workers,
+        wall_secs=round(wall, 2),
+        img_per_sec=round(stats["processed"] / wall, 2) if wall > 0 else 0.0,
+        accuracy=round(stats["correct"] / stats["labelled"], 4) if stats["labelled"] else None,
+    )
+    return stats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="이미지 폴더 일괄 체형 분석 (JSONL, 이어하기 지원)")
+    ap.add_argument("root", help="이미지 폴더 (하위 폴더 포함)")
+    ap.add_argument("--out", default="batch_measure.jsonl")
+    ap.add_argument("--workers", type=int, default=0, help="프로세스 수 (기본: CPU 코어 수)")
+    ap.add_argument("--gender", choices=["male", "female"], default="male", help="경로에 MALE/FEMALE 이 없을 때")
+    ap.add_argument("--max-side", type=int, default=1280, help="긴 변이 이보다 크면 줄여서 분석 (0: 원본)")
+    ap.add_argument("--limit", type=int, default=0, help="이번 실행에서 처리할 최대 장수")
+    args = ap.parse_args(argv)
+
+    stats = run_batch(args.root, args.out, workers=args.workers, gender=args.gender,
+                      max_side=args.max_side, limit=args.limit)
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
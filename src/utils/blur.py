@@ -0,0 +1,173 @@
+# utils/blur.py
+"""
+배경 블러 엔진.
+
+기존 BodyShapeBackground 배경 블러(cv2.GaussianBlur 55x55, 전체 해상도)와 비슷한 결과를
+더 싸게 만듭니다. 축소 → 작은 이미지에서 블러 → 확대가 기본이고, 작은 이미지에 쓰는 필터를 고릅니다.
+
+method
+- "gaussian": 가우시안 (pyramid 방식의 기본)
+- "stack"   : cv2.stackBlur (OpenCV 4.7+, 없으면 box로 대체). 커널 크기와 무관하게 거의 일정한 비용
+- "box"     : 박스 필터 3회 (가우시안 근사)
+quality  (축소 배율)
+- "exact"   : 축소 없이 원본 해상도 (method=gaussian이면 기존 결과와 동일)
+- "high" 1/2, "balanced" 1/4, "fast" 1/8
+
+    blur = BlurEngine("gaussian", "balanced")     # 또는 BlurEngine.from_spec("stack:fast")
+    bg = blur.apply(frame_bgr)
+
+    cd src
+    python -m utils.blur [--image frame.png] [--size 1280x720] [--repeats 30]
+"""
+
+import argparse
+import math
+import time
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+REFERENCE_KSIZE = 55
+METHODS = ("gaussian", "stack", "box")
+QUALITIES = {"exact": 1, "high": 2, "balanced": 4, "fast": 8}
+
+
+def ksize_to_sigma(ksize: int) -> float:
+    """cv2.GaussianBlur 에 sigma=0 을 줄 때 OpenCV가 쓰는 값."""
+    return 0.3 * ((ksize - 1) * 0.5 - 1) + 0.8
+
+
+def _odd(n: float) -> int:
+    n = max(1, int(round(n)))
+    return n if n % 2 else n + 1
+
+
+class BlurEngine:
+    def __init__(self, method: str = "gaussian", quality: str = "balanced", ksize: int = REFERENCE_KSIZE):
+        if method not in METHODS:
+            raise ValueError(f"알 수 없는 블러 방식: {method}")
+        if quality not in QUALITIES:
+            raise ValueError(f"알 수 없는 블러 품질: {quality}")
+        if method == "stack" and not hasattr(cv2, "stackBlur"):
+            method = "box"
+        self.method = method
+        self.quality = quality
+        self.ksize = int(ksize)
+        self.factor = QUALITIES[quality]
+        # 축소한 이미지에서의 sigma (축소 배율만큼 작아짐)
+        self._sigma = ksize_to_sigma(self.ksize) / self.factor
+        self._small = None    # 축소 이미지 버퍼 (프레임 간 재사용)
+        self._small2 = None
+
+    @classmethod
+    def from_spec(cls, spec: Optional[str]) -> "BlurEngine":
+        """ "method[:quality]" 문자열 (예: "gaussian:balanced", "stack:fast"). """
+        method, _, quality = (spec or "gaussian:balanced").partition(":")
+        return cls(method or "gaussian", quality or "balanced")
+
+    def describe(self) -> str:
+        return f"{self.method}:{self.quality}"
+
+    def apply(self, img: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
+        """블러 결과. dst(같은 크기/타입)를 주면 그 버퍼에 씁니다."""
+        h, w = img.shape[:2]
+        if self.factor == 1:
+            return self._filter(img, dst)
+        sw, sh = max(1, w // self.factor), max(1, h // self.factor)
+        small_shape = (sh, sw) + img.shape[2:]
+        if self._small is None or self._small.shape != small_shape:
+            self._small = np.empty(small_shape, dtype=img.dtype)
+            self._small2 = np.empty(small_shape, dtype=img.dtype)
+        cv2.resize(img, (sw, sh), dst=self._small, interpolation=cv2.INTER_AREA)
+        small = self._filter(self._small, self._small2)
+        return cv2.resize(small, (w, h), dst=dst, interpolation=cv2.INTER_LINEAR)
+
+    def _filter(self, img: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
+        sigma = self._sigma
+        if self.method == "gaussian":
+            k = self.ksize if self.factor == 1 else _odd(sigma * 6)
+            return cv2.GaussianBlur(img, (k, k), 0 if self.factor == 1 else sigma, dst=dst)
+        if self.method == "stack":
+            # 스택 블러(삼각 커널) 반경 r의 분산 ≈ r(r+2)/6
+            r = max(1, int(round(-1 + math.sqrt(1 + 6 * sigma * sigma))))
+            k = 2 * r + 1
+            return cv2.stackBlur(img, (k, k), dst=dst)
+        # 박스 3회: 폭 w의 박스 분산 (w²-1)/12 × 3 = sigma²
+        bw = _odd(math.sqrt(4 * sigma * sigma + 1))
+        out = cv2.blur(img, (bw, bw), dst=dst)
+        for _ in range(2):
+            out = cv2.blur(out, (bw, bw), dst=out)   # 박스 필터는 제자리 처리 가능
+        return out
+
+
+def reference_blur(img: np.ndarray) -> np.ndarray:
+    """현재(기존) 배경 블러."""
+    return cv2.GaussianBlur(img, (REFERENCE_KSIZE, REFERENCE_KSIZE), 0)
+
+
+def psnr(a: np.ndarray, b: np.ndarray) -> float:
+    mse = float(np.mean((a.astype(np.float32) - b.astype(np.float32)) ** 2))
+    return float("inf") if mse == 0 else 10.0 * math.log10(255.0 * 255.0 / mse)
+
+
+def _test_frame(width: int, height: int) -> np.ndarray:
+    rng = np.random.default_rng(1)
+    img = np.zeros((height, width, 3), dtype=np.uint8)
+    img[:] = np.linspace(30, 200, width, dtype=np.float32).astype(np.uint8)[None, :, None]
+    for _ in range(40):   # 배경 디테일 (선반/창틀 같은 에지)
+        x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+        color = tuple(int(c) for c in rng.integers(0, 255, 3))
+        cv2.rectangle(img, (x, y), (x + int(rng.integers(10, width // 4)), y + int(rng.integers(10, height // 4))), color, -1)
+    noise = rng.integers(-10, 11, img.shape, dtype=np.int16)
+    return np.clip(img.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def benchmark(frame: np.ndarray, repeats: int = 30) -> List[Tuple[str, float, float]]:
+    """(방식, 평균 ms, 기존 블러 대비 PSNR dB) 목록. 첫 줄이 기존 방식."""
+    def _time(fn) -> Tuple[float, np.ndarray]:
+        out = fn(frame)
+        t0 = time.perf_counter()
+        for _ in range(repeats):
+            out = fn(frame)
+        return (time.perf_counter() - t0) / repeats * 1000.0, out
+
+    ref_ms, ref = _time(reference_blur)
+    rows = [(f"reference GaussianBlur {REFERENCE_KSIZE}x{REFERENCE_KSIZE}", ref_ms, float("inf"))]
+    for method in METHODS:
+        for quality in QUALITIES:
+            if method != "gaussian" and quality == "exact":
+                continue
+            eng = BlurEngine(method, quality)
+            if eng.method != method:
+                continue   # stackBlur 없음
+            ms, out = _time(eng.apply)
+            rows.append((eng.describe(), ms, psnr(out, ref)))
+    return rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="배경 블러 방식 벤치마크 (기존 GaussianBlur 대비 속도/PSNR)")
+    ap.add_argument("--image", help="테스트 이미지 (없으면 합성 이미지)")
+    ap.add_argument("--size", default="1280x720")
+    ap.add_argument("--repeats", type=int, default=30)
+    args = ap.parse_args(argv)
+
+    if args.image:
+        frame = cv2.imread(args.image, cv2.IMREAD_COLOR)
+        if frame is None:
+            raise SystemExit(f"이미지를 읽을 수 없습니다: {args.image}")
+    else:
+        w, h = (int(v) for v in args.size.lower().split("x"))
+        frame = _test_frame(w, h)
+
+    rows = benchmark(frame, args.repeats)
+    ref_ms = rows[0][1]
+    print(f"frame {frame.shape[1]}x{frame.shape[0]}, repeats {args.repeats}")
+    for name, ms, db in rows:
+        db_txt = "   (기준)" if math.isinf(db) else f"{db:6.1f}dB"
+        print(f"  {name:<34} {ms:8.2f}ms  x{ref_ms / ms:5.1f}  {db_txt}")
+
+
+if __name__ == "__main__":
+    main()
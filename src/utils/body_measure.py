@@ -0,0 +1,338 @@
+# utils/body_measure.py
+"""
+UI 없이 쓰는 체형 측정 엔진.
+
+프레임(또는 랜드마크 + 세그멘테이션 마스크)을 받아 어깨/골반/허리/복부 폭(px)과
+classify_body_shape 판정을 돌려줍니다. 스무딩 이력과 "판정이 stable_secs 동안 유지됐는지"
+상태를 엔진이 직접 갖고 있어, BodyShapeBackground 와 오프라인 분석이 같은 코드를 씁니다.
+
+    engine = BodyMeasurementEngine(gender="female")
+    m = engine.measure(results.pose_landmarks.landmark, frame.shape, results.segmentation_mask)
+    m, results = engine.process(frame_bgr)     # 엔진이 MediaPipe Pose 를 직접 돌림
+    if m and engine.stable.update(m.shape, ts): ...   # 안정 판정
+
+동영상 파일을 최대 속도로 돌려 프레임별 측정값/처리 시간/안정 판정을 CSV 또는 JSONL 로 저장:
+
+    cd src
+    python -m utils.body_measure video.mp4 --out measures.csv [--gender female] [--mirror]
+                                 [--scale 0.5] [--stable-secs 3.0] [--max-frames N]
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, Sequence, Set, Tuple
+
+import cv2
+import numpy as np
+
+from utils.classify import classify_body_shape
+from utils.composite import clean_body_mask
+from utils.perf import StageTimer
+from utils.torso_profile import RowProfile, band_rows
+
+# MediaPipe Pose 랜드마크 번호
+LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP = 11, 12, 23, 24
+
+
+@dataclass
+class BodyMeasures:
+    shape: str
+    shoulder: float          # 스무딩된 폭 (px)
+    pelvis: float
+    waist: float
+    abdomen: float
+    from_mask: bool          # 허리/복부를 마스크에서 잰 값인지 (아니면 어깨/골반 기반 추정)
+    y_waist: int = 0         # 그리기용: 이번 프레임 허리/복부 측정 행과 양 끝 (프레임 좌표)
+    y_abdomen: int = 0
+    xw0: int = 0; xw1: int = 0
+    xa0: int = 0; xa1: int = 0
+
+    def widths(self) -> dict:
+        """on_shape_stable 콜백에 넘기던 measures 형식."""
+        return {"shoulder": self.shoulder, "pelvis": self.pelvis, "waist": self.waist, "abdomen": self.abdomen}
+
+
+class StableShape:
+    """
+    같은 판정이 stable_secs 동안 이어지면 한 번 알립니다.
+    같은 판정은 reset() (사람을 놓치거나 가시성이 낮아짐) 전까지 다시 알리지 않습니다.
+    """
+
+    def __init__(self, stable_secs: float = 3.0):
+        self.stable_secs = float(stable_secs)
+        self.reset()
+
+    def reset(self) -> None:
+        self.last: Optional[str] = None
+        self.last_change_ts = 0.0
+        self.fired: Set[str] = set()
+
+    def update(self, shape: str, now: float) -> bool:
+        if not shape or shape == "UNKNOWN":
+            return False
+        if self.last != shape:
+            self.last = shape
+            self.last_change_ts = now
+            return False
+        if now - self.last_change_ts >= self.stable_secs and shape not in self.fired:
+            self.fired.add(shape)
+            return True
+        return False
+
+
+class BodyMeasurementEngine:
+    def __init__(self, gender: str = "male", measure_scale: float = 0.5, body_threshold: float = 0.3,
+                 vis_th: float = 0.5, history: int = 12, stable_secs: float = 3.0, pose_kwargs: Optional[dict] = None):
+        """
+        measure_scale : 측정용 마스크 정리/폭 프로파일 해상도 배율 (1.0 = 원본)
+        body_threshold: 세그멘테이션 마스크에서 몸으로 볼 값
+        vis_th        : 어깨/엉덩이 랜드마크 가시성 기준
+        history       : 폭 스무딩에 쓰는 최근 측정 개수
+        pose_kwargs   : process() 에서 쓸 mp.solutions.pose.Pose 인자
+        """
+        self.gender = "female" if str(gender).lower().startswith("f") else "male"
+        self.measure_scale = min(1.0, max(0.1, float(measure_scale)))
+        self.body_threshold = float(body_threshold)
+        self.vis_th = float(vis_th)
+        self._hist = {k: deque(maxlen=int(history)) for k in ("shoulder", "pelvis", "waist", "abdomen")}
+        self.stable = StableShape(stable_secs)
+        self.pose_kwargs = pose_kwargs or dict(
+            model_complexity=1,
+            min_detection_confidence=0.7,
+            min_tracking_confidence=0.5,
+            smooth_landmarks=True,
+            enable_segmentation=True,
+        )
+        self._pose = None
+        self.timer = StageTimer()
+
+    def reset(self) -> None:
+        for deq in self._hist.values():
+            deq.clear()
+        self.stable.reset()
+
+    def close(self) -> None:
+        if self._pose is not None:
+            self._pose.close()
+            self._pose = None
+
+    # ----------------- 입력: 프레임 -----------------
+    def process(self, frame_bgr: np.ndarray):
+        """MediaPipe Pose 를 돌려 (측정값 또는 None, pose 결과). timer 에 pose/measure 단계 기록."""
+        if self._pose is None:
+            import mediapipe as mp
+            self._pose = mp.solutions.pose.Pose(**self.pose_kwargs)
+        with self.timer.stage("pose"):
+            rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+            rgb.flags.writeable = False
+            results = self._pose.process(rgb)
+        landmarks = results.pose_landmarks.landmark if results.pose_landmarks else None
+        with self.timer.stage("measure"):
+            m = self.measure(landmarks, frame_bgr.shape, getattr(results, "segmentation_mask", None))
+        return m, results
+
+    # ----------------- 입력: 랜드마크 + 마스크 -----------------
+    def measure(self, landmarks: Optional[Sequence], frame_shape: Tuple[int, ...],
+                mask: Optional[np.ndarray] = None) -> Optional[BodyMeasures]:
+        """
+        landmarks: 정규화 랜드마크 목록 (x, y, visibility 속성). None 이면 사람 없음
+        mask     : float 세그멘테이션 마스크 (프레임 크기). None 이면 허리/복부는 어깨/골반으로 추정
+        사람이 없거나 어깨/엉덩이 가시성이 낮으면 None 을 돌려주고 안정 판정 상태를 초기화합니다.
+        """
+        if not landmarks:
+            self.stable.reset()
+            return None
+        LSH, RSH = landmarks[LEFT_SHOULDER], landmarks[RIGHT_SHOULDER]
+        LHP, RHP = landmarks[LEFT_HIP], landmarks[RIGHT_HIP]
+        if min(LSH.visibility, RSH.visibility, LHP.visibility, RHP.visibility) <= self.vis_th:
+            self.stable.reset()
+            return None
+
+        h, w = frame_shape[:2]
+        S = self._euclidean(LSH, RSH, w, h)
+        Hpel = self._euclidean(LHP, RHP, w, h)
+        y_sh = int(((LSH.y + RSH.y) / 2.0) * h)
+        y_hp = int(((LHP.y + RHP.y) / 2.0) * h)
+
+        from_mask = mask is not None and y_hp > y_sh + 10
+        if from_mask:
+            W_val, A_val, (y_w, xw0, xw1), (y_a, xa0, xa1) = self._mask_widths(
+                mask, w, S, Hpel, (LSH, RSH, LHP, RHP), y_sh, y_hp)
+        else:
+            # 세그멘테이션이 없거나 범위가 불안정: 임시 추정
+            W_val = S * 0.75
+            A_val = max(S, Hpel) * 0.95
+            y_w = int(y_sh + 0.6 * (y_hp - y_sh))
+            y_a = int(y_sh + 0.75 * (y_hp - y_sh))
+            xw0, xw1 = int(w/2 - W_val/2), int(w/2 + W_val/2)
+            xa0, xa1 = int(w/2 - A_val/2), int(w/2 + A_val/2)
+
+        S_s = self._smooth("shoulder", S)
+        H_s = self._smooth("pelvis", Hpel)
+        W_s = self._smooth("waist", W_val)
+        A_s = self._smooth("abdomen", A_val)
+        shape = classify_body_shape(self.gender, S_s, H_s, W_s, A_s)
+        return BodyMeasures(shape, S_s, H_s, W_s, A_s, from_mask,
+                            y_waist=y_w, y_abdomen=y_a, xw0=xw0, xw1=xw1, xa0=xa0, xa1=xa1)
+
+    def _mask_widths(self, mask, w, S, Hpel, pts, y_sh, y_hp):
+        LSH, RSH, LHP, RHP = pts
+        xL, xR = self._torso_x_roi(w, S, Hpel, LSH, RSH, LHP, RHP, frac=0.65)
+
+        torso = (y_hp - y_sh)
+        # 허리: 상부-중부 사이의 최소 폭
+        yW_top = y_sh + int(0.50 * torso)
+        yW_bot = y_sh + int(0.72 * torso)
+        # 복부: 허리 아래쪽 최대 폭
+        yA_top = y_sh + int(0.58 * torso)
+        yA_bot = y_sh + int(0.84 * torso)
+
+        # segmentation mask -> binary -> morphology (몸통 ROI만, measure_scale 해상도)
+        body = clean_body_mask(mask, (xL, yW_top, xR, yA_bot + 1), self.measure_scale, self.body_threshold)
+        mh = body.mask.shape[0]
+        step = max(1, int(round(3 * body.sy)))
+        bands = [(body.row(yW_top), body.row(yW_bot)), (body.row(yA_top), body.row(yA_bot))]
+
+        # 두 구간의 샘플 행을 한 번에 프로파일링한 뒤 구간별 최소/최대
+        rows = np.union1d(band_rows(mh, *bands[0], step), band_rows(mh, *bands[1], step))
+        profile = RowProfile.measure(body.mask, rows, pad=max(0, int(round(2 * body.sy))))
+        w_min, xw0, xw1, y_w = profile.narrowest(*bands[0], step)
+        w_max, xa0, xa1, y_a = profile.widest(*bands[1], step)
+
+        # 마스크 좌표 → 프레임 픽셀
+        waist = (body.frame_y(y_w), body.frame_x(xw0), body.frame_x(xw1 + 1) - 1)
+        abdomen = (body.frame_y(y_a), body.frame_x(xa0), body.frame_x(xa1 + 1) - 1)
+        return body.frame_width(w_min), body.frame_width(w_max), waist, abdomen
+
+    # ----------------- helpers -----------------
+    @staticmethod
+    def _euclidean(p1, p2, w, h) -> float:
+        x1, y1 = int(p1.x * w), int(p1.y * h)
+        x2, y2 = int(p2.x * w), int(p2.y * h)
+        return float(np.hypot(x2 - x1, y2 - y1))
+
+    @staticmethod
+    def _torso_x_roi(w, S_px, H_px, LSH, RSH, LHP, RHP, frac):
+        """
+        가로 스캔을 몸통 중심에서 어깨폭의 frac*2 범위로 제한.
+        frac=0.45 → 총 폭이 어깨폭의 90%.
+        """
+        cx = int(((LSH.x + RSH.x + LHP.x + RHP.x) / 4.0) * w)
+        half = int(max(20, frac * max(S_px, H_px)))  # 최소 20px 확보
+        xL = max(0, cx - half)
+        xR = min(w - 1, cx + half)
+        return xL, xR
+
+    def _smooth(self, key: str, val: float) -> float:
+        deq = self._hist[key]
+        if val > 0:
+            deq.append(val)
+        return float(np.mean(deq)) if len(deq) else val
+
+
+# ----------------- 오프라인 동영상 CLI -----------------
+FIELDS = ("frame", "ts", "shape", "shoulder", "pelvis", "waist", "abdomen", "from_mask",
+          "stable", "decode_ms", "pose_ms", "measure_ms")
+
+
+class _Writer:
+    def __init__(self, path: str, fmt: str):
+        self.fmt = fmt
+        self._f = open(path, "w", encoding="utf-8", newline="")
+        self._csv = csv.DictWriter(self._f, fieldnames=FIELDS) if fmt == "csv" else None
+        if self._csv is not None:
+            self._csv.writeheader()
+
+    def write(self, row: dict) -> None:
+        if self._csv is not None:
+            self._csv.writerow(row)
+        else:
+            self._f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def close(self) -> None:
+        self._f.close()
+
+
+def run_video(path: str, out: str, fmt: Optional[str] = None, gender: str = "male", mirror: bool = False,
+              measure_scale: float = 0.5, stable_secs: float = 3.0, max_frames: int = 0) -> dict:
+    """동영상을 처음부터 끝까지 측정하고 요약(dict)을 돌려줍니다. 시간 기준은 동영상 타임스탬프."""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise SystemExit(f"동영상을 열 수 없습니다: {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    fmt = fmt or ("jsonl" if out.lower().endswith((".jsonl", ".json")) else "csv")
+    engine = BodyMeasurementEngine(gender=gender, measure_scale=measure_scale, stable_secs=stable_secs)
+    writer = _Writer(out, fmt)
+    decisions = []
+    last: Optional[BodyMeasures] = None
+    idx = 0
+    t_start = time.perf_counter()
+    try:
+        while not max_frames or idx < max_frames:
+            t0 = time.perf_counter()
+            ok, frame = cap.read()
+            if not ok:
+                break
+            if mirror:
+                frame = cv2.flip(frame, 1)
+            engine.timer.add("decode", time.perf_counter() - t0)
+            ts = idx / fps
+            m, _ = engine.process(frame)
+            fired = m is not None and engine.stable.update(m.shape, ts)
+            if fired:
+                decisions.append({"frame": idx, "ts": round(ts, 3), "shape": m.shape,
+                                  "measures": {k: round(v, 2) for k, v in m.widths().items()}})
+            last = m or last
+            row = {"frame": idx, "ts": round(ts, 3), "shape": m.shape if m else "",
+                   "from_mask": int(m.from_mask) if m else "",
+                   "stable": m.shape if fired else "",
+                   "decode_ms": engine.timer.last_ms("decode"), "pose_ms": engine.timer.last_ms("pose"),
+                   "measure_ms": engine.timer.last_ms("measure")}
+            for k in ("shoulder", "pelvis", "waist", "abdomen"):
+                row[k] = round(getattr(m, k), 2) if m else ""
+            writer.write(row)
+            engine.timer.frame_done()
+            idx += 1
+    finally:
+        cap.release()
+        writer.close()
+        engine.close()
+    wall = time.perf_counter() - t_start
+    return {
+        "video": path,
+        "out": out,
+        "frames": idx,
+        "wall_secs": round(wall, 3),
+        "fps": round(idx / wall, 1) if wall > 0 else 0.0,
+        "final_shape": last.shape if last else None,
+        "stable": decisions,
+        "stages": engine.timer.summary(),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="동영상 파일 체형 측정 (프레임별 CSV/JSONL)")
+    ap.add_argument("video")
+    ap.add_argument("--out", help="출력 경로 (.csv 또는 .jsonl, 기본: <video>.measures.csv)")
+    ap.add_argument("--format", choices=["csv", "jsonl"], help="출력 형식 (기본: 확장자로 판단)")
+    ap.add_argument("--gender", choices=["male", "female"], default="male")
+    ap.add_argument("--mirror", action="store_true", help="좌우 반전 후 측정 (앱 화면과 같은 방향)")
+    ap.add_argument("--scale", type=float, default=float(os.environ.get("SYLO_MEASURE_SCALE", 0.5)),
+                    help="측정용 마스크 해상도 배율")
+    ap.add_argument("--stable-secs", type=float, default=3.0)
+    ap.add_argument("--max-frames", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    out = args.out or os.path.splitext(args.video)[0] + ".measures." + (args.format or "csv")
+    summary = run_video(args.video, out, fmt=args.format, gender=args.gender, mirror=args.mirror,
+                        measure_scale=args.scale, stable_secs=args.stable_secs, max_frames=args.max_frames)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,44 @@ import cv2
 import asyncio
 from typing import Optional, Tuple
 
+from utils.camera_profile import (
+    apply_profile,
+    clear_profile,
+    load_profile,
+    profile_from_capture,
+    save_profile,
+)
+
 async def _read_with_timeout(cap: cv2.VideoCapture, timeout: float) -> Tuple[bool, Optional[any]]:
     try:
         return await asyncio.wait_for(asyncio.to_thread(cap.read), timeout)
     except asyncio.TimeoutError:
         return False, None
 
+async def _open_from_profile() -> Optional[cv2.VideoCapture]:
+    """저장된 프로필로 한 번만 열어 봅니다. 실패하면 None."""
+    profile = load_profile()
+    if profile is None:
+        return None
+    cap = cv2.VideoCapture(profile.index, profile.backend)
+    if not cap.isOpened():
+        cap.release()
+        return None
+    apply_profile(cap, profile)
+    # 워밍업 중 첫 프레임이 비어 있는 드라이버가 있어 몇 번만 재시도
+    for _ in range(5):
+        ok, frame = await _read_with_timeout(cap, 3.5)
+        if ok and frame is not None:
+            print(f"✅ 카메라 프로필 {profile.index} / {profile.backend} 열기 성공, frame={frame.shape}")
+            return cap
+        await asyncio.sleep(0.05)
+    cap.release()
+    return None
+
 async def open_camera() -> Optional[cv2.VideoCapture]:
+    cap = await _open_from_profile()
+    if cap is not None:
+        return cap
     BACKENDS = [
         cv2.CAP_DSHOW,
         cv2.CAP_FFMPEG,
@@ -33,7 +64,9 @@ async def open_camera() -> Optional[cv2.VideoCapture]:
             ok, frame = await _read_with_timeout(cap, 3.5)
             if ok and frame is not None:
                 print(f"✅ 카메라 {idx} / {be} 열기 성공, frame={frame.shape}")
+                save_profile(profile_from_capture(idx, be, cap))
                 return cap
             cap.release()
     print("❌ 사용 가능한 카메라 없음")
+    clear_profile()
     return None
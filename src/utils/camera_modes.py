@@ -0,0 +1,129 @@
+# utils/camera_modes.py
+"""
+캡처 포맷/해상도 협상.
+
+OpenCV는 장치가 지원하는 모드 목록을 주지 않으므로, 소비자 요구 해상도 이상인 후보를
+작은 것부터 실제로 적용해 보고(장치가 돌려준 실제 FOURCC/해상도 확인) 몇 프레임으로
+달성 fps를 잰 뒤 가장 좋은 모드를 고릅니다. 같은 해상도면 압축(MJPG)이 USB 대역폭 때문에
+fps가 더 잘 나오는 경우가 많아 MJPG를 먼저 시도합니다.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+import cv2
+
+from utils.camera_profile import fourcc_to_str
+
+# 소비자별 최소 해상도
+CONSUMER_REQUIREMENTS = {
+    "preview": (640, 360),    # 블러/스크림 뒤 배경: 작아도 충분
+    "backdrop": (320, 180),   # 불투명 스크림 뒤 흐린 배경 (CameraBackground 백드롭 모드)
+    "scan": (1280, 720),      # 체형 측정: 마스크 폭 프로파일에 픽셀이 필요
+    "fitting": (1280, 720),
+}
+
+CANDIDATE_SIZES: List[Tuple[int, int]] = [
+    (640, 480),
+    (1280, 720),
+    (1920, 1080),
+]
+CANDIDATE_FOURCCS = ("MJPG", "YUY2")
+
+
+@dataclass
+class ModeResult:
+    fourcc: str
+    width: int
+    height: int
+    fps: float
+    requested: Tuple[str, int, int]   # 적용 시 요청한 (FOURCC, w, h)
+
+    def describe(self) -> str:
+        return f"{self.fourcc or 'default'} {self.width}x{self.height} @ {self.fps:.1f}fps"
+
+
+def requirement_for(consumer: str, min_size: Optional[Tuple[int, int]] = None) -> Tuple[int, int]:
+    if min_size:
+        return int(min_size[0]), int(min_size[1])
+    return CONSUMER_REQUIREMENTS.get(consumer, CONSUMER_REQUIREMENTS["preview"])
+
+
+def merge_requirements(reqs) -> Tuple[int, int]:
+    """여러 구독자의 요구 중 가장 큰 해상도."""
+    reqs = list(reqs)
+    if not reqs:
+        return CONSUMER_REQUIREMENTS["preview"]
+    return max(r[0] for r in reqs), max(r[1] for r in reqs)
+
+
+def apply_mode(cap: cv2.VideoCapture, fourcc: str, w: int, h: int) -> Tuple[str, int, int]:
+    try:
+        if fourcc:
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, w)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, h)
+    except Exception:
+        pass
+    return (
+        fourcc_to_str(cap.get(cv2.CAP_PROP_FOURCC)),
+        int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+    )
+
+
+def _measure_fps(read_one: Callable[[], bool], frames: int, skip: int = 2, timeout: float = 2.0) -> float:
+    """모드 전환 직후 느린 프레임 skip개를 버리고 frames개 동안의 fps."""
+    t_end = time.perf_counter() + timeout
+    for _ in range(skip):
+        if time.perf_counter() > t_end:
+            return 0.0
+        read_one()
+    got = 0
+    t0 = time.perf_counter()
+    while got < frames and time.perf_counter() < t_end:
+        if read_one():
+            got += 1
+    dt = time.perf_counter() - t0
+    return got / dt if dt > 0 and got else 0.0
+
+
+def negotiate_mode(
+    cap: cv2.VideoCapture,
+    requirement: Tuple[int, int],
+    read_one: Callable[[], bool],
+    target_fps: float = 24.0,
+    frames: int = 8,
+) -> Optional[ModeResult]:
+    """
+    requirement 이상의 후보 모드를 적용/측정해 가장 좋은 모드를 적용하고 결과를 반환합니다.
+    read_one()은 프레임 하나를 읽고 성공 여부를 반환해야 합니다 (측정 중에도 프레임 공급 유지).
+    """
+    req_w, req_h = requirement
+    sizes = [s for s in CANDIDATE_SIZES if s[0] >= req_w and s[1] >= req_h] or [CANDIDATE_SIZES[-1]]
+    tried: List[ModeResult] = []
+    for w, h in sizes:
+        for fourcc in CANDIDATE_FOURCCS:
+            got_fourcc, got_w, got_h = apply_mode(cap, fourcc, w, h)
+            if any((r.fourcc, r.width, r.height) == (got_fourcc, got_w, got_h) for r in tried):
+                continue  # 장치가 같은 모드로 되돌림
+            fps = _measure_fps(read_one, frames)
+            tried.append(ModeResult(got_fourcc, got_w, got_h, fps, (fourcc, w, h)))
+        if any(r.fps >= 0.9 * target_fps and r.width >= req_w and r.height >= req_h for r in tried):
+            break  # 작은 해상도에서 목표 fps를 달성하면 더 큰 모드는 시도하지 않음
+    if not tried:
+        return None
+
+    def _rank(r: ModeResult):
+        meets_size = r.width >= req_w and r.height >= req_h
+        meets_fps = r.fps >= 0.9 * target_fps
+        return (meets_size, meets_fps, -(r.width * r.height) if meets_fps else r.fps, r.fps)
+
+    best = max(tried, key=_rank)
+    last = tried[-1]
+    if (best.fourcc, best.width, best.height) != (last.fourcc, last.width, last.height):
+        apply_mode(cap, *best.requested)
+    for r in tried:
+        print(f"  [camera_modes] {r.describe()}{'  ← 선택' if r is best else ''}")
+    return best
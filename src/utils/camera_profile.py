@@ -0,0 +1,90 @@
+# utils/camera_profile.py
+"""
+마지막으로 성공한 카메라 설정(index, backend, FOURCC, 해상도)을 디스크에 저장해 두고,
+다음 실행 때 전체 탐색 없이 한 번에 열기 위한 캐시.
+
+저장 위치: ~/.sylo/camera_profile.json (SYLO_CAMERA_PROFILE 환경 변수로 변경 가능)
+"""
+
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+import cv2
+
+
+def _profile_path() -> Path:
+    env = os.environ.get("SYLO_CAMERA_PROFILE")
+    if env:
+        return Path(env)
+    return Path.home() / ".sylo" / "camera_profile.json"
+
+
+@dataclass
+class CameraProfile:
+    index: int
+    backend: int
+    fourcc: str = ""     # "MJPG", "YUY2" ... (빈 문자열이면 드라이버 기본값)
+    width: int = 640
+    height: int = 480
+
+
+def fourcc_to_str(value) -> str:
+    code = int(value)
+    if code <= 0:
+        return ""
+    s = "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4))
+    return s if s.isprintable() else ""
+
+
+def load_profile() -> Optional[CameraProfile]:
+    try:
+        data = json.loads(_profile_path().read_text(encoding="utf-8"))
+        return CameraProfile(
+            index=int(data["index"]),
+            backend=int(data["backend"]),
+            fourcc=str(data.get("fourcc") or ""),
+            width=int(data.get("width") or 640),
+            height=int(data.get("height") or 480),
+        )
+    except Exception:
+        return None
+
+
+def save_profile(profile: CameraProfile) -> None:
+    path = _profile_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(asdict(profile)), encoding="utf-8")
+    except Exception as e:
+        print(f"[camera_profile] 저장 실패: {e}")
+
+
+def clear_profile() -> None:
+    try:
+        _profile_path().unlink()
+    except Exception:
+        pass
+
+
+def profile_from_capture(index: int, backend: int, cap: cv2.VideoCapture) -> CameraProfile:
+    """열려 있는 VideoCapture에서 실제로 적용된 FOURCC/해상도를 읽어 프로필을 만듭니다."""
+    return CameraProfile(
+        index=int(index),
+        backend=int(backend),
+        fourcc=fourcc_to_str(cap.get(cv2.CAP_PROP_FOURCC)),
+        width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+    )
+
+
+def apply_profile(cap: cv2.VideoCapture, profile: CameraProfile) -> None:
+    try:
+        if profile.fourcc:
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*profile.fourcc))
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, profile.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, profile.height)
+    except Exception:
+        pass
@@ -0,0 +1,266 @@
+# utils/camera_service.py
+"""
+프로세스 전역 카메라 서비스.
+
+각 화면(CameraBackground / BodyShapeBackground / FittingContainer)이
+마운트될 때마다 open_camera()로 장치를 새로 찾던 구조를 대체합니다.
+장치는 한 번만 열고, 라우트가 바뀌어도 유지하며, 구독자가 아무도 없을 때
+linger_secs 만큼 기다린 뒤 해제합니다.
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from utils.camera import open_camera
+from utils.camera_modes import ModeResult, apply_mode, merge_requirements, negotiate_mode, requirement_for
+
+
+@dataclass
+class Frame:
+    image: np.ndarray
+    ts: float       # 캡처 시각 (time.time())
+    seq: int        # 1부터 증가하는 프레임 번호
+
+
+class CameraService:
+    def __init__(self, linger_secs: float = 3.0):
+        self.linger_secs = float(linger_secs)
+        self._cap: Optional[cv2.VideoCapture] = None
+        self._subscribers: dict = {}    # owner → 요구 해상도 (w, h)
+        self._open_lock: Optional[asyncio.Lock] = None
+        self._state_lock = threading.Lock()
+        self._release_timer: Optional[threading.Timer] = None
+
+        # 캡처 스레드 (최신 프레임 1장만 보관)
+        self._reader: Optional[threading.Thread] = None
+        self._reader_stop = threading.Event()
+        self._frame_lock = threading.Lock()
+        self._latest: Optional[Frame] = None
+        self._seq = 0
+        self._waiters: list = []   # (loop, future, after_seq)
+
+        # 캡처 모드 협상 (구독자 요구 중 최대 해상도 기준)
+        self._want_req = None
+        self._cur_req = None
+        self._mode_cache: dict = {}     # (w, h) 요구 → ModeResult
+        self.mode: Optional[ModeResult] = None
+        self.capture_fps: float = 0.0   # 실제 달성 fps (캡처 스레드 측정, EMA)
+
+    # ----------------- 구독 관리 -----------------
+    async def subscribe(self, owner, consumer: str = "preview", min_size=None) -> bool:
+        """
+        owner를 구독자로 등록하고 장치가 열려 있지 않으면 엽니다.
+        consumer("preview" | "scan" | "fitting") 또는 min_size=(w, h)로 필요한 해상도를 알리면
+        캡처 스레드가 전체 구독자 요구에 맞는 모드를 협상해 적용합니다.
+        장치를 열 수 없으면 구독을 취소하고 False를 반환합니다.
+        """
+        with self._state_lock:
+            self._subscribers[owner] = requirement_for(consumer, min_size)
+            self._want_req = merge_requirements(self._subscribers.values())
+            self._cancel_release_timer()
+        if self._open_lock is None:
+            self._open_lock = asyncio.Lock()
+        async with self._open_lock:
+            if self._cap is None:
+                cap = await open_camera()
+                if cap is not None:
+                    self._start_reader(cap)
+        if self._cap is None:
+            with self._state_lock:
+                self._subscribers.pop(owner, None)
+            return False
+        return True
+
+    def unsubscribe(self, owner) -> None:
+        """
+        구독 해제. 마지막 구독자가 빠지면 linger_secs 후 장치를 해제합니다.
+        (라우트 전환 시 이전 뷰의 unmount → 다음 뷰의 mount 사이에 장치가 닫히지 않도록)
+        """
+        with self._state_lock:
+            self._subscribers.pop(owner, None)
+            if self._subscribers:
+                self._want_req = merge_requirements(self._subscribers.values())
+                return
+            if self._cap is None:
+                return
+            self._cancel_release_timer()
+            if self.linger_secs <= 0:
+                self._release_locked()
+                return
+            self._release_timer = threading.Timer(self.linger_secs, self._release_if_idle)
+            self._release_timer.daemon = True
+            self._release_timer.start()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def is_open(self) -> bool:
+        return self._cap is not None
+
+    # ----------------- 프레임 -----------------
+    def latest(self) -> Optional[Frame]:
+        """가장 최근에 캡처된 프레임 (없으면 None). 블로킹하지 않습니다."""
+        return self._latest
+
+    async def next_frame(self, after_seq: int = 0, timeout: float = 1.0) -> Optional[Frame]:
+        """
+        seq가 after_seq보다 큰 새 프레임을 기다립니다. 이미 있으면 즉시 반환.
+        이벤트 루프를 막지 않으며, timeout 내에 새 프레임이 없으면 None.
+        반환된 프레임은 모든 구독자가 공유하므로 제자리 수정하지 마세요.
+        """
+        loop = asyncio.get_running_loop()
+        with self._frame_lock:
+            cur = self._latest
+            if cur is not None and cur.seq > after_seq:
+                return cur
+            if self._cap is None:
+                return None
+            fut = loop.create_future()
+            self._waiters.append((loop, fut, after_seq))
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            with self._frame_lock:
+                self._waiters = [w for w in self._waiters if w[1] is not fut]
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """기존 cap.read() 호환: 최신 프레임을 (ok, image)로 반환합니다 (블로킹 없음)."""
+        cur = self._latest
+        if cur is None:
+            return False, None
+        return True, cur.image
+
+    def release(self) -> None:
+        """구독자와 무관하게 즉시 장치를 해제합니다 (앱 종료 시)."""
+        with self._state_lock:
+            self._cancel_release_timer()
+            self._release_locked()
+
+    # ----------------- 내부 -----------------
+    def _cancel_release_timer(self):
+        if self._release_timer is not None:
+            self._release_timer.cancel()
+            self._release_timer = None
+
+    def _release_if_idle(self):
+        with self._state_lock:
+            self._release_timer = None
+            if not self._subscribers:
+                self._release_locked()
+
+    def _release_locked(self):
+        cap, self._cap = self._cap, None
+        if cap is None:
+            return
+        self._reader_stop.set()
+        reader, self._reader = self._reader, None
+        if reader is not None:
+            reader.join(timeout=2.0)
+        try:
+            cap.release()
+        except Exception:
+            pass
+        self._mode_cache.clear()
+        self.mode = None
+        self.capture_fps = 0.0
+        with self._frame_lock:
+            self._latest = None
+            waiters, self._waiters = self._waiters, []
+        for loop, fut, _ in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, fut, None)
+            except RuntimeError:
+                pass
+        print("📷 카메라 해제 (구독자 없음)")
+
+    def _start_reader(self, cap: cv2.VideoCapture):
+        try:
+            # 드라이버 내부 큐에 오래된 프레임이 쌓이지 않도록
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        except Exception:
+            pass
+        self._cap = cap
+        self._reader_stop = threading.Event()
+        self._reader = threading.Thread(
+            target=self._reader_main, args=(cap, self._reader_stop),
+            name="camera-reader", daemon=True,
+        )
+        self._reader.start()
+
+    def _reader_main(self, cap: cv2.VideoCapture, stop: threading.Event):
+        """
+        전용 캡처 스레드. cap.read()가 느려도 UI 이벤트 루프는 영향받지 않습니다.
+        항상 마지막 프레임만 남기고, 대기 중인 소비자를 깨웁니다.
+        구독자 요구 해상도가 바뀌면 이 스레드에서 모드를 다시 협상합니다.
+        """
+        self._cur_req = None
+        while not stop.is_set():
+            want = self._want_req
+            if want is not None and want != self._cur_req:
+                self._apply_requirement(cap, want)
+                continue
+            if not self._read_and_publish(cap):
+                time.sleep(0.01)
+
+    def _apply_requirement(self, cap: cv2.VideoCapture, req):
+        cached = self._mode_cache.get(req)
+        if cached is not None:
+            apply_mode(cap, *cached.requested)
+            mode = cached
+        else:
+            print(f"📷 캡처 모드 협상: 요구 {req[0]}x{req[1]}")
+            mode = negotiate_mode(cap, req, lambda: self._read_and_publish(cap))
+            if mode is not None:
+                self._mode_cache[req] = mode
+        self._cur_req = req
+        self.mode = mode
+        if mode is not None:
+            print(f"📷 캡처 모드: {mode.describe()}")
+
+    def _read_and_publish(self, cap: cv2.VideoCapture) -> bool:
+        ok, image = cap.read()
+        if not ok or image is None:
+            return False
+        ts = time.time()
+        prev = self._latest
+        if prev is not None and ts > prev.ts:
+            inst = 1.0 / (ts - prev.ts)
+            self.capture_fps = inst if self.capture_fps <= 0 else 0.9 * self.capture_fps + 0.1 * inst
+        with self._frame_lock:
+            self._seq += 1
+            frame = Frame(image=image, ts=ts, seq=self._seq)
+            self._latest = frame
+            ready = [w for w in self._waiters if frame.seq > w[2]]
+            if ready:
+                self._waiters = [w for w in self._waiters if frame.seq <= w[2]]
+        for loop, fut, _ in ready:
+            try:
+                loop.call_soon_threadsafe(_resolve, fut, frame)
+            except RuntimeError:
+                pass  # 루프가 이미 닫힘
+        return True
+
+
+def _resolve(fut: asyncio.Future, value):
+    if not fut.done():
+        fut.set_result(value)
+
+
+_service: Optional[CameraService] = None
+
+
+def get_camera_service() -> CameraService:
+    global _service
+    if _service is None:
+        _service = CameraService()
+    return _service
@@ -1,8 +1,12 @@
 # utils/camerav2.py
 
 import os, time, importlib.util, pathlib, multiprocessing as mp
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence
 import cv2
 
+from utils.camera_profile import apply_profile, clear_profile, load_profile, profile_from_capture, save_profile
+
 # --- 공통: DLL 경로 주입 (최상위) ---
 def _add_cv2_dll_dir():
     spec = importlib.util.find_spec("cv2")
@@ -10,12 +14,14 @@ def _add_cv2_dll_dir():
         os.add_dll_directory(str(pathlib.Path(list(spec.submodule_search_locations)[0])))
 
 # --- 실제 프로브 작업 (자식 프로세스에서 실행) ---
+# 성공 시 장치 open부터 첫 프레임까지 걸린 시간(초), 실패 시 -1.0 을 q에 넣음
 def _probe_child_main(q, spec, backend, w, h, fourcc, warmup, read_wait):
     try:
         _add_cv2_dll_dir()
+        t0 = time.perf_counter()
         cap = cv2.VideoCapture(spec, backend)
         if not cap.isOpened():
-            q.put(False); return
+            q.put(-1.0); return
         try:
             if fourcc:
                 cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
@@ -25,17 +31,17 @@ def _probe_child_main(q, spec, backend, w, h, fourcc, warmup, read_wait):
         except Exception:
             pass
         t_end = time.time() + read_wait*(warmup+1) + 0.3
-        ok = False
+        ttff = -1.0
         while time.time() < t_end:
             r, frame = cap.read()
             if r and frame is not None:
-                ok = True
+                ttff = time.perf_counter() - t0
                 break
             time.sleep(0.02)
         cap.release()
-        q.put(ok)
+        q.put(ttff)
     except Exception:
-        q.put(False)
+        q.put(-1.0)
 
 # --- 타임아웃 래퍼 (최상위 함수) ---
 def _probe_with_timeout(spec, backend, timeout=1.2, w=640, h=480, fourcc="MJPG", warmup=3, read_wait=0.25):
@@ -52,13 +58,138 @@ def _probe_with_timeout(spec, backend, timeout=1.2, w=640, h=480, fourcc="MJPG",
         p.terminate(); p.join(0.2)
         return False
     try:
-        return bool(q.get_nowait())
+        return q.get() >= 0 if not q.empty() else False
     except Exception:
         return False
 
+# --- 병렬 프로브 ---
+@dataclass
+class ProbeResult:
+    index: int
+    backend: int
+    ok: bool
+    ttff: Optional[float]   # 장치 open → 첫 프레임까지 (자식 프로세스 측정, 초)
+    elapsed: float          # 프로세스 생성 ~ 결과 수신까지 (초)
+    status: str             # "ok" | "fail" | "timeout" | "cancelled"
+
+def _backend_name(be) -> str:
+    try:
+        return cv2.videoio_registry.getBackendName(be)
+    except Exception:
+        return str(be)
+
+def _print_probe_report(results: Sequence[ProbeResult]):
+    print("[camerav2] probe timing")
+    for r in sorted(results, key=lambda r: (r.index, r.backend)):
+        ttff = f"{r.ttff * 1000:7.0f}ms" if r.ttff is not None else "      -  "
+        print(f"  idx={r.index} {_backend_name(r.backend):<10} {r.status:<9} ttff={ttff} elapsed={r.elapsed * 1000:6.0f}ms")
+
+def discover_cameras_concurrent(
+    max_idx=8,
+    backends: Optional[Sequence[int]] = None,
+    max_workers=4,
+    probe_timeout=2.0,
+    total_timeout=8.0,
+    preferred: Optional[Callable[[ProbeResult], bool]] = None,
+    w=640, h=480, fourcc="MJPG",
+    report=True,
+) -> List[ProbeResult]:
+    """
+    (index, backend) 조합을 최대 max_workers개의 spawn 프로세스로 동시에 프로브합니다.
+    - 서로 다른 index만 동시에 열고, 한 index의 backend들은 backends 순서대로 하나씩 시도합니다
+      (같은 장치를 여러 backend가 동시에 열면 서로 막혀 fail/timeout, TTFF가 왜곡됨)
+    - preferred(result)가 True인 성공 결과가 나오면 나머지 프로브는 즉시 취소합니다.
+      기본값: 첫 번째 backend(DSHOW)로 성공한 경우
+    - 반환: 성공한 후보만 (index, ttff) 순으로 정렬한 목록
+    - report=True면 모든 프로브의 소요 시간을 출력합니다 (느린 backend 확인용)
+    """
+    _add_cv2_dll_dir()
+    if backends is None:
+        backends = [cv2.CAP_DSHOW, cv2.CAP_FFMPEG, cv2.CAP_ANY]
+    if preferred is None:
+        first_be = backends[0]
+        preferred = lambda r: r.backend == first_be
+    ctx = mp.get_context("spawn")
+    pending = [(idx, be) for idx in range(0, max_idx) for be in backends]
+    running = {}   # (idx, be) -> (process, queue, t_start)
+    results: List[ProbeResult] = []
+    start = time.perf_counter()
+    stop = False
+
+    def _finish(key, ok, ttff, status):
+        p, q, t0 = running.pop(key)
+        if p.is_alive():
+            p.terminate(); p.join(0.2)
+        try:
+            q.close()
+        except Exception:
+            pass
+        results.append(ProbeResult(key[0], key[1], ok, ttff, time.perf_counter() - t0, status))
+        return results[-1]
+
+    try:
+        while (pending or running) and not stop:
+            now = time.perf_counter()
+            if now - start > total_timeout:
+                break
+            while pending and len(running) < max_workers:
+                # 웹캠은 (Windows에서) 한 번에 한 프로세스만 열 수 있으므로 같은 index는 동시에 프로브하지 않음.
+                # 병렬은 index 사이에서만, 한 index의 backend들은 차례로
+                busy = {k[0] for k in running}
+                key = next((k for k in pending if k[0] not in busy), None)
+                if key is None:
+                    break
+                pending.remove(key)
+                q = ctx.SimpleQueue()
+                p = ctx.Process(
+                    target=_probe_child_main,
+                    args=(q, key[0], key[1], w, h, fourcc, 3, 0.25),
+                    daemon=True,
+                )
+                p.start()
+                running[key] = (p, q, time.perf_counter())
+            for key in list(running):
+                p, q, t0 = running[key]
+                # 종료 여부를 큐보다 먼저 확인: 결과를 넣고 막 종료한 자식을 실패로 보지 않도록
+                alive = p.is_alive()
+                if not q.empty():
+                    ttff = q.get()
+                    ok = ttff >= 0
+                    r = _finish(key, ok, ttff if ok else None, "ok" if ok else "fail")
+                    if ok and preferred(r):
+                        stop = True
+                        break
+                elif not alive:
+                    _finish(key, False, None, "fail")
+                elif time.perf_counter() - t0 > probe_timeout:
+                    _finish(key, False, None, "timeout")
+            time.sleep(0.01)
+    finally:
+        for key in list(running):
+            _finish(key, False, None, "cancelled")
+        for key in pending:
+            results.append(ProbeResult(key[0], key[1], False, None, 0.0, "cancelled"))
+    if report:
+        _print_probe_report([r for r in results if r.elapsed > 0])
+    return sorted((r for r in results if r.ok), key=lambda r: (r.index, r.ttff))
+
 # --- 카메라 검색/오픈 (예시) ---
-def discover_cameras(max_idx=8, total_timeout=8.0):
+def discover_cameras(max_idx=8, total_timeout=8.0, use_profile=True, concurrent=False):
     _add_cv2_dll_dir()
+    # 저장된 프로필이 있으면 그 조합 하나만 먼저 확인 (빠른 경로)
+    profile = load_profile() if use_profile else None
+    if profile is not None:
+        if _probe_with_timeout(profile.index, profile.backend, timeout=2.0,
+                               w=profile.width, h=profile.height, fourcc=profile.fourcc):
+            return [(profile.index, profile.backend)]
+    if concurrent:
+        ranked = discover_cameras_concurrent(max_idx=max_idx, total_timeout=total_timeout)
+        # 인덱스별 최상위 backend 하나씩 (순차 탐색과 같은 형태)
+        found, seen = [], set()
+        for r in ranked:
+            if r.index not in seen:
+                seen.add(r.index); found.append((r.index, r.backend))
+        return found
     start = time.time()
     BACKENDS = [cv2.CAP_DSHOW, cv2.CAP_FFMPEG, cv2.CAP_ANY]  # 설치본 안정 순서
     found = []
@@ -71,10 +202,19 @@ def discover_cameras(max_idx=8, total_timeout=8.0):
                 break
     return found
 
-def open_camera(max_idx=8, total_timeout=8.0):
-    cands = discover_cameras(max_idx=max_idx, total_timeout=total_timeout)
+def open_camera(max_idx=8, total_timeout=8.0, concurrent=False):
+    cands = discover_cameras(max_idx=max_idx, total_timeout=total_timeout, concurrent=concurrent)
+    profile = load_profile()
     for idx, be in cands:
         cap = cv2.VideoCapture(idx, be)
         if cap.isOpened():
+            if profile is not None and (profile.index, profile.backend) == (idx, be):
+                apply_profile(cap, profile)
+                return cap
+            save_profile(profile_from_capture(idx, be, cap))
             return cap
+    if profile is not None:
+        # 프로필이 더 이상 유효하지 않음 → 다음 실행은 전체 탐색
+        clear_profile()
     return None
+
@@ -1,13 +1,20 @@
+import numpy as np
+
 THRESH = dict(
     INV_TRIANGLE=1.12,   # S/H, S/W (Y형)
     PEAR=1.12,           # H/S (A형)
+    PEAR_WAIST=0.85,     # W/H (A형)
     HOURGLASS_WAIST=0.78,
+    HOURGLASS_BALANCE=0.08,  # |S/H - 1| (X형)
     O_ABDOMEN=1.10,      # A / max(S,H)
     O_WAIST_MALE=1.4,   # W / mean(S,H)
     O_WAIST_FEMALE=1.3
 )
 
-def classify_body_shape(gender, S, H, W, A):
+SHAPES = ("H", "O", "Y", "A", "X", "UNKNOWN")
+
+def classify_body_shape(gender, S, H, W, A, thresh=None):
+    T = THRESH if thresh is None else thresh
     eps = 1e-6
     if min(S, H, W) < eps:
         return "UNKNOWN"
@@ -16,14 +23,46 @@ def classify_body_shape(gender, S, H, W, A):
     hip_shoulder = H / (S + eps)
     waist_mean = W / (meanSH + eps)
     abdomen_max = A / max(S, H, eps)
-    o_waist_thr = THRESH['O_WAIST_MALE'] if gender == 'male' else THRESH['O_WAIST_FEMALE']
-    if abdomen_max >= THRESH['O_ABDOMEN'] and waist_mean >= o_waist_thr:
+    o_waist_thr = T['O_WAIST_MALE'] if gender == 'male' else T['O_WAIST_FEMALE']
+    if abdomen_max >= T['O_ABDOMEN'] and waist_mean >= o_waist_thr:
         return "O"
-    if shoulder_hip >= THRESH['INV_TRIANGLE'] and (S / (W + eps)) >= THRESH['INV_TRIANGLE']:
+    if shoulder_hip >= T['INV_TRIANGLE'] and (S / (W + eps)) >= T['INV_TRIANGLE']:
         return "Y"
     if gender == 'female':
-        if hip_shoulder >= THRESH['PEAR'] and (W / (H + eps)) <= 0.85:
+        if hip_shoulder >= T['PEAR'] and (W / (H + eps)) <= T['PEAR_WAIST']:
             return "A"
-        if abs(shoulder_hip - 1.0) <= 0.08 and waist_mean <= THRESH['HOURGLASS_WAIST']:
+        if abs(shoulder_hip - 1.0) <= T['HOURGLASS_BALANCE'] and waist_mean <= T['HOURGLASS_WAIST']:
             return "X"
     return "H"
+
+def classify_body_shape_array(gender, S, H, W, A, thresh=None):
+    """
+    classify_body_shape 의 배열 버전. S/H/W/A 는 같은 길이의 배열(또는 스칼라),
+    gender 는 문자열 하나 또는 행마다의 문자열 배열. 결과는 SHAPES 인덱스(int8) 배열이며
+    (유한한 입력에 대해) SHAPES[code] 가 스칼라 함수와 행마다 같습니다.
+    문자열이 필요하면 np.asarray(SHAPES)[codes].
+    """
+    T = THRESH if thresh is None else thresh
+    eps = 1e-6
+    S, H, W, A = (np.asarray(v, dtype=np.float64) for v in (S, H, W, A))
+    S, H, W, A = np.broadcast_arrays(S, H, W, A)
+    gender = np.asarray(gender)
+    male = gender == 'male'
+    female = gender == 'female'
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        meanSH = (S + H) / 2.0
+        shoulder_hip = S / (H + eps)
+        hip_shoulder = H / (S + eps)
+        waist_mean = W / (meanSH + eps)
+        abdomen_max = A / np.maximum(np.maximum(S, H), eps)
+        o_waist_thr = np.where(male, T['O_WAIST_MALE'], T['O_WAIST_FEMALE'])
+        conds = [
+            np.minimum(np.minimum(S, H), W) < eps,
+            (abdomen_max >= T['O_ABDOMEN']) & (waist_mean >= o_waist_thr),
+            (shoulder_hip >= T['INV_TRIANGLE']) & ((S / (W + eps)) >= T['INV_TRIANGLE']),
+            female & (hip_shoulder >= T['PEAR']) & ((W / (H + eps)) <= T['PEAR_WAIST']),
+            female & (np.abs(shoulder_hip - 1.0) <= T['HOURGLASS_BALANCE']) & (waist_mean <= T['HOURGLASS_WAIST']),
+        ]
+    choices = [np.int8(SHAPES.index(c)) for c in ("UNKNOWN", "O", "Y", "A", "X")]
+    return np.select(conds, choices, default=np.int8(SHAPES.index("H")))
@@ -0,0 +1,135 @@
+# utils/composite.py
+"""
+세그멘테이션 합성용 재사용 버퍼.
+
+스캔 루프는 매 프레임 같은 크기의 이미지를 다루므로, 마스크 이진화/배경 블러/합성 결과를
+프레임마다 새로 만들지 않고 미리 잡아 둔 버퍼에 OpenCV dst= 로 바로 씁니다.
+크기가 바뀔 때(카메라 모드 전환)만 다시 할당합니다.
+
+    comp = SegmentationCompositor()
+    frame = comp.flip(latest.image)              # 좌우 반전 (버퍼 재사용)
+    out = comp.next_output(frame.shape)          # 출력 버퍼 (2개를 번갈아 사용)
+    comp.set_mask(results.segmentation_mask)     # 합성용 마스크 1회 이진화 → comp.fg
+    comp.blur_composite(frame, blur, out)        # 배경 블러 + 사람 영역 원본
+    body = comp.body_mask((x0, y0, x1, y1), scale=0.5)   # 측정용: 몸통 ROI만, 축소 해상도로 정리
+
+측정용 마스크는 몸통 ROI(+ 모폴로지가 닿는 여백)만 잘라 scale 배율로 줄인 뒤 이진화/열림/닫힘을 합니다.
+커널도 배율에 맞춰 줄이고(5x5 → 0.5배에서 3x3), 결과(BodyMask)는 프레임 좌표로 되돌리는 변환을 같이 줍니다.
+scale=1.0 이면 전체 프레임에서 처리한 뒤 ROI를 자른 것과 같습니다.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from utils.blur import BlurEngine
+
+KERNEL_SIZE = 5
+OPEN_ITERS, CLOSE_ITERS = 1, 2
+
+
+@dataclass
+class BodyMask:
+    """정리된 몸통 마스크와 프레임 좌표 변환. mask 의 (0, 0) 은 프레임의 ROI 왼쪽 위."""
+    mask: np.ndarray
+    ox: float      # 프레임 x = ox + 열 / sx
+    oy: float      # 프레임 y = oy + 행 / sy
+    sx: float
+    sy: float
+
+    def row(self, y: float) -> int:
+        return int((y - self.oy) * self.sy)
+
+    def frame_x(self, col: float) -> int:
+        return int(round(self.ox + col / self.sx))
+
+    def frame_y(self, row: float) -> int:
+        return int(round(self.oy + row / self.sy))
+
+    def frame_width(self, w: float) -> float:
+        return float(w) / self.sx
+
+
+class SegmentationCompositor:
+    def __init__(self, fg_threshold: float = 0.1, body_threshold: float = 0.3, outputs: int = 2):
+        """
+        fg_threshold  : 이 값보다 크면 사람(원본 유지) — 배경 블러 합성용
+        body_threshold: 이 값보다 크면 몸 — 폭 측정용
+        outputs       : 출력 버퍼 개수. 직전 프레임 결과(last_frame)가 다음 프레임 처리 중에도 유지되도록 2개
+        """
+        self.fg_threshold = float(fg_threshold)
+        self.body_threshold = float(body_threshold)
+        self._buffers: Dict[str, np.ndarray] = {}
+        self._outputs = int(outputs)
+        self._out_idx = 0
+        self.fg = None     # uint8 0/255
+        self.mask = None   # 마지막 float 세그멘테이션 마스크 (측정용 ROI 처리에 사용)
+
+    def buffer(self, name: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != tuple(shape) or buf.dtype != dtype:
+            buf = self._buffers[name] = np.empty(shape, dtype=dtype)
+        return buf
+
+    def flip(self, image: np.ndarray) -> np.ndarray:
+        return cv2.flip(image, 1, dst=self.buffer("flip", image.shape))
+
+    def next_output(self, shape: Tuple[int, ...]) -> np.ndarray:
+        self._out_idx = (self._out_idx + 1) % self._outputs
+        return self.buffer(f"out{self._out_idx}", shape)
+
+    def set_mask(self, mask: np.ndarray) -> None:
+        """합성용으로 float 마스크를 한 번 이진화합니다. 측정용 이진화는 body_mask 에서 ROI만."""
+        self.mask = mask
+        self.fg = cv2.compare(mask, self.fg_threshold, cv2.CMP_GT, dst=self.buffer("fg", mask.shape[:2]))
+
+    def blur_composite(self, frame: np.ndarray, blur: BlurEngine, out: np.ndarray) -> np.ndarray:
+        """out = 사람 영역은 frame, 나머지는 블러된 frame (set_mask 이후 호출)."""
+        blur.apply(frame, dst=out)
+        cv2.copyTo(frame, self.fg, dst=out)
+        return out
+
+    def body_mask(self, roi: Optional[Tuple[int, int, int, int]] = None, scale: float = 1.0) -> BodyMask:
+        """set_mask 로 받은 마스크의 측정용 정리본 (clean_body_mask)."""
+        return clean_body_mask(self.mask, roi, scale, self.body_threshold)
+
+
+def clean_body_mask(mask: np.ndarray, roi: Optional[Tuple[int, int, int, int]] = None, scale: float = 1.0,
+                    threshold: float = 0.3) -> BodyMask:
+    """
+    측정용 마스크: 임계값 → 열림 1회(잡티 제거) → 닫힘 2회(구멍 메움).
+    roi  : 프레임 좌표 (x0, y0, x1, y1), 끝은 제외. None 이면 전체
+    scale: 처리 해상도 배율 (≤ 1). 커널 크기도 같은 배율로 줄임
+    """
+    H, W = mask.shape[:2]
+    x0, y0, x1, y1 = roi if roi is not None else (0, 0, W, H)
+    x0, x1 = max(0, min(W, int(x0))), max(0, min(W, int(x1)))
+    y0, y1 = max(0, min(H, int(y0))), max(0, min(H, int(y1)))
+    scale = min(1.0, max(0.05, float(scale)))
+
+    k = int(round(KERNEL_SIZE * scale)) | 1         # 홀수 (1이면 모폴로지 생략)
+    # 열림 + 닫힘×2 가 ROI 안쪽 결과에 영향을 주는 범위 (반경 × 침식/팽창 횟수)
+    margin = int(math.ceil((k // 2) * 2 * (OPEN_ITERS + CLOSE_ITERS) / scale))
+    mx0, my0 = max(0, x0 - margin), max(0, y0 - margin)
+    mx1, my1 = min(W, x1 + margin), min(H, y1 + margin)
+    if mx1 <= mx0 or my1 <= my0:
+        return BodyMask(np.zeros((0, 0), np.uint8), x0, y0, 1.0, 1.0)
+
+    src = mask[my0:my1, mx0:mx1]
+    if scale < 1.0:
+        sw, sh = max(1, int(round((mx1 - mx0) * scale))), max(1, int(round((my1 - my0) * scale)))
+        src = cv2.resize(src, (sw, sh), interpolation=cv2.INTER_AREA)
+    sx, sy = src.shape[1] / float(mx1 - mx0), src.shape[0] / float(my1 - my0)
+    binary = cv2.compare(src, threshold, cv2.CMP_GT)
+    if k > 1:
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (k, k))
+        binary = cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel, iterations=OPEN_ITERS)
+        binary = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel, iterations=CLOSE_ITERS)
+
+    # 여백을 잘라 ROI 만 남김
+    c0, c1 = int(round((x0 - mx0) * sx)), int(round((x1 - mx0) * sx))
+    r0, r1 = int(round((y0 - my0) * sy)), int(round((y1 - my0) * sy))
+    return BodyMask(binary[r0:r1, c0:c1], mx0 + c0 / sx, my0 + r0 / sy, sx, sy)
@@ -0,0 +1,262 @@
+# utils/frame_source.py
+"""
+카메라 컴포넌트가 소비하는 프레임 소스 추상화.
+
+- CameraSource         : 전역 CameraService (실제 웹캠)
+- VideoFileSource      : 동영상 파일
+- ImageSequenceSource  : 이미지 폴더 (파일명 정렬 순)
+- SyntheticSource      : 카메라 없이 생성한 테스트 프레임
+
+카메라가 아닌 소스는 fps(0 이하면 최대 속도)와 loop 를 지원합니다.
+SYLO_FRAME_SOURCE 환경 변수로 기본 소스를 바꿀 수 있습니다. 예)
+    SYLO_FRAME_SOURCE="video:./session.mp4?fps=24&loop=1"
+    SYLO_FRAME_SOURCE="images:./frames"
+    SYLO_FRAME_SOURCE="synthetic:1280x720?fps=30"
+    SYLO_FRAME_SOURCE="replay:./sessions/20250101-120000?speed=max"
+"""
+
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import parse_qs
+
+import cv2
+import numpy as np
+
+from utils.camera_service import Frame, get_camera_service
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp", ".webp")
+
+
+class FrameSource:
+    """컴포넌트가 사용하는 최소 인터페이스."""
+
+    async def start(self, owner, consumer: str = "preview", min_size=None) -> bool:
+        """
+        consumer / min_size 는 필요한 캡처 해상도 힌트입니다 (카메라만 사용, 나머지는 무시).
+        """
+        raise NotImplementedError
+
+    def stop(self, owner) -> None:
+        raise NotImplementedError
+
+    async def next_frame(self, after_seq: int = 0, timeout: float = 1.0) -> Optional[Frame]:
+        """seq > after_seq 인 다음 프레임. 없거나 끝났으면 None."""
+        raise NotImplementedError
+
+
+class CameraSource(FrameSource):
+    def __init__(self):
+        self.service = get_camera_service()
+
+    async def start(self, owner, consumer: str = "preview", min_size=None) -> bool:
+        return await self.service.subscribe(owner, consumer=consumer, min_size=min_size)
+
+    def stop(self, owner) -> None:
+        self.service.unsubscribe(owner)
+
+    async def next_frame(self, after_seq: int = 0, timeout: float = 1.0) -> Optional[Frame]:
+        return await self.service.next_frame(after_seq, timeout)
+
+
+class _PacedSource(FrameSource):
+    """
+    파일/합성 소스 공통: fps 간격으로 프레임을 내보내고, 끝에 도달하면 loop에 따라 되감습니다.
+    fps <= 0 이면 기다리지 않고 바로 다음 프레임을 반환합니다 (처리량 측정용).
+    """
+
+    def __init__(self, fps: float = 24.0, loop: bool = True):
+        self.fps = float(fps)
+        self.loop = bool(loop)
+        self.finished = False
+        self._seq = 0
+        self._t0 = 0.0
+        self._started = False
+
+    # 하위 클래스 구현
+    def _open(self) -> bool:
+        return True
+
+    def _close(self) -> None:
+        pass
+
+    def _read(self) -> Optional[np.ndarray]:
+        """다음 프레임. 끝이면 None."""
+        raise NotImplementedError
+
+    def _rewind(self) -> bool:
+        return False
+
+    async def start(self, owner, consumer: str = "preview", min_size=None) -> bool:
+        if not self._started:
+            self._started = await asyncio.to_thread(self._open)
+            self._seq = 0
+            self._t0 = time.time()
+            self.finished = False
+        return self._started
+
+    def stop(self, owner) -> None:
+        if self._started:
+            self._started = False
+            self._close()
+
+    async def next_frame(self, after_seq: int = 0, timeout: float = 1.0) -> Optional[Frame]:
+        if not self._started or self.finished:
+            return None
+        if self.fps > 0:
+            due = self._t0 + self._seq / self.fps
+            delay = due - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        image = await asyncio.to_thread(self._read)
+        if image is None and self.loop and self._rewind():
+            image = await asyncio.to_thread(self._read)
+        if image is None:
+            self.finished = True
+            return None
+        self._seq += 1
+        return Frame(image=image, ts=time.time(), seq=self._seq)
+
+
+class VideoFileSource(_PacedSource):
+    def __init__(self, path: str, fps: Optional[float] = None, loop: bool = True):
+        super().__init__(fps=fps if fps is not None else 0.0, loop=loop)
+        self.path = str(path)
+        self._fps_from_file = fps is None
+        self._cap: Optional[cv2.VideoCapture] = None
+
+    def _open(self) -> bool:
+        self._cap = cv2.VideoCapture(self.path)
+        if not self._cap.isOpened():
+            print(f"❌ 동영상 열기 실패: {self.path}")
+            return False
+        if self._fps_from_file:
+            self.fps = float(self._cap.get(cv2.CAP_PROP_FPS) or 24.0)
+        return True
+
+    def _close(self) -> None:
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+    def _read(self) -> Optional[np.ndarray]:
+        if self._cap is None:
+            return None
+        ok, frame = self._cap.read()
+        return frame if ok else None
+
+    def _rewind(self) -> bool:
+        return self._cap is not None and self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+
+class ImageSequenceSource(_PacedSource):
+    def __init__(self, directory: str, fps: float = 24.0, loop: bool = True):
+        super().__init__(fps=fps, loop=loop)
+        self.directory = Path(directory)
+        self._files: List[Path] = []
+        self._pos = 0
+
+    def _open(self) -> bool:
+        self._pos = 0
+        try:
+            self._files = sorted(p for p in self.directory.iterdir() if p.suffix.lower() in IMAGE_EXTS)
+        except OSError as e:   # 없는 경로, 폴더가 아님, 권한 등
+            self._files = []
+            print(f"❌ 이미지 폴더 열기 실패: {self.directory} ({e})")
+            return False
+        if not self._files:
+            print(f"❌ 이미지 없음: {self.directory}")
+        return bool(self._files)
+
+    def _read(self) -> Optional[np.ndarray]:
+        while self._pos < len(self._files):
+            img = cv2.imread(str(self._files[self._pos]), cv2.IMREAD_COLOR)
+            self._pos += 1
+            if img is not None:
+                return img
+        return None
+
+    def _rewind(self) -> bool:
+        self._pos = 0
+        return bool(self._files)
+
+
+class SyntheticSource(_PacedSource):
+    """
+    카메라 없는 빌드 머신용 합성 프레임. 배경 그라디언트 위에 좌우로 천천히 흔들리는
+    사람 형태(머리/몸통/다리)를 그립니다. frames 개수만큼 만들고 loop면 반복합니다.
+    """
+
+    def __init__(self, width: int = 1280, height: int = 720, fps: float = 24.0,
+                 loop: bool = True, frames: int = 240):
+        super().__init__(fps=fps, loop=loop)
+        self.width = int(width)
+        self.height = int(height)
+        self.frames = int(frames)
+        self._i = 0
+        self._bg: Optional[np.ndarray] = None
+
+    def _open(self) -> bool:
+        grad = np.linspace(40, 160, self.width, dtype=np.float32)
+        bg = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        bg[:] = grad.astype(np.uint8)[None, :, None]
+        self._bg = bg
+        self._i = 0
+        return True
+
+    def _read(self) -> Optional[np.ndarray]:
+        if self._i >= self.frames:
+            return None
+        w, h = self.width, self.height
+        img = self._bg.copy()
+        cx = int(w / 2 + 0.05 * w * np.sin(self._i / 12.0))
+        unit = h / 10.0
+        color = (70, 90, 200)
+        cv2.circle(img, (cx, int(1.6 * unit)), int(0.7 * unit), color, -1, cv2.LINE_AA)
+        cv2.ellipse(img, (cx, int(4.6 * unit)), (int(1.3 * unit), int(2.2 * unit)), 0, 0, 360, color, -1, cv2.LINE_AA)
+        cv2.rectangle(img, (cx - int(1.0 * unit), int(6.0 * unit)), (cx - int(0.2 * unit), h), color, -1)
+        cv2.rectangle(img, (cx + int(0.2 * unit), int(6.0 * unit)), (cx + int(1.0 * unit), h), color, -1)
+        self._i += 1
+        return img
+
+    def _rewind(self) -> bool:
+        self._i = 0
+        return True
+
+
+def source_from_spec(spec: str) -> FrameSource:
+    """
+    "camera" | "video:<path>" | "images:<dir>" | "synthetic[:WxH]" | "replay:<session>"
+    형식의 문자열로 소스를 만듭니다. 뒤에 ?fps=..&loop=0|1 (replay는 ?speed=recorded|max)
+    쿼리를 붙일 수 있습니다.
+    """
+    spec = (spec or "camera").strip()
+    kind, _, rest = spec.partition(":")
+    target, _, query = rest.partition("?")
+    if not rest and "?" in kind:
+        kind, _, query = kind.partition("?")
+    q = {k: v[-1] for k, v in parse_qs(query).items()}
+    fps = float(q["fps"]) if "fps" in q else None
+    loop = q.get("loop", "1") not in ("0", "false", "no")
+    kind = kind.lower()
+    if kind == "camera":
+        return CameraSource()
+    if kind == "video":
+        return VideoFileSource(target, fps=fps, loop=loop)
+    if kind == "images":
+        return ImageSequenceSource(target, fps=fps if fps is not None else 24.0, loop=loop)
+    if kind == "synthetic":
+        w, h = 1280, 720
+        if target:
+            w, h = (int(v) for v in target.lower().split("x"))
+        return SyntheticSource(w, h, fps=fps if fps is not None else 24.0, loop=loop)
+    if kind == "replay":
+        from utils.session import ReplaySource
+        return ReplaySource(target, speed=q.get("speed", "recorded"), loop=q.get("loop", "0") not in ("0", "false", "no"))
+    raise ValueError(f"알 수 없는 프레임 소스: {spec}")
+
+
+def default_source() -> FrameSource:
+    return source_from_spec(os.environ.get("SYLO_FRAME_SOURCE", "camera"))
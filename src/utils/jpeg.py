@@ -0,0 +1,206 @@
+# utils/jpeg.py
+"""
+JPEG 인코더 백엔드.
+
+- turbojpeg  : PyTurboJPEG (libjpeg-turbo). 설치돼 있을 때만. 크로마 서브샘플링/fast DCT 지원
+- simplejpeg : simplejpeg (libjpeg-turbo 내장 휠). 설치돼 있을 때만
+- opencv     : cv2.imencode (항상 사용 가능, 서브샘플링만 지정)
+
+get_jpeg_encoder()는 처음 호출될 때 사용 가능한 백엔드를 짧게 벤치마크해 가장 빠른 것을 고르고
+선택 결과와 처리량을 로그로 남깁니다. SYLO_JPEG_ENCODER=opencv|turbojpeg|simplejpeg 로 고정할 수 있습니다.
+
+    cd src
+    python -m utils.jpeg [--size 428x720] [--quality 75] [--repeats 100]
+"""
+
+import argparse
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+SUBSAMPLINGS = ("444", "422", "420")
+
+
+class JpegEncoder:
+    name = "base"
+
+    def __init__(self, subsampling: str = "420", fast_dct: bool = True):
+        self.subsampling = subsampling if subsampling in SUBSAMPLINGS else "420"
+        self.fast_dct = bool(fast_dct)
+
+    def encode(self, img_bgr: np.ndarray, quality: int) -> Optional[bytes]:
+        """BGR uint8 이미지를 JPEG 바이트로. 실패하면 None."""
+        raise NotImplementedError
+
+    def describe(self) -> str:
+        return f"{self.name} ({self.subsampling[0]}:{self.subsampling[1]}:{self.subsampling[2]}{', fastdct' if self.fast_dct else ''})"
+
+
+class OpenCVEncoder(JpegEncoder):
+    name = "opencv"
+
+    def __init__(self, subsampling: str = "420", fast_dct: bool = False):
+        super().__init__(subsampling, fast_dct=False)   # OpenCV는 DCT 방식을 지정할 수 없음
+        self._extra = []
+        if hasattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR"):
+            factor = {
+                "444": getattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR_444", None),
+                "422": getattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR_422", None),
+                "420": getattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR_420", None),
+            }[self.subsampling]
+            if factor is not None:
+                self._extra = [int(cv2.IMWRITE_JPEG_SAMPLING_FACTOR), int(factor)]
+
+    def encode(self, img_bgr: np.ndarray, quality: int) -> Optional[bytes]:
+        ok, buf = cv2.imencode(".jpg", img_bgr, [int(cv2.IMWRITE_JPEG_QUALITY), int(quality)] + self._extra)
+        return buf.tobytes() if ok else None
+
+
+class TurboJpegEncoder(JpegEncoder):
+    name = "turbojpeg"
+
+    def __init__(self, subsampling: str = "420", fast_dct: bool = True):
+        super().__init__(subsampling, fast_dct)
+        import turbojpeg   # PyTurboJPEG (없으면 ImportError)
+        self._tj = turbojpeg.TurboJPEG()
+        self._samp = {"444": turbojpeg.TJSAMP_444, "422": turbojpeg.TJSAMP_422, "420": turbojpeg.TJSAMP_420}[self.subsampling]
+        self._flags = turbojpeg.TJFLAG_FASTDCT if self.fast_dct else 0
+
+    def encode(self, img_bgr: np.ndarray, quality: int) -> Optional[bytes]:
+        return self._tj.encode(np.ascontiguousarray(img_bgr), quality=int(quality),
+                               jpeg_subsample=self._samp, flags=self._flags)
+
+
+class SimpleJpegEncoder(JpegEncoder):
+    name = "simplejpeg"
+
+    def __init__(self, subsampling: str = "420", fast_dct: bool = True):
+        super().__init__(subsampling, fast_dct)
+        import simplejpeg   # 없으면 ImportError
+        self._sj = simplejpeg
+
+    def encode(self, img_bgr: np.ndarray, quality: int) -> Optional[bytes]:
+        return self._sj.encode_jpeg(np.ascontiguousarray(img_bgr), quality=int(quality), colorspace="BGR",
+                                    colorsubsampling=self.subsampling, fastdct=self.fast_dct)
+
+
+BACKENDS = {
+    "turbojpeg": TurboJpegEncoder,
+    "simplejpeg": SimpleJpegEncoder,
+    "opencv": OpenCVEncoder,
+}
+
+
+def available_encoders(subsampling: str = "420", fast_dct: bool = True) -> List[JpegEncoder]:
+    """설치된 백엔드 인스턴스 목록 (opencv는 항상 포함)."""
+    out = []
+    for name, cls in BACKENDS.items():
+        try:
+            out.append(cls(subsampling=subsampling, fast_dct=fast_dct))
+        except Exception:
+            continue   # 모듈/라이브러리 없음
+    return out
+
+
+@dataclass
+class BenchResult:
+    encoder: JpegEncoder
+    ms: float
+    fps: float
+    bytes: int
+
+
+def bench_frame(width: int = 428, height: int = 720) -> np.ndarray:
+    """카메라 프레임과 비슷한 압축 난이도의 테스트 이미지 (그라디언트 + 도형 + 약한 노이즈)."""
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, width, dtype=np.float32)[None, :]
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    img = np.dstack([(x + y) / 2, np.repeat(x, height, 0), np.repeat(y, width, 1)]).astype(np.uint8)
+    cv2.circle(img, (width // 2, height // 4), max(4, height // 10), (70, 90, 200), -1, cv2.LINE_AA)
+    cv2.rectangle(img, (width // 3, height // 3), (2 * width // 3, height - 10), (40, 160, 90), -1)
+    noise = rng.integers(-8, 9, img.shape, dtype=np.int16)
+    return np.clip(img.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def benchmark(encoders: List[JpegEncoder], frame: np.ndarray, quality: int = 75, repeats: int = 30) -> List[BenchResult]:
+    results = []
+    for enc in encoders:
+        try:
+            data = enc.encode(frame, quality)   # 워밍업
+            t0 = time.perf_counter()
+            for _ in range(repeats):
+                data = enc.encode(frame, quality)
+            dt = (time.perf_counter() - t0) / repeats
+        except Exception as e:
+            print(f"  [jpeg] {enc.name} 실패: {e}")
+            continue
+        results.append(BenchResult(enc, dt * 1000.0, 1.0 / dt if dt > 0 else 0.0, len(data or b"")))
+    return sorted(results, key=lambda r: r.ms)
+
+
+_encoder: Optional[JpegEncoder] = None
+_encoder_lock = threading.Lock()
+
+
+def get_jpeg_encoder() -> JpegEncoder:
+    """프로세스 전역 JPEG 인코더. 첫 호출 때 벤치마크로 선택하고 로그를 남깁니다."""
+    global _encoder
+    with _encoder_lock:
+        if _encoder is not None:
+            return _encoder
+        forced = os.environ.get("SYLO_JPEG_ENCODER", "").strip().lower()
+        candidates = available_encoders()
+        if forced:
+            picked = [e for e in candidates if e.name == forced]
+            if not picked:
+                print(f"⚠️ JPEG 인코더 '{forced}' 사용 불가 → 자동 선택")
+            candidates = picked or candidates
+        frame = bench_frame()
+        results = benchmark(candidates, frame, repeats=10)
+        if results:
+            best = results[0]
+            _encoder = best.encoder
+            h, w = frame.shape[:2]
+            print(f"🖼 JPEG 인코더: {best.encoder.describe()} — {best.fps:.0f} fps @ {w}x{h} ({best.ms:.2f}ms)")
+        else:
+            _encoder = OpenCVEncoder()
+            print(f"🖼 JPEG 인코더: {_encoder.describe()}")
+        return _encoder
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="JPEG 인코더 백엔드 벤치마크")
+    ap.add_argument("--size", default="428x720", help="WxH (기본: 595x1000 창에 맞춘 720p 크롭)")
+    ap.add_argument("--quality", type=int, default=75)
+    ap.add_argument("--repeats", type=int, default=100)
+    ap.add_argument("--image", help="테스트 이미지 경로 (없으면 합성 이미지)")
+    args = ap.parse_args(argv)
+
+    if args.image:
+        frame = cv2.imread(args.image, cv2.IMREAD_COLOR)
+        if frame is None:
+            raise SystemExit(f"이미지를 읽을 수 없습니다: {args.image}")
+    else:
+        w, h = (int(v) for v in args.size.lower().split("x"))
+        frame = bench_frame(w, h)
+
+    encoders = []
+    for samp in SUBSAMPLINGS:
+        for fast in (True, False):
+            for enc in available_encoders(samp, fast):
+                if enc.fast_dct == fast and not any(e.describe() == enc.describe() for e in encoders):
+                    encoders.append(enc)
+    print(f"frame {frame.shape[1]}x{frame.shape[0]}, quality {args.quality}, repeats {args.repeats}")
+    results = benchmark(encoders, frame, args.quality, args.repeats)
+    for i, r in enumerate(results):
+        mark = "  ← 가장 빠름" if i == 0 else ""
+        print(f"  {r.encoder.describe():<32} {r.ms:7.2f}ms  {r.fps:7.0f} fps  {r.bytes / 1024:7.1f}KB{mark}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+# utils/overlay.py
+"""
+의상 PNG(BGRA) 합성.
+
+의상 이미지는 로드할 때 한 번 premultiplied(색 × 알파) 로 바꿔 둡니다. 그러면 프레임마다
+    out = ov_pm + bg × (255 - a) / 255
+만 계산하면 되고, float32 변환 없이 uint8 OpenCV 연산(cv2.multiply scale=, cv2.add)으로
+대상 ROI 에 바로 씁니다. 알파가 0인 가장자리 행/열(회전하면 생기는 빈 모서리 포함)은 건너뜁니다.
+premultiplied 이미지는 resize/warpAffine 보간에서도 투명 가장자리가 어둡게 번지지 않습니다.
+
+    ov_pm = premultiply(bgra, opacity=1.0)         # 로드 시 1회
+    blend_premultiplied(frame_bgr, ov_pm, (x, y))  # 프레임마다 (frame_bgr 를 제자리 수정)
+
+GarmentWarper 는 확대/축소 + 회전 + 앵커 이동을 affine 행렬 하나로 묶어 warpAffine 한 번으로
+의상이 차지하는 박스 크기의 이미지를 만듭니다 (resize → 회전 캔버스 → 앵커 재계산 대신).
+양자화한 (scale, angle) 로 LRU 캐시해 사용자가 가만히 서 있으면 다시 warp 하지 않습니다.
+
+    warper = GarmentWarper(ov_pm, anchor=(0.5, 0.08))
+    canvas, (ax, ay) = warper.render(scale, angle_deg)
+    blend_premultiplied(frame_bgr, canvas, (round(tx - ax), round(ty - ay)))
+
+    cd src
+    python -m utils.overlay [--garment assets/images/fitting/.../1.png] [--size 1280x720] [--repeats 100]
+"""
+
+import argparse
+import math
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def premultiply(bgra: Optional[np.ndarray], opacity: float = 1.0) -> Optional[np.ndarray]:
+    """straight BGRA → premultiplied BGRA (uint8). opacity(전체 투명도)도 여기서 미리 곱합니다."""
+    if bgra is None:
+        return None
+    alpha = bgra[:, :, 3]
+    if opacity < 1.0:
+        alpha = cv2.convertScaleAbs(alpha, alpha=max(0.0, float(opacity)))
+    alpha3 = cv2.merge((alpha, alpha, alpha))
+    color = cv2.multiply(np.ascontiguousarray(bgra[:, :, :3]), alpha3, scale=1.0 / 255.0)
+    return cv2.merge((*cv2.split(color), alpha))
+
+
+def _clip(base_shape, ov_shape, top_left_xy) -> Optional[Tuple[int, int, int, int, int, int]]:
+    """(base 의 x1, y1, x2, y2, overlay 안의 ox, oy). 겹치지 않으면 None."""
+    x, y = int(top_left_xy[0]), int(top_left_xy[1])
+    h, w = ov_shape[:2]
+    H, W = base_shape[:2]
+    x1, y1 = max(x, 0), max(y, 0)
+    x2, y2 = min(x + w, W), min(y + h, H)
+    if x1 >= x2 or y1 >= y2:
+        return None
+    return x1, y1, x2, y2, x1 - x, y1 - y
+
+
+def blend_premultiplied(base_bgr: np.ndarray, overlay_pm: Optional[np.ndarray], top_left_xy) -> np.ndarray:
+    """premultiplied BGRA 를 base_bgr 의 top_left_xy 위치에 제자리 합성합니다."""
+    if overlay_pm is None:
+        return base_bgr
+    box = _clip(base_bgr.shape, overlay_pm.shape, top_left_xy)
+    if box is None:
+        return base_bgr
+    x1, y1, x2, y2, ox, oy = box
+    ov = overlay_pm[oy:oy + (y2 - y1), ox:ox + (x2 - x1)]
+
+    # 완전히 투명한 가장자리 행/열 제외
+    alpha = cv2.extractChannel(ov, 3)
+    bx, by, bw, bh = cv2.boundingRect(alpha)
+    if bw == 0 or bh == 0:
+        return base_bgr
+    ov = ov[by:by + bh, bx:bx + bw]
+    alpha = alpha[by:by + bh, bx:bx + bw]
+    bg = base_bgr[y1 + by:y1 + by + bh, x1 + bx:x1 + bx + bw]
+
+    inv = cv2.bitwise_not(alpha)   # 255 - a
+    cv2.multiply(bg, cv2.merge((inv, inv, inv)), dst=bg, scale=1.0 / 255.0)
+    cv2.add(bg, cv2.cvtColor(ov, cv2.COLOR_BGRA2BGR), dst=bg)
+    return base_bgr
+
+
+class GarmentWarper:
+    def __init__(self, overlay_pm: np.ndarray, anchor: Tuple[float, float] = (0.5, 0.0), cache_size: int = 32,
+                 scale_step: float = 0.005, angle_step: float = 0.5):
+        """
+        overlay_pm : premultiplied BGRA 원본
+        anchor     : 원본 크기 대비 앵커 위치 (가로, 세로 비율). 회전 중심이자 배치 기준점
+        cache_size : LRU 캐시 개수 (0이면 캐시 없이 매번 정확한 값으로 warp)
+        scale_step : 캐시 키 배율 양자화 (상대값, 0.005 = 0.5%)
+        angle_step : 캐시 키 각도 양자화 (도)
+        """
+        # 큰 원본을 한 번에 많이 줄이면 bilinear 샘플링이 계단지므로 1/2씩 줄인 단계를 미리 만들어 둠
+        self.levels = [overlay_pm]
+        while min(self.levels[-1].shape[:2]) >= 64:
+            self.levels.append(cv2.pyrDown(self.levels[-1]))
+        h, w = overlay_pm.shape[:2]
+        self.anchor = (w * float(anchor[0]), h * float(anchor[1]))
+        self.cache_size = max(0, int(cache_size))
+        self.scale_step = float(scale_step)
+        self.angle_step = float(angle_step)
+        self._cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.levels[0].shape
+
+    def render(self, scale: float, angle_deg: float) -> Tuple[np.ndarray, Tuple[float, float]]:
+        """(의상 박스 크기의 premultiplied BGRA, 그 안에서의 앵커 좌표)."""
+        if self.cache_size == 0:
+            return self._warp(scale, angle_deg)
+        log_step = math.log1p(self.scale_step)
+        key = (round(math.log(max(scale, 1e-3)) / log_step), round(angle_deg / self.angle_step))
+        hit = self._cache.get(key)
+        if hit is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return hit
+        self.misses += 1
+        out = self._warp(math.exp(key[0] * log_step), key[1] * self.angle_step)
+        self._cache[key] = out
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return out
+
+    def _warp(self, scale: float, angle_deg: float) -> Tuple[np.ndarray, Tuple[float, float]]:
+        # 배율이 0.5 이상 남도록 피라미드 단계 선택 (단계 L 은 원본의 1/2^L)
+        level = min(len(self.levels) - 1, max(0, int(math.floor(math.log2(1.0 / max(scale, 1e-3))))))
+        src = self.levels[level]
+        f = 2 ** level
+        ax, ay = self.anchor[0] / f, self.anchor[1] / f
+        # 앵커 기준 회전 + 배율 한 번에, 그다음 의상 박스 원점으로 이동
+        M = cv2.getRotationMatrix2D((ax, ay), float(angle_deg), float(scale) * f)
+        h, w = src.shape[:2]
+        corners = np.array([[0, 0, 1], [w, 0, 1], [0, h, 1], [w, h, 1]], dtype=np.float64) @ M.T
+        x0, y0 = math.floor(corners[:, 0].min()), math.floor(corners[:, 1].min())
+        x1, y1 = math.ceil(corners[:, 0].max()), math.ceil(corners[:, 1].max())
+        M[0, 2] -= x0
+        M[1, 2] -= y0
+        canvas = cv2.warpAffine(src, M, (max(1, x1 - x0), max(1, y1 - y0)), flags=cv2.INTER_LINEAR,
+                                borderMode=cv2.BORDER_CONSTANT, borderValue=(0, 0, 0, 0))
+        return canvas, (ax - x0, ay - y0)
+
+
+def reference_overlay(base_bgr: np.ndarray, overlay_bgra: np.ndarray, top_left_xy, global_opacity: float = 1.0) -> np.ndarray:
+    """기존 합성 (straight 알파, float32). 벤치마크 기준."""
+    box = _clip(base_bgr.shape, overlay_bgra.shape, top_left_xy)
+    if box is None:
+        return base_bgr
+    x1, y1, x2, y2, ox, oy = box
+    ov = overlay_bgra[oy:oy + (y2 - y1), ox:ox + (x2 - x1), :]
+    bg = base_bgr[y1:y2, x1:x2, :]
+    alpha = ov[:, :, 3:4].astype(np.float32) / 255.0
+    alpha = np.clip(alpha * float(global_opacity), 0.0, 1.0)
+    out = alpha * ov[:, :, :3].astype(np.float32) + (1.0 - alpha) * bg.astype(np.float32)
+    base_bgr[y1:y2, x1:x2, :] = out.astype(np.uint8)
+    return base_bgr
+
+
+def _test_garment(width: int = 420, height: int = 620) -> np.ndarray:
+    """셔츠 모양 테스트 의상 (안티에일리어싱 가장자리)."""
+    img = np.zeros((height, width, 4), dtype=np.uint8)
+    body = np.array([[width * 0.3, 0], [width * 0.7, 0], [width, height * 0.25], [width * 0.8, height * 0.35],
+                     [width * 0.8, height], [width * 0.2, height], [width * 0.2, height * 0.35], [0, height * 0.25]],
+                    dtype=np.int32)
+    cv2.fillPoly(img, [body], (60, 90, 200, 255), cv2.LINE_AA)
+    return img
+
+
+def _rotated(ov: np.ndarray, angle: float) -> np.ndarray:
+    h, w = ov.shape[:2]
+    M = cv2.getRotationMatrix2D((w / 2.0, h / 2.0), angle, 1.0)
+    cos, sin = abs(M[0, 0]), abs(M[0, 1])
+    nW, nH = int(h * sin + w * cos), int(h * cos + w * sin)
+    M[0, 2] += nW / 2.0 - w / 2.0
+    M[1, 2] += nH / 2.0 - h / 2.0
+    return cv2.warpAffine(ov, M, (nW, nH), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT, borderValue=(0, 0, 0, 0))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="의상 오버레이 합성 벤치마크 (기존 float 경로 대비)")
+    ap.add_argument("--garment", help="의상 PNG (없으면 합성 이미지)")
+    ap.add_argument("--size", default="1280x720", help="카메라 프레임 WxH")
+    ap.add_argument("--height", type=float, default=0.85, help="프레임 높이 대비 의상 높이")
+    ap.add_argument("--angle", type=float, default=8.0, help="의상 회전 각도 (도)")
+    ap.add_argument("--repeats", type=int, default=100)
+    args = ap.parse_args(argv)
+
+    W, H = (int(v) for v in args.size.lower().split("x"))
+    if args.garment:
+        garment = cv2.imread(args.garment, cv2.IMREAD_UNCHANGED)
+        if garment is None or garment.ndim != 3 or garment.shape[2] != 4:
+            raise SystemExit(f"BGRA 이미지를 읽을 수 없습니다: {args.garment}")
+    else:
+        garment = _test_garment()
+    s = args.height * H / garment.shape[0]
+    size = (max(1, int(garment.shape[1] * s)), max(1, int(garment.shape[0] * s)))
+    straight = _rotated(cv2.resize(garment, size, interpolation=cv2.INTER_LINEAR), args.angle)
+    pm = _rotated(cv2.resize(premultiply(garment), size, interpolation=cv2.INTER_LINEAR), args.angle)
+    top_left = ((W - straight.shape[1]) // 2, (H - straight.shape[0]) // 3)
+
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, (H, W, 3), dtype=np.uint8)
+
+    def _time(fn, ov):
+        out = frame.copy()
+        fn(out, ov, top_left)
+        t0 = time.perf_counter()
+        for _ in range(args.repeats):
+            np.copyto(out, frame)
+            fn(out, ov, top_left)
+        t1 = time.perf_counter()
+        for _ in range(args.repeats):   # 복사 비용은 빼고 보고
+            np.copyto(out, frame)
+        t2 = time.perf_counter()
+        return ((t1 - t0) - (t2 - t1)) / args.repeats * 1000.0, fn(out, ov, top_left)
+
+    def _diff(a, b):
+        d = np.abs(a.astype(np.int16) - b.astype(np.int16))
+        return f"최대 {int(d.max())}, 평균 {float(d.mean()):.3f}"
+
+    ref_ms, ref = _time(reference_overlay, straight)
+    pm_ms, out = _time(blend_premultiplied, pm)
+    # 같은 (회전된) 이미지를 premultiply 해서 합성 → 순수 산술 오차
+    same = blend_premultiplied(frame.copy(), premultiply(straight), top_left)
+    print(f"frame {W}x{H}, overlay {straight.shape[1]}x{straight.shape[0]} (angle {args.angle}°), repeats {args.repeats}")
+    print(f"  float32 straight alpha (기존)   {ref_ms:7.2f}ms")
+    print(f"  uint8 premultiplied            {pm_ms:7.2f}ms  x{ref_ms / max(pm_ms, 1e-6):4.1f}")
+    print(f"  산술 오차: {_diff(same, ref)} (8bit)")
+    print(f"  가장자리 보간 차이 (premultiplied 보간): {_diff(out, ref)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# utils/perf.py
+"""
+프레임 루프 단계별 소요 시간 측정.
+
+    timer = StageTimer()
+    with timer.stage("pose"):
+        ...
+    timer.start("measure"); ...; timer.stop("measure")
+    timer.frame_done()
+    timer.summary()  # {"pose": {"count":..,"mean_ms":..,"p50_ms":..,"p95_ms":..,"max_ms":..}, ...}
+"""
+
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class StageTimer:
+    def __init__(self, history: int = 2000):
+        self._samples: Dict[str, deque] = defaultdict(lambda: deque(maxlen=history))
+        self._open: Dict[str, float] = {}
+        self.frames = 0
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._samples[name].append(time.perf_counter() - t0)
+
+    def start(self, name: str) -> None:
+        self._open[name] = time.perf_counter()
+
+    def stop(self, name: str) -> None:
+        t0 = self._open.pop(name, None)
+        if t0 is not None:
+            self._samples[name].append(time.perf_counter() - t0)
+
+    def add(self, name: str, secs: float) -> None:
+        self._samples[name].append(float(secs))
+
+    def last_ms(self, name: str) -> Optional[float]:
+        """name 단계의 가장 최근 측정값 (ms). 없으면 None."""
+        dq = self._samples.get(name)
+        return round(dq[-1] * 1000.0, 3) if dq else None
+
+    def frame_done(self) -> None:
+        self.frames += 1
+
+    def reset(self) -> None:
+        self._samples.clear()
+        self._open.clear()
+        self.frames = 0
+
+    def summary(self) -> Dict[str, dict]:
+        out = {}
+        for name, dq in self._samples.items():
+            if not dq:
+                continue
+            arr = np.asarray(dq, dtype=np.float64) * 1000.0
+            out[name] = {
+                "count": int(arr.size),
+                "mean_ms": round(float(arr.mean()), 3),
+                "p50_ms": round(float(np.percentile(arr, 50)), 3),
+                "p95_ms": round(float(np.percentile(arr, 95)), 3),
+                "max_ms": round(float(arr.max()), 3),
+            }
+        return out
@@ -0,0 +1,49 @@
+# utils/pose_results.py
+"""
+MediaPipe Pose 결과 ↔ numpy 변환.
+
+녹화/재생, 추론 워커 프로세스처럼 랜드마크를 배열로 주고받는 곳에서
+pose.process() 결과와 같은 모양(pose_landmarks.landmark[i].x ..., segmentation_mask)의
+객체를 다시 만들 때 사용합니다.
+"""
+
+from typing import Optional
+
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+NUM_LANDMARKS = 33
+
+
+class PoseResults:
+    """pose.process() 반환값과 같은 속성을 갖는 가벼운 결과 객체."""
+
+    __slots__ = ("pose_landmarks", "segmentation_mask")
+
+    def __init__(self, pose_landmarks=None, segmentation_mask: Optional[np.ndarray] = None):
+        self.pose_landmarks = pose_landmarks
+        self.segmentation_mask = segmentation_mask
+
+
+def landmarks_to_array(pose_landmarks) -> Optional[np.ndarray]:
+    """NormalizedLandmarkList → (33, 4) float32 [x, y, z, visibility]. 없으면 None."""
+    if not pose_landmarks:
+        return None
+    return np.array(
+        [(p.x, p.y, p.z, p.visibility) for p in pose_landmarks.landmark],
+        dtype=np.float32,
+    )
+
+
+def array_to_landmarks(arr: Optional[np.ndarray]):
+    """(N, 4) 배열 → NormalizedLandmarkList (mp_drawing.draw_landmarks 에 그대로 사용 가능)."""
+    if arr is None:
+        return None
+    out = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z, v in np.asarray(arr, dtype=np.float32):
+        out.landmark.add(x=float(x), y=float(y), z=float(z), visibility=float(v))
+    return out
+
+
+def results_from_arrays(landmarks: Optional[np.ndarray], mask: Optional[np.ndarray] = None) -> PoseResults:
+    return PoseResults(array_to_landmarks(landmarks), mask)
@@ -0,0 +1,183 @@
+# utils/pose_tracker.py
+"""
+ROI(관심 영역) 크롭 포즈 추론.
+
+직전 프레임에서 찾은 어깨/엉덩이 주변을 여유 있게 잘라 작은 입력 크기로 추론하고
+랜드마크/세그멘테이션 마스크를 원본 프레임 좌표로 되돌립니다. 전체 720p 프레임 대신
+작은 크롭만 색 변환/추론하므로 프레임당 비용이 줄어듭니다.
+추적을 놓치면(랜드마크 없음, 어깨/엉덩이 가시성 부족) 같은 프레임을 전체 프레임으로 다시 추론합니다.
+
+크롭 창은 매 프레임 옮기지 않습니다. MediaPipe 내부 ROI 추적/랜드마크 스무딩은 이미지 좌표가
+고정돼 있다고 보므로, 기준점이 창 가장자리(edge_margin)에 닿거나 몸이 창에 비해 많이 작아졌을
+때만 다시 잡습니다 (히스테리시스).
+
+세그멘테이션 마스크를 쓰는 경우(enable_segmentation) ROI 밖은 마스크가 0이 되므로, 이때는
+어깨/엉덩이가 아니라 전체 랜드마크(팔/다리 포함)를 감싸도록 ROI를 잡습니다.
+
+    tracker = PoseTracker(dict(model_complexity=1, enable_segmentation=True))
+    results = tracker.process(frame_bgr)     # pose.process() 결과와 같은 모양 (BGR 입력)
+    tracker.close()
+"""
+
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from utils.pose_results import landmarks_to_array, results_from_arrays
+
+# MediaPipe Pose 랜드마크 번호
+LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP = 11, 12, 23, 24
+_CORE = (LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP)
+
+
+class PoseTracker:
+    def __init__(
+        self,
+        pose_kwargs: dict,
+        input_size: Tuple[int, int] = (288, 384),
+        pad: float = 0.8,
+        body_pad: float = 0.15,
+        vis_th: float = 0.5,
+        max_roi_ratio: float = 0.7,
+        edge_margin: float = 0.12,
+    ):
+        """
+        input_size   : 크롭을 줄여 넣을 (w, h). ROI도 이 비율로 잡아 왜곡 없이 줄입니다.
+        pad          : 어깨/엉덩이 박스 바깥 여유 (몸통 크기 배수)
+        body_pad     : 세그멘테이션 사용 시 전체 랜드마크 박스 바깥 여유 (몸 크기 배수)
+        max_roi_ratio: ROI가 프레임 면적의 이 비율보다 크면 크롭 이득이 없으므로 전체 프레임 추론
+        edge_margin  : 기준점이 ROI 가장자리에서 (ROI 크기 배수) 이만큼 안쪽에 있는 동안은 ROI 유지
+        """
+        import mediapipe as mp
+        self._mp_pose = mp.solutions.pose
+        self.pose_kwargs = dict(pose_kwargs)
+        self.input_size = (int(input_size[0]), int(input_size[1]))
+        # 마스크를 합성에 쓰면 몸 전체가 ROI 안에 있어야 함 (밖은 배경으로 처리됨)
+        self.full_body = bool(self.pose_kwargs.get("enable_segmentation"))
+        self.pad = float(body_pad if self.full_body else pad)
+        self.vis_th = float(vis_th)
+        self.max_roi_ratio = float(max_roi_ratio)
+        self.edge_margin = float(edge_margin)
+        # 입력 크기가 바뀌면 MediaPipe 내부 추적/스무딩 상태가 어긋나므로 크롭용과 전체 프레임용을 분리
+        self._full = None
+        self._crop = None
+        self.roi: Optional[Tuple[int, int, int, int]] = None   # (x0, y0, w, h)
+        self._roi_frame: Optional[Tuple[int, int]] = None       # roi 를 계산한 프레임 (H, W)
+        self.stats = {"roi": 0, "full": 0, "lost": 0, "moved": 0}
+
+    def close(self) -> None:
+        for pose in (self._full, self._crop):
+            try:
+                if pose is not None:
+                    pose.close()
+            except Exception:
+                pass
+        self._full = self._crop = None
+
+    # ----------------- 추론 -----------------
+    def process(self, frame_bgr: np.ndarray):
+        H, W = frame_bgr.shape[:2]
+        if self.roi is not None and self._roi_frame != (H, W):
+            # 카메라 모드 재협상 등으로 프레임 크기가 바뀌면 이전 ROI는 무효 → 전체 프레임으로
+            self.roi = None
+        if self.roi is not None:
+            results = self._process_roi(frame_bgr, self.roi)
+            lms = landmarks_to_array(results.pose_landmarks)
+            if self._tracked(lms):
+                self.stats["roi"] += 1
+                if not self._roi_holds(lms, W, H):
+                    self.stats["moved"] += 1
+                    self._set_roi(lms, W, H)
+                return results
+            self.stats["lost"] += 1
+            self.roi = None
+
+        # 전체 프레임 (첫 검출 / 추적 실패 복구)
+        if self._full is None:
+            self._full = self._mp_pose.Pose(**self.pose_kwargs)
+        rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+        rgb.flags.writeable = False
+        results = self._full.process(rgb)
+        self.stats["full"] += 1
+        lms = landmarks_to_array(results.pose_landmarks)
+        if self._tracked(lms):
+            self._set_roi(lms, W, H)
+        return results
+
+    def _process_roi(self, frame_bgr: np.ndarray, roi):
+        if self._crop is None:
+            self._crop = self._mp_pose.Pose(**self.pose_kwargs)
+        H, W = frame_bgr.shape[:2]
+        x0, y0, cw, ch = roi
+        x0, y0 = min(max(0, x0), W - 1), min(max(0, y0), H - 1)
+        cw, ch = min(cw, W - x0), min(ch, H - y0)
+        crop = cv2.resize(frame_bgr[y0:y0 + ch, x0:x0 + cw], self.input_size, interpolation=cv2.INTER_AREA)
+        rgb = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+        rgb.flags.writeable = False
+        res = self._crop.process(rgb)
+
+        lms = landmarks_to_array(res.pose_landmarks)
+        if lms is not None:
+            lms[:, 0] = (lms[:, 0] * cw + x0) / W
+            lms[:, 1] = (lms[:, 1] * ch + y0) / H
+            lms[:, 2] *= cw / float(W)          # z는 이미지 폭 기준 스케일
+        mask = None
+        if res.segmentation_mask is not None:
+            mask = np.zeros((H, W), dtype=np.float32)
+            mask[y0:y0 + ch, x0:x0 + cw] = cv2.resize(res.segmentation_mask, (cw, ch), interpolation=cv2.INTER_LINEAR)
+        return results_from_arrays(lms, mask)
+
+    # ----------------- ROI -----------------
+    def _tracked(self, lms: Optional[np.ndarray]) -> bool:
+        return lms is not None and bool(np.all(lms[list(_CORE), 3] >= self.vis_th))
+
+    def _roi_holds(self, lms: np.ndarray, W: int, H: int) -> bool:
+        """
+        기준점이 모두 현재 ROI 안쪽(edge_margin)에 있고, 새로 잡을 ROI가 현재의 절반 면적 이상이면 True.
+        프레임 경계와 맞닿은 변은 더 넓힐 수 없으므로 여유를 보지 않습니다.
+        """
+        x0, y0, cw, ch = self.roi
+        pts = self._box_points(lms, W, H)
+        mx, my = self.edge_margin * cw, self.edge_margin * ch
+        lo_x = x0 + mx if x0 > 0 else -np.inf
+        hi_x = x0 + cw - mx if x0 + cw < W else np.inf
+        lo_y = y0 + my if y0 > 0 else -np.inf
+        hi_y = y0 + ch - my if y0 + ch < H else np.inf
+        if not (np.all((pts[:, 0] >= lo_x) & (pts[:, 0] <= hi_x)) and np.all((pts[:, 1] >= lo_y) & (pts[:, 1] <= hi_y))):
+            return False
+        new = self._next_roi(lms, W, H)
+        return new is not None and new[2] * new[3] >= 0.5 * cw * ch
+
+    def _box_points(self, lms: np.ndarray, W: int, H: int) -> np.ndarray:
+        """ROI 기준점 (픽셀). full_body면 전체 랜드마크를 프레임 안으로 자른 값, 아니면 어깨/엉덩이."""
+        if not self.full_body:
+            return lms[list(_CORE), :2] * np.array([W, H], dtype=np.float32)
+        pts = lms[:, :2] * np.array([W, H], dtype=np.float32)
+        return np.clip(pts, 0, [W - 1, H - 1])
+
+    def _set_roi(self, lms: np.ndarray, W: int, H: int) -> None:
+        self.roi = self._next_roi(lms, W, H)
+        self._roi_frame = (H, W)
+
+    def _next_roi(self, lms: np.ndarray, W: int, H: int) -> Optional[Tuple[int, int, int, int]]:
+        """기준점 박스를 pad만큼 넓히고 input_size 비율로 맞춘 ROI. 크롭 이득이 없으면 None."""
+        pts = self._box_points(lms, W, H)
+        (x1, y1), (x2, y2) = pts.min(axis=0), pts.max(axis=0)
+        size = max(x2 - x1, y2 - y1, 1.0)
+        cx, cy = (x1 + x2) / 2.0, (y1 + y2) / 2.0
+        bw = (x2 - x1) + 2 * self.pad * size
+        bh = (y2 - y1) + 2 * self.pad * size
+        aspect = self.input_size[0] / float(self.input_size[1])
+        if bw / bh < aspect:
+            bw = bh * aspect
+        else:
+            bh = bw / aspect
+        # 입력 크기보다 작게 자르지 않음 (확대 추론은 정확도만 떨어짐)
+        bw = min(max(int(bw), self.input_size[0]), W)
+        bh = min(max(int(bh), self.input_size[1]), H)
+        if bw * bh > self.max_roi_ratio * W * H:
+            return None
+        x0 = int(np.clip(cx - bw / 2.0, 0, W - bw))
+        y0 = int(np.clip(cy - bh / 2.0, 0, H - bh))
+        return x0, y0, bw, bh
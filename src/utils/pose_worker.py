@@ -0,0 +1,255 @@
+# utils/pose_worker.py
+"""
+MediaPipe Pose를 별도 프로세스에서 돌리는 추론 워커.
+
+프레임은 공유 메모리 링 버퍼(slot 단위)에 복사해 넘기고, 큐로는 (slot, seq, h, w, flip) 같은
+작은 메타데이터만 보냅니다 (numpy 배열 피클링 없음). 세그멘테이션 마스크도 같은 slot 번호의
+마스크 공유 메모리에 uint8로 써서 돌려받습니다.
+
+    worker = PoseWorker(enable_segmentation=True)
+    worker.start()
+    if worker.submit(frame_bgr, seq, flip=True, tag=frame):   # slot이 없으면 False (프레임 드롭)
+        ...
+    res = await worker.next_result(timeout=0.5)    # WorkerResult(seq, results, infer_ms, tag)
+    worker.close()
+
+매 프레임 합성까지 하는 루프는 pipeline() 으로 한 프레임씩 겹쳐 돌립니다
+(프레임 N 의 결과를 합성/인코딩하는 동안 워커는 프레임 N+1 을 추론).
+
+    res = await worker.pipeline(frame_bgr, seq, tag=frame)   # 직전에 제출한 프레임의 결과 (첫 프레임은 None)
+
+results는 pose.process() 결과와 같은 모양의 PoseResults 입니다.
+"""
+
+import asyncio
+import multiprocessing as mp
+import threading
+from collections import deque
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from utils.pose_results import PoseResults, results_from_arrays
+
+
+@dataclass
+class WorkerResult:
+    seq: int
+    results: PoseResults
+    infer_ms: float
+    tag: object = None      # submit()에 넘긴 값 (보통 원본 Frame)
+
+
+def _worker_main(frame_shm_name, mask_shm_name, slot_pixels, pose_kwargs, roi, req_q, resp_q):
+    """자식 프로세스: 요청 큐에서 slot을 받아 추론하고 결과 메타데이터를 응답 큐로 보냄."""
+    import time
+    import mediapipe as mp_
+    from utils.pose_results import landmarks_to_array
+
+    # spawn 자식은 부모의 resource_tracker를 공유하므로 세그먼트 해제(unlink)는 부모가 담당
+    shm_f = shared_memory.SharedMemory(name=frame_shm_name)
+    shm_m = shared_memory.SharedMemory(name=mask_shm_name)
+    if roi:
+        from utils.pose_tracker import PoseTracker
+        pose = PoseTracker(pose_kwargs)
+    else:
+        pose = mp_.solutions.pose.Pose(**pose_kwargs)
+    resp_q.put(("ready",))
+    try:
+        while True:
+            msg = req_q.get()
+            if msg is None:
+                break
+            slot, seq, h, w, flip = msg
+            img = np.ndarray((h, w, 3), dtype=np.uint8, buffer=shm_f.buf, offset=slot * slot_pixels * 3)
+            if flip:
+                img = cv2.flip(img, 1)
+            t0 = time.perf_counter()
+            res = pose.process(img) if roi else pose.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+            infer_ms = (time.perf_counter() - t0) * 1000.0
+            lms = landmarks_to_array(res.pose_landmarks)
+            has_mask = False
+            if res.segmentation_mask is not None:
+                dst = np.ndarray((h, w), dtype=np.uint8, buffer=shm_m.buf, offset=slot * slot_pixels)
+                dst[:] = cv2.convertScaleAbs(res.segmentation_mask, alpha=255.0)
+                has_mask = True
+            resp_q.put((slot, seq, lms, has_mask, infer_ms))
+    finally:
+        pose.close()
+        shm_f.close()
+        shm_m.close()
+
+
+class PoseWorker:
+    def __init__(
+        self,
+        max_width: int = 1920,
+        max_height: int = 1080,
+        slots: int = 2,
+        roi: bool = False,
+        **pose_kwargs,
+    ):
+        self.slot_pixels = int(max_width) * int(max_height)
+        self.slots = int(slots)
+        self.pose_kwargs = pose_kwargs
+        self.roi = bool(roi)            # True면 워커에서 PoseTracker(ROI 크롭 추론) 사용
+        self._proc = None
+        self._req_q = None
+        self._resp_q = None
+        self._shm_f: Optional[shared_memory.SharedMemory] = None
+        self._shm_m: Optional[shared_memory.SharedMemory] = None
+        self._free = deque(range(self.slots))
+        self._slot_meta = {}             # slot → (h, w, tag)
+        self._lock = threading.Lock()
+        self._results = deque(maxlen=self.slots)
+        self._waiter = None              # (loop, future)
+        self._receiver: Optional[threading.Thread] = None
+        self.ready = threading.Event()
+        self.dropped = 0
+
+    # ----------------- 수명 -----------------
+    def start(self) -> None:
+        ctx = mp.get_context("spawn")
+        self._shm_f = shared_memory.SharedMemory(create=True, size=self.slots * self.slot_pixels * 3)
+        self._shm_m = shared_memory.SharedMemory(create=True, size=self.slots * self.slot_pixels)
+        self._req_q = ctx.Queue()
+        self._resp_q = ctx.Queue()
+        self._proc = ctx.Process(
+            target=_worker_main,
+            args=(self._shm_f.name, self._shm_m.name, self.slot_pixels, self.pose_kwargs, self.roi, self._req_q, self._resp_q),
+            name="pose-worker",
+            daemon=True,
+        )
+        self._proc.start()
+        self._receiver = threading.Thread(target=self._receiver_main, name="pose-worker-recv", daemon=True)
+        self._receiver.start()
+
+    def close(self) -> None:
+        if self._proc is None:
+            return
+        try:
+            self._req_q.put(None)
+            self._proc.join(timeout=2.0)
+            if self._proc.is_alive():
+                self._proc.terminate()
+        except Exception:
+            pass
+        try:
+            self._resp_q.put(None)   # 수신 스레드 종료
+        except Exception:
+            pass
+        self._proc = None
+        if self._receiver is not None:
+            self._receiver.join(timeout=1.0)
+        for shm in (self._shm_f, self._shm_m):
+            try:
+                shm.close()
+                shm.unlink()
+            except Exception:
+                pass
+        self._shm_f = self._shm_m = None
+        self._resolve_waiter(None)
+
+    @property
+    def in_flight(self) -> int:
+        return self.slots - len(self._free)
+
+    # ----------------- 요청/결과 -----------------
+    def submit(self, frame_bgr: np.ndarray, seq: int, flip: bool = False, tag=None) -> bool:
+        """
+        프레임을 빈 slot에 복사하고 추론을 요청합니다. flip=True면 워커에서 좌우 반전 후 추론.
+        빈 slot이 없으면(워커가 밀림) False를 반환하고 프레임은 버립니다.
+        tag는 결과(WorkerResult.tag)에 그대로 붙어 돌아옵니다.
+        """
+        h, w = frame_bgr.shape[:2]
+        if self._proc is None or h * w > self.slot_pixels:
+            return False
+        with self._lock:
+            if not self._free:
+                self.dropped += 1
+                return False
+            slot = self._free.popleft()
+            self._slot_meta[slot] = (h, w, tag)
+        dst = np.ndarray((h, w, 3), dtype=np.uint8, buffer=self._shm_f.buf, offset=slot * self.slot_pixels * 3)
+        np.copyto(dst, frame_bgr)
+        self._req_q.put((slot, int(seq), h, w, bool(flip)))
+        return True
+
+    async def next_result(self, timeout: float = 1.0) -> Optional[WorkerResult]:
+        """가장 오래된 미수령 결과. timeout 내에 없으면 None."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._results:
+                return self._results.popleft()
+            fut = loop.create_future()
+            self._waiter = (loop, fut)
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            with self._lock:
+                if self._waiter is not None and self._waiter[1] is fut:
+                    self._waiter = None
+
+    async def pipeline(self, frame_bgr: np.ndarray, seq: int, flip: bool = False, tag=None,
+                       timeout: float = 1.0) -> Optional[WorkerResult]:
+        """
+        이 프레임을 제출하고, 그 전에 제출한 프레임의 결과를 기다려 반환합니다.
+        호출자가 반환된 결과를 합성/인코딩하는 동안 워커는 방금 제출한 프레임을 추론하므로
+        추론과 합성이 겹칩니다 (표시는 한 프레임 늦음). 앞서 제출한 요청이 없으면(첫 프레임,
+        타임아웃 직후) 기다리지 않고 None.
+        """
+        submitted = self.submit(frame_bgr, seq, flip=flip, tag=tag)
+        with self._lock:
+            ahead = self.slots - len(self._free) - int(submitted)
+            if ahead <= 0 and not self._results:
+                return None
+        return await self.next_result(timeout)
+
+    # ----------------- 내부 -----------------
+    def _receiver_main(self):
+        while True:
+            try:
+                msg = self._resp_q.get()
+            except Exception:
+                return
+            if msg is None:
+                return
+            if msg[0] == "ready":
+                self.ready.set()
+                continue
+            slot, seq, lms, has_mask, infer_ms = msg
+            h, w, tag = self._slot_meta.pop(slot, (0, 0, None))
+            mask = None
+            if has_mask and self._shm_m is not None:
+                m8 = np.ndarray((h, w), dtype=np.uint8, buffer=self._shm_m.buf, offset=slot * self.slot_pixels)
+                mask = m8.astype(np.float32) * (1.0 / 255.0)   # slot 재사용 전에 복사
+            with self._lock:
+                self._free.append(slot)
+            result = WorkerResult(seq=seq, results=results_from_arrays(lms, mask), infer_ms=infer_ms, tag=tag)
+            if not self._resolve_waiter(result):
+                with self._lock:
+                    self._results.append(result)
+
+    def _resolve_waiter(self, value) -> bool:
+        with self._lock:
+            waiter, self._waiter = self._waiter, None
+        if waiter is None:
+            return False
+        loop, fut = waiter
+
+        def _set():
+            if not fut.done():
+                fut.set_result(value)
+            elif value is not None:
+                with self._lock:
+                    self._results.append(value)
+        try:
+            loop.call_soon_threadsafe(_set)
+        except RuntimeError:
+            return False
+        return True
@@ -0,0 +1,317 @@
+# utils/preview.py
+"""
+카메라 미리보기 출력 경로 (ft.Image 로 프레임 보내기).
+
+transport (SYLO_PREVIEW_TRANSPORT 로 기본값 변경)
+- "base64": JPEG → base64 → src_base64 컨트롤 업데이트 (기존 방식, 기본값/폴백)
+- "mjpeg" : src 를 localhost MJPEG 스트림 URL로 한 번만 지정. 프레임은 HTTP로만 흐르고
+            컨트롤 업데이트가 없습니다. multipart 이미지를 그리는 클라이언트(웹 뷰)용.
+- "frame" : 최신 프레임 URL(?seq=N)을 src 로 갱신. 업데이트는 짧은 URL 문자열뿐이고
+            이미지 바이트는 HTTP로 가져갑니다 (데스크톱 클라이언트용).
+스트림 서버를 띄우지 못하면 base64 로 폴백합니다.
+
+adaptive=True(기본, SYLO_PREVIEW_ADAPTIVE=0 으로 끔)면 프레임마다 인코딩/base64/업데이트 시간을 재서
+미리보기 예산(프레임 간격의 budget_share)을 넘으면 품질 → 해상도 순으로 낮추고, 여유가 생기면
+해상도 → 품질 순으로 되돌립니다. 현재 상태는 stats() 로, SYLO_PREVIEW_STATS=1 이면 5초마다 로그로 봅니다.
+
+화면 박스(set_display_box, 또는 attach(track_page=True)로 창 크기 추적)가 있으면 인코딩 전에
+ImageFit.COVER와 같은 방식으로 가운데를 잘라 박스 크기로 줄입니다 (확대는 하지 않음).
+인코딩 비용/바이트가 센서 해상도가 아니라 화면 크기를 따라갑니다.
+
+스트림 transport에서는 클라이언트가 아직 받아 가지 않은 프레임이 max_in_flight 개 이상이면
+새 프레임을 인코딩하지 않고 버립니다 (업데이트가 쌓여 지연이 늘어나는 대신 중간 프레임 드롭).
+드롭 수와 publish → 클라이언트 전달 지연은 stats() 에 나옵니다. base64 는 클라이언트 확인 수단이
+없어 전송(update) 시간만 보고합니다.
+"""
+
+import base64
+import os
+import time
+from itertools import count
+from typing import Optional, Tuple
+
+import cv2
+import flet as ft
+import numpy as np
+
+from utils.jpeg import JpegEncoder, get_jpeg_encoder
+from utils.preview_server import PreviewChannel, PreviewServer, get_preview_server
+
+TRANSPORTS = ("base64", "mjpeg", "frame")
+_ids = count(1)
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.environ.get(name, default) not in ("0", "false", "no")
+
+
+class _PageResize:
+    """
+    페이지 하나의 on_resized 를 한 번만 가로채 창 크기를 추적 중인 PreviewOutput 들에 나눠 줍니다.
+    인스턴스마다 핸들러를 체인으로 잇지 않으므로 attach/detach 순서와 상관없이 등록/해제됩니다.
+    마지막 출력이 빠지면 원래 핸들러로 되돌립니다.
+    """
+
+    _hubs: dict = {}   # id(page) → _PageResize
+
+    def __init__(self, page):
+        self.page = page
+        self.outputs = []
+        self.prev = page.on_resized
+        page.on_resized = self._dispatch
+
+    @classmethod
+    def add(cls, page, output: "PreviewOutput") -> None:
+        hub = cls._hubs.get(id(page))
+        if hub is None or hub.page is not page:
+            hub = cls._hubs[id(page)] = cls(page)
+        if output not in hub.outputs:
+            hub.outputs.append(output)
+
+    @classmethod
+    def remove(cls, page, output: "PreviewOutput") -> None:
+        hub = cls._hubs.get(id(page))
+        if hub is None or hub.page is not page:
+            return
+        if output in hub.outputs:
+            hub.outputs.remove(output)
+        if not hub.outputs:
+            if page.on_resized == hub._dispatch:
+                page.on_resized = hub.prev
+            del cls._hubs[id(page)]
+
+    def _dispatch(self, e):
+        w = getattr(e, "width", None) or self.page.width
+        h = getattr(e, "height", None) or self.page.height
+        for out in list(self.outputs):
+            out.set_display_box(w, h)
+        if self.prev:
+            self.prev(e)
+
+
+class QualityController:
+    """
+    미리보기 전송 비용(ms)을 예산 안에 유지하도록 JPEG 품질과 해상도 배율을 조절합니다.
+    낮출 때는 품질을 먼저(q_min까지), 그다음 해상도를 낮추고, 올릴 때는 반대 순서입니다.
+    바꾼 뒤 settle 프레임 동안은 새 설정의 비용을 지켜보기만 합니다.
+    """
+
+    SCALES = (1.0, 0.85, 0.7, 0.5)
+
+    def __init__(self, budget_ms: float, q_max: int = 75, q_min: int = 40, q_step: int = 5,
+                 settle: int = 12, alpha: float = 0.2):
+        self.budget_ms = float(budget_ms)
+        self.q_max, self.q_min, self.q_step = int(q_max), int(q_min), int(q_step)
+        self.settle = int(settle)
+        self.alpha = float(alpha)
+        self.quality = self.q_max
+        self._scale_idx = 0
+        self.cost_ms: Optional[float] = None     # 전송 비용 EMA
+        self._since_change = 0
+
+    @property
+    def scale(self) -> float:
+        return self.SCALES[self._scale_idx]
+
+    def observe(self, cost_ms: float) -> None:
+        c = float(cost_ms)
+        self.cost_ms = c if self.cost_ms is None else self.cost_ms + self.alpha * (c - self.cost_ms)
+        self._since_change += 1
+        if self._since_change < self.settle:
+            return
+        if self.cost_ms > self.budget_ms:
+            self._degrade()
+        elif self.cost_ms < 0.6 * self.budget_ms:
+            self._improve()
+
+    def _degrade(self) -> None:
+        if self.quality > self.q_min:
+            self.quality = max(self.q_min, self.quality - self.q_step)
+        elif self._scale_idx < len(self.SCALES) - 1:
+            self._scale_idx += 1
+        else:
+            return
+        self._since_change = 0
+
+    def _improve(self) -> None:
+        if self._scale_idx > 0:
+            self._scale_idx -= 1
+        elif self.quality < self.q_max:
+            self.quality = min(self.q_max, self.quality + self.q_step)
+        else:
+            return
+        self._since_change = 0
+
+
+class PreviewOutput:
+    def __init__(self, image: ft.Image, name: str, quality: int = 75, transport: Optional[str] = None,
+                 fps: float = 24.0, adaptive: Optional[bool] = None, budget_share: float = 0.3,
+                 max_in_flight: Optional[int] = None):
+        """budget_share: 프레임 간격(1/fps) 중 인코딩+전송에 쓸 수 있는 비율."""
+        self.image = image
+        self.name = f"{name}-{next(_ids)}"
+        self.quality = int(quality)
+        transport = transport or os.environ.get("SYLO_PREVIEW_TRANSPORT", "base64")
+        self.transport = transport if transport in TRANSPORTS else "base64"
+        self.encoder: JpegEncoder = get_jpeg_encoder()
+        self.last_jpeg: Optional[bytes] = None
+        self._channel: Optional[PreviewChannel] = None
+        self._server: Optional[PreviewServer] = None
+        self._url = ""
+        self._box: Optional[Tuple[int, int]] = None   # 화면에 그려지는 (w, h)
+        self._page = None
+
+        if adaptive is None:
+            adaptive = _env_flag("SYLO_PREVIEW_ADAPTIVE", "1")
+        budget_ms = 1000.0 * budget_share / max(1.0, float(fps))
+        self.controller: Optional[QualityController] = (
+            QualityController(budget_ms, q_max=self.quality) if adaptive else None
+        )
+        self._last = {"encode_ms": 0.0, "b64_ms": 0.0, "update_ms": 0.0, "bytes": 0, "size": (0, 0)}
+        self.max_in_flight = int(max_in_flight or os.environ.get("SYLO_PREVIEW_MAX_IN_FLIGHT", 2))
+        self.dropped = 0
+        self._log_stats = _env_flag("SYLO_PREVIEW_STATS", "0")
+        self._last_log = time.time()
+
+    def attach(self, track_page: bool = False) -> None:
+        """
+        스트림 transport면 서버 채널을 열고 이미지 src를 URL로 바꿉니다 (마운트 후 호출).
+        track_page=True면 창 크기를 화면 박스로 쓰고 창 크기 변경을 따라갑니다 (전체 화면 배경용).
+        """
+        if track_page and self._page is None:
+            self._track_page(self.image.page)
+        if self.transport == "base64" or self._channel is not None:
+            return
+        server = get_preview_server()
+        if server is None:
+            print("⚠️ 미리보기 스트림 사용 불가 → base64 전송으로 폴백")
+            self.transport = "base64"
+            return
+        self._server = server
+        self._channel = server.channel(self.name)
+        self._url = server.url(self.name, kind=self.transport)
+        if self.transport == "mjpeg":
+            self.image.src = self._url
+            self.image.src_base64 = None
+            self.image.update()
+
+    def detach(self) -> None:
+        if self._channel is not None:
+            # 이름이 인스턴스마다 달라 재사용되지 않으므로 서버 목록에서도 뺌
+            self._server.close_channel(self._channel)
+            self._channel = self._server = None
+        if self._page is not None:
+            _PageResize.remove(self._page, self)
+            self._page = None
+
+    # ----------------- 화면 박스 -----------------
+    def set_display_box(self, width, height) -> None:
+        self._box = (int(width), int(height)) if width and height else None
+
+    def _track_page(self, page) -> None:
+        if page is None:
+            return
+        self._page = page
+        self.set_display_box(page.width, page.height)
+        _PageResize.add(page, self)
+
+    def _fit_to_box(self, img: np.ndarray) -> np.ndarray:
+        """COVER: 박스 비율로 가운데를 자르고, 박스보다 크면 박스 크기로 줄입니다."""
+        if self._box is None:
+            return img
+        bw, bh = self._box
+        h, w = img.shape[:2]
+        s = max(bw / float(w), bh / float(h))
+        cw, ch = min(w, int(round(bw / s))), min(h, int(round(bh / s)))
+        x0, y0 = (w - cw) // 2, (h - ch) // 2
+        img = img[y0:y0 + ch, x0:x0 + cw]
+        if s < 1.0:
+            img = cv2.resize(img, (bw, bh), interpolation=cv2.INTER_AREA)
+        return img
+
+    @property
+    def current_quality(self) -> int:
+        return self.controller.quality if self.controller else self.quality
+
+    @property
+    def current_scale(self) -> float:
+        return self.controller.scale if self.controller else 1.0
+
+    def push(self, frame_bgr: np.ndarray, timer=None) -> bool:
+        """프레임을 JPEG로 인코딩해 이미지로 보냅니다. timer(StageTimer)가 있으면 encode/push 단계 기록."""
+        if self._channel is not None and self._channel.in_flight() >= self.max_in_flight:
+            self.dropped += 1   # 클라이언트가 밀려 있음 → 이 프레임은 인코딩하지 않고 버림
+            return False
+        t0 = time.perf_counter()
+        img = self._fit_to_box(frame_bgr)
+        scale = self.current_scale
+        if scale < 1.0:
+            h, w = img.shape[:2]
+            img = cv2.resize(img, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+        jpg = self.encoder.encode(img, self.current_quality)
+        t1 = time.perf_counter()
+        if not jpg:
+            return False
+        self.last_jpeg = jpg
+
+        if self._channel is not None:
+            seq = self._channel.publish(jpg)
+            t2 = time.perf_counter()
+            if self.transport == "frame":
+                self.image.src = f"{self._url}?seq={seq}"
+                self.image.update()
+        else:
+            b64 = base64.b64encode(jpg).decode("ascii")
+            t2 = time.perf_counter()
+            self.image.src_base64 = b64
+            self.image.update()
+        t3 = time.perf_counter()
+
+        if timer is not None:
+            timer.add("encode", t1 - t0)
+            timer.add("push", t3 - t1)
+        self._last = {
+            "encode_ms": (t1 - t0) * 1000.0,
+            "b64_ms": (t2 - t1) * 1000.0,
+            "update_ms": (t3 - t2) * 1000.0,
+            "bytes": len(jpg),
+            "size": (img.shape[1], img.shape[0]),
+        }
+        if self.controller is not None:
+            self.controller.observe((t3 - t0) * 1000.0)
+        if self._log_stats and time.time() - self._last_log >= 5.0:
+            self._last_log = time.time()
+            print(f"[preview] {self.name} {self.describe()}")
+        return True
+
+    def stats(self) -> dict:
+        """현재 품질/해상도/프레임당 바이트와 마지막 프레임의 단계별 시간."""
+        out = dict(self._last)
+        out.update(
+            transport=self.transport,
+            quality=self.current_quality,
+            scale=self.current_scale,
+            cost_ms=self.controller.cost_ms if self.controller else None,
+            budget_ms=self.controller.budget_ms if self.controller else None,
+            dropped=self.dropped,
+            in_flight=self._channel.in_flight() if self._channel else 0,
+            skipped=self._channel.skipped if self._channel else 0,
+            latency_ms=self._channel.latency_ms() if self._channel else None,
+        )
+        return out
+
+    def describe(self) -> str:
+        st = self.stats()
+        w, h = st["size"]
+        text = (f"q{st['quality']} {w}x{h} {st['bytes'] / 1024:.1f}KB "
+                f"enc {st['encode_ms']:.1f}ms b64 {st['b64_ms']:.1f}ms upd {st['update_ms']:.1f}ms "
+                f"drop {st['dropped']}")
+        if st["latency_ms"]:
+            text += f" lat p50 {st['latency_ms']['p50']}ms p95 {st['latency_ms']['p95']}ms"
+        return text
+
+    def last_base64(self) -> Optional[str]:
+        """마지막으로 보낸 프레임의 base64 (transport와 무관)."""
+        if self.last_jpeg is None:
+            return None
+        return base64.b64encode(self.last_jpeg).decode("ascii")
@@ -0,0 +1,224 @@
+# utils/preview_server.py
+"""
+localhost 미리보기 스트림 서버.
+
+컴포넌트가 인코딩한 JPEG를 채널(이름)별로 publish 하면 HTTP로 내보냅니다.
+
+    GET /mjpeg/<name>        multipart/x-mixed-replace MJPEG 스트림 (새 프레임마다 push)
+    GET /frame/<name>.jpg    채널의 최신 JPEG 한 장 (?seq=N 은 캐시 회피용으로 무시)
+
+127.0.0.1 의 빈 포트에 데몬 스레드로 뜨며, 프레임 바이트는 Flet 컨트롤 업데이트를 거치지 않습니다.
+
+클라이언트가 프레임을 가져가면(/frame) 또는 스트림에 다 쓰면(/mjpeg) 그 seq를 확인(ack)으로 보고
+publish → 전달까지의 지연을 기록합니다. in_flight() 는 아직 확인되지 않은 프레임 수입니다.
+"""
+
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+_BOUNDARY = "sylo-frame"
+
+
+class PreviewChannel:
+    """최신 JPEG 한 장만 보관하는 채널. 느린 클라이언트는 중간 프레임을 건너뜁니다."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._cond = threading.Condition()
+        self._jpeg: Optional[bytes] = None
+        self._seq = 0
+        self._published_at: Dict[int, float] = {}
+        self._acked_seq = 0
+        self.latencies = deque(maxlen=300)   # publish → 클라이언트 전달 (초)
+        self.skipped = 0                     # 클라이언트가 받아 가기 전에 덮어써진 프레임
+        self.closed = False
+
+    def publish(self, jpeg: bytes) -> int:
+        with self._cond:
+            self._jpeg = bytes(jpeg)
+            self._seq += 1
+            self._published_at[self._seq] = time.perf_counter()
+            if len(self._published_at) > 64:
+                for s in sorted(self._published_at)[:-32]:
+                    del self._published_at[s]
+            self._cond.notify_all()
+            return self._seq
+
+    def ack(self, seq: int) -> None:
+        """클라이언트가 seq 프레임을 받아 감. 그 이전 미확인 프레임은 건너뛴 것으로 셉니다."""
+        with self._cond:
+            if seq <= self._acked_seq:
+                return
+            self.skipped += max(0, seq - self._acked_seq - 1) if self._acked_seq else 0
+            t_pub = self._published_at.pop(seq, None)
+            for s in [s for s in self._published_at if s < seq]:
+                del self._published_at[s]
+            self._acked_seq = seq
+            if t_pub is not None:
+                self.latencies.append(time.perf_counter() - t_pub)
+
+    def in_flight(self, stale_secs: float = 1.0) -> int:
+        """publish 됐지만 확인되지 않은 프레임 수. stale_secs 동안 확인이 없던 프레임은 세지 않음."""
+        with self._cond:
+            now = time.perf_counter()
+            return sum(1 for s, t in self._published_at.items() if s > self._acked_seq and now - t < stale_secs)
+
+    def latency_ms(self) -> Optional[dict]:
+        with self._cond:
+            if not self.latencies:
+                return None
+            arr = np.asarray(self.latencies, dtype=np.float64) * 1000.0
+        return {"p50": round(float(np.percentile(arr, 50)), 2), "p95": round(float(np.percentile(arr, 95)), 2)}
+
+    def latest(self) -> Tuple[Optional[bytes], int]:
+        with self._cond:
+            return self._jpeg, self._seq
+
+    def wait_next(self, after_seq: int, timeout: float = 1.0) -> Tuple[Optional[bytes], int]:
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > after_seq or self.closed, timeout)
+            return self._jpeg, self._seq
+
+    def close(self) -> None:
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+
+    def log_message(self, fmt, *args):   # 프레임마다 접근 로그를 찍지 않음
+        pass
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        kind, _, name = path.lstrip("/").partition("/")
+        if kind == "frame" and name.endswith(".jpg"):
+            return self._send_frame(name[:-4])
+        if kind == "mjpeg" and name:
+            return self._send_mjpeg(name)
+        self.send_error(404)
+
+    def _send_frame(self, name: str):
+        ch = self.server.owner.channels.get(name)
+        jpeg, seq = ch.latest() if ch is not None else (None, 0)
+        if jpeg is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(jpeg)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(jpeg)
+        ch.ack(seq)
+
+    def _send_mjpeg(self, name: str):
+        ch = self.server.owner.channels.get(name)
+        if ch is None or ch.closed:
+            self.send_error(404)   # 닫힌 채널을 다시 만들지 않음
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={_BOUNDARY}")
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        seq = 0
+        try:
+            while not ch.closed and not self.server.owner.stopped:
+                jpeg, new_seq = ch.wait_next(seq, timeout=1.0)
+                if jpeg is None or new_seq == seq:
+                    continue
+                seq = new_seq
+                self.wfile.write(
+                    f"--{_BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n".encode("ascii")
+                )
+                self.wfile.write(jpeg)
+                self.wfile.write(b"\r\n")
+                self.wfile.flush()
+                ch.ack(seq)
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            pass   # 클라이언트가 끊음
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    owner: "PreviewServer"
+
+
+class PreviewServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.channels: Dict[str, PreviewChannel] = {}
+        self.stopped = False
+        self._httpd: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> bool:
+        with self._lock:
+            if self._httpd is not None:
+                return True
+            try:
+                httpd = _Server((self.host, self.port), _Handler)
+            except OSError as e:
+                print(f"❌ 미리보기 서버 시작 실패: {e}")
+                return False
+            httpd.owner = self
+            self._httpd = httpd
+            self.port = httpd.server_address[1]
+            self.stopped = False
+            self._thread = threading.Thread(target=httpd.serve_forever, name="preview-server", daemon=True)
+            self._thread.start()
+            print(f"📡 미리보기 스트림: http://{self.host}:{self.port}/")
+            return True
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._httpd is None:
+                return
+            self.stopped = True
+            for ch in self.channels.values():
+                ch.close()
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def channel(self, name: str) -> PreviewChannel:
+        with self._lock:
+            ch = self.channels.get(name)
+            if ch is None or ch.closed:
+                ch = self.channels[name] = PreviewChannel(name)
+            return ch
+
+    def close_channel(self, ch: PreviewChannel) -> None:
+        """채널을 닫고 목록에서 뺌 (마지막 JPEG 도 같이 해제)."""
+        with self._lock:
+            if self.channels.get(ch.name) is ch:
+                del self.channels[ch.name]
+        ch.close()
+
+    def url(self, name: str, kind: str = "mjpeg") -> str:
+        if kind == "frame":
+            return f"http://{self.host}:{self.port}/frame/{name}.jpg"
+        return f"http://{self.host}:{self.port}/mjpeg/{name}"
+
+
+_server: Optional[PreviewServer] = None
+_server_lock = threading.Lock()
+
+
+def get_preview_server() -> Optional[PreviewServer]:
+    """프로세스 전역 미리보기 서버 (필요할 때 시작). 시작 실패 시 None."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = PreviewServer()
+        return _server if _server.start() else None
@@ -0,0 +1,187 @@
+# utils/replay.py
+"""
+녹화된 세션을 BodyShapeBackground / FittingContainer 파이프라인에 프레임 단위로 다시 흘려
+단계별 처리 시간과 최종 체형 판정을 보고합니다. (Flet 페이지 없이 실행)
+
+    cd src
+    python -m utils.replay <session_dir> [--speed recorded|max] [--pose recorded|live]
+                                         [--out report.json] [--baseline old_report.json]
+
+--pose recorded : 녹화된 랜드마크/마스크를 사용 (측정·합성 코드 변경 비교용, 결정적).
+                  포즈 기록이 없는 프레임은 "사람 없음"으로 재생하고 missing_pose 로 셉니다
+--pose live     : MediaPipe를 다시 돌림 (추론 포함 전체 처리량 측정)
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Optional
+
+from utils.perf import StageTimer
+from utils.session import Session
+
+
+def _make_component(event: dict, on_stable):
+    import flet as ft
+    name = event.get("component")
+    if name == "BodyShapeBackground":
+        from components.body_shape_background import BodyShapeBackground
+        comp = BodyShapeBackground(
+            overlay=ft.Container(),
+            gender=event.get("gender", "male"),
+            enable_segmentation=event.get("enable_segmentation", True),
+            stable_secs=event.get("stable_secs", 3.0),
+            on_shape_stable=on_stable,
+            blur=event.get("blur"),
+            measure_scale=event.get("measure_scale"),
+        )
+        comp.mirror = event.get("mirror", True)
+        return comp
+    if name == "FittingContainer":
+        from components.fitting_container import FittingContainer
+        return FittingContainer(
+            overlay_path=event.get("overlay_path", ""),
+            width=event.get("width", 348),
+            height=event.get("height", 615),
+            fps=event.get("fps", 12),
+            infer_fps=event.get("infer_fps") or None,
+        )
+    return None
+
+
+async def replay(session_dir: str, speed: str = "max", pose: str = "recorded") -> dict:
+    session = Session(session_dir)
+    report = {"session": str(session_dir), "speed": speed, "pose": pose, "components": []}
+    current = None
+    entry: Optional[dict] = None
+    frame_timer: Optional[StageTimer] = None
+    wall0 = ts0 = None
+    clock = {"first": None, "now": None}   # 현재 컴포넌트의 첫 프레임 / 현재 프레임 캡처 시각
+
+    def _close_entry():
+        if entry is None or current is None:
+            return
+        entry["stages"] = current.timer.summary()
+        entry["stages"].update(frame_timer.summary())
+        entry["frames"] = current.timer.frames
+        if hasattr(current, "last_shape"):
+            entry["final_shape"] = current.last_shape
+        try:
+            pose_obj = getattr(current, "pose", None) or getattr(current, "_pose", None)
+            if pose_obj is not None:
+                pose_obj.close()
+        except Exception:
+            pass
+
+    for ev in session.events:
+        kind = ev["type"]
+        if kind == "route":
+            report.setdefault("routes", []).append({"ts": ev["ts"], "path": ev["path"]})
+            continue
+        if kind == "mount":
+            _close_entry()
+            entry = {"component": ev.get("component"), "mount_ts": ev["ts"], "stable_fires": []}
+            clock["first"] = None
+
+            async def on_stable(shape, measures, frame=None, _entry=entry):
+                _entry["stable_fires"].append({
+                    "shape": shape,
+                    "secs_from_first_frame": round(clock["now"] - clock["first"], 3),
+                    "measures": {k: round(float(v), 2) for k, v in measures.items()},
+                })
+
+            current = _make_component(ev, on_stable)
+            frame_timer = StageTimer()
+            report["components"].append(entry)
+            continue
+        if kind != "frame" or current is None:
+            continue
+
+        with frame_timer.stage("load"):
+            frame = session.load_frame(ev)
+        if frame is None:
+            continue
+        if speed == "recorded":
+            if wall0 is None:
+                wall0, ts0 = time.perf_counter(), frame.ts
+            delay = (frame.ts - ts0) - (time.perf_counter() - wall0)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        if clock["first"] is None:
+            clock["first"] = frame.ts
+        clock["now"] = frame.ts
+        # infer_fps로 추론 빈도를 낮춘 컴포넌트는 녹화 당시처럼 사이 프레임을 예측으로 합성
+        due = current.inference_due(frame.ts) if hasattr(current, "inference_due") else True
+        results = None
+        if pose == "recorded" and due:
+            results = session.load_pose(frame.seq)
+            if results is None:
+                # 포즈 기록이 없는 프레임은 "사람 없음"으로 재생 (라이브 추론을 섞지 않음)
+                from utils.pose_results import results_from_arrays
+                results = results_from_arrays(None, None)
+                entry["missing_pose"] = entry.get("missing_pose", 0) + 1
+
+        t0 = time.perf_counter()
+        out = current.process_frame(frame, results) if due else current.process_frame(frame, infer=False)
+        if asyncio.iscoroutine(out):
+            out = await out
+        current.timer.add("frame_total", time.perf_counter() - t0)
+        current.timer.frame_done()
+        if hasattr(current, "last_shape"):
+            entry.setdefault("shapes", []).append(current.last_shape)   # 프레임별 판정 (baseline 비교용)
+
+    _close_entry()
+    return report
+
+
+def _compare(report: dict, baseline: dict) -> None:
+    print("\n=== baseline 비교 ===")
+    for i, (cur, base) in enumerate(zip(report["components"], baseline.get("components", []))):
+        print(f"[{i}] {cur['component']}")
+        if cur.get("missing_pose") or base.get("missing_pose"):
+            print(f"  ⚠️ 포즈 기록 없는 프레임(사람 없음으로 재생): {base.get('missing_pose', 0)} → {cur.get('missing_pose', 0)}")
+        if "final_shape" in cur or "final_shape" in base:
+            same = cur.get("final_shape") == base.get("final_shape")
+            print(f"  final_shape: {base.get('final_shape')} → {cur.get('final_shape')} {'(동일)' if same else '(변경!)'}")
+        cf = [(f["shape"], f["secs_from_first_frame"]) for f in cur.get("stable_fires", [])]
+        bf = [(f["shape"], f["secs_from_first_frame"]) for f in base.get("stable_fires", [])]
+        if cf or bf:
+            print(f"  stable_fires: {bf} → {cf}")
+        for f_cur, f_base in zip(cur.get("stable_fires", []), base.get("stable_fires", [])):
+            diffs = {k: round(v - f_base["measures"].get(k, 0.0), 2) for k, v in f_cur["measures"].items()}
+            print(f"  measures 차이 ({f_cur['shape']}): {diffs}")
+        cs, bs = cur.get("shapes"), base.get("shapes")
+        if cs and bs:
+            n = min(len(cs), len(bs))
+            same = sum(1 for a, b in zip(cs, bs) if a == b)
+            print(f"  프레임별 판정 일치: {same}/{n}")
+        for stage, st in cur.get("stages", {}).items():
+            b = base.get("stages", {}).get(stage)
+            if b:
+                d = st["mean_ms"] - b["mean_ms"]
+                print(f"  {stage:<12} {b['mean_ms']:8.2f}ms → {st['mean_ms']:8.2f}ms ({d:+.2f})")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="녹화 세션 리플레이")
+    ap.add_argument("session")
+    ap.add_argument("--speed", choices=["recorded", "max"], default="max")
+    ap.add_argument("--pose", choices=["recorded", "live"], default="recorded")
+    ap.add_argument("--out", help="보고서 JSON 저장 경로")
+    ap.add_argument("--baseline", help="비교할 이전 보고서 JSON")
+    args = ap.parse_args(argv)
+
+    report = asyncio.run(replay(args.session, speed=args.speed, pose=args.pose))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            _compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+# utils/session.py
+"""
+키오스크 세션 녹화/재생.
+
+녹화: SYLO_RECORD_DIR 환경 변수가 있으면 앱 실행마다 그 아래에 세션 폴더를 만들고
+      원본 프레임(+캡처 시각), 포즈 랜드마크/세그멘테이션 마스크, 라우트 전환을 기록합니다.
+
+    <session>/events.jsonl     이벤트 (한 줄에 하나, 기록 순서)
+    <session>/frames/000001.png  원본 프레임 (무손실)
+    <session>/masks/000001.png   세그멘테이션 마스크 (0~255)
+
+재생: Session(path)로 읽고, ReplaySource로 FrameSource처럼 흘려보내거나
+      utils.replay CLI로 컴포넌트 파이프라인을 그대로 돌립니다.
+"""
+
+import asyncio
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import cv2
+import numpy as np
+
+from utils.camera_service import Frame
+from utils.frame_source import FrameSource
+
+
+class SessionRecorder:
+    def __init__(self, directory, queue_size: int = 64):
+        self.dir = Path(directory)
+        (self.dir / "frames").mkdir(parents=True, exist_ok=True)
+        (self.dir / "masks").mkdir(parents=True, exist_ok=True)
+        self._events = open(self.dir / "events.jsonl", "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._ids: Dict[int, int] = {}   # frame seq → 녹화 id (최근 것만)
+        self._next_id = 0
+        self.dropped = 0
+        # 이미지 저장은 느리므로 별도 스레드에서. 큐가 가득 차면 프레임을 버립니다.
+        self._q: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._writer = threading.Thread(target=self._writer_main, name="session-writer", daemon=True)
+        self._writer.start()
+
+    # ----------------- 기록 API -----------------
+    def frame(self, frame: Frame) -> None:
+        with self._lock:
+            self._next_id += 1
+            rid = self._next_id
+            rel = f"frames/{rid:06d}.png"
+            try:
+                self._q.put_nowait((rel, frame.image))
+            except queue.Full:
+                self.dropped += 1
+                return
+            if len(self._ids) > 256:
+                self._ids.clear()
+            self._ids[frame.seq] = rid
+            self._write({"type": "frame", "id": rid, "seq": frame.seq, "ts": frame.ts, "file": rel})
+
+    def pose(self, seq: int, results) -> None:
+        with self._lock:
+            rid = self._ids.get(seq)
+            if rid is None:
+                return
+            lms = None
+            if results is not None and results.pose_landmarks:
+                lms = [[round(p.x, 6), round(p.y, 6), round(p.z, 6), round(p.visibility, 6)]
+                       for p in results.pose_landmarks.landmark]
+            mask_rel = None
+            mask = getattr(results, "segmentation_mask", None)
+            if mask is not None:
+                mask_rel = f"masks/{rid:06d}.png"
+                m8 = np.clip(mask * 255.0 + 0.5, 0, 255).astype(np.uint8)
+                try:
+                    self._q.put_nowait((mask_rel, m8))
+                except queue.Full:
+                    self.dropped += 1
+                    mask_rel = None
+            self._write({"type": "pose", "id": rid, "landmarks": lms, "mask": mask_rel})
+
+    def route(self, path: str) -> None:
+        with self._lock:
+            self._write({"type": "route", "ts": time.time(), "path": path})
+
+    def mount(self, component: str, **meta) -> None:
+        with self._lock:
+            self._write({"type": "mount", "ts": time.time(), "component": component, **meta})
+
+    def close(self) -> None:
+        self._q.put(None)
+        self._writer.join(timeout=10.0)
+        with self._lock:
+            self._events.close()
+
+    # ----------------- 내부 -----------------
+    def _write(self, event: dict) -> None:
+        self._events.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self._events.flush()
+
+    def _writer_main(self):
+        while True:
+            item = self._q.get()
+            if item is None:
+                return
+            rel, image = item
+            cv2.imwrite(str(self.dir / rel), image, [int(cv2.IMWRITE_PNG_COMPRESSION), 1])
+
+
+_recorder: Optional[SessionRecorder] = None
+_recorder_checked = False
+
+
+def get_recorder() -> Optional[SessionRecorder]:
+    """SYLO_RECORD_DIR 이 설정돼 있을 때만 녹화기를 반환합니다 (없으면 None)."""
+    global _recorder, _recorder_checked
+    if not _recorder_checked:
+        _recorder_checked = True
+        base = os.environ.get("SYLO_RECORD_DIR")
+        if base:
+            _recorder = SessionRecorder(Path(base) / time.strftime("%Y%m%d-%H%M%S"))
+            atexit.register(_recorder.close)
+            print(f"⏺ 세션 녹화: {_recorder.dir}")
+    return _recorder
+
+
+class Session:
+    """녹화된 세션 폴더 읽기."""
+
+    def __init__(self, directory):
+        self.dir = Path(directory)
+        with open(self.dir / "events.jsonl", encoding="utf-8") as f:
+            self.events: List[dict] = [json.loads(line) for line in f if line.strip()]
+        self.poses: Dict[int, dict] = {e["id"]: e for e in self.events if e["type"] == "pose"}
+
+    def frames(self) -> Iterator[dict]:
+        return (e for e in self.events if e["type"] == "frame")
+
+    def load_frame(self, event: dict) -> Optional[Frame]:
+        image = cv2.imread(str(self.dir / event["file"]), cv2.IMREAD_COLOR)
+        if image is None:
+            return None
+        return Frame(image=image, ts=float(event["ts"]), seq=int(event["id"]))
+
+    def load_pose(self, frame_id: int):
+        """녹화된 포즈 결과(PoseResults). 해당 프레임에 포즈 기록이 없으면 None."""
+        from utils.pose_results import results_from_arrays
+        ev = self.poses.get(frame_id)
+        if ev is None:
+            return None
+        lms = np.asarray(ev["landmarks"], dtype=np.float32) if ev["landmarks"] else None
+        mask = None
+        if ev.get("mask"):
+            m8 = cv2.imread(str(self.dir / ev["mask"]), cv2.IMREAD_GRAYSCALE)
+            if m8 is not None:
+                mask = m8.astype(np.float32) / 255.0
+        return results_from_arrays(lms, mask)
+
+
+class ReplaySource(FrameSource):
+    """
+    녹화된 프레임을 FrameSource로 재생합니다.
+    speed="recorded" 면 녹화 당시 간격대로, "max" 면 기다리지 않고 내보냅니다.
+    프레임 ts는 녹화 당시 캡처 시각 그대로입니다 (안정화 타이머가 녹화와 동일하게 동작).
+    """
+
+    def __init__(self, directory, speed: str = "recorded", loop: bool = False):
+        self.session = Session(directory)
+        self.speed = speed
+        self.loop = loop
+        self.finished = False
+        self._events = list(self.session.frames())
+        self._pos = 0
+        self._wall0 = 0.0
+        self._ts0 = 0.0
+
+    async def start(self, owner, consumer: str = "preview", min_size=None) -> bool:
+        self._pos = 0
+        self.finished = False
+        return bool(self._events)
+
+    def stop(self, owner) -> None:
+        pass
+
+    async def next_frame(self, after_seq: int = 0, timeout: float = 1.0) -> Optional[Frame]:
+        if self._pos >= len(self._events):
+            if not self.loop or not self._events:
+                self.finished = True
+                return None
+            self._pos = 0
+        ev = self._events[self._pos]
+        self._pos += 1
+        if self.speed != "max":
+            if self._pos == 1:
+                self._wall0, self._ts0 = time.time(), float(ev["ts"])
+            delay = (float(ev["ts"]) - self._ts0) - (time.time() - self._wall0)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        return await asyncio.to_thread(self.session.load_frame, ev)
@@ -0,0 +1,167 @@
+# utils/threshold_sweep.py
+"""
+classify.THRESH 격자 탐색.
+
+라벨이 있는 측정값(batch_measure JSONL, 또는 S/H/W/A·shoulder/pelvis/waist/abdomen 열이 있는 CSV/JSONL)을
+읽어, 지정한 임계값 조합마다 classify_body_shape_array 로 전체를 한 번에 분류하고
+혼동 행렬(행: 정답, 열: 판정)과 정확도를 냅니다. 지정하지 않은 키는 현재 THRESH 값을 씁니다.
+from_mask 가 거짓인 행(마스크 없이 허리/복부를 어깨/골반 비율로 추정한 값)은 기본으로 제외하고
+건수만 따로 보고합니다 (--include-estimated 로 포함).
+
+    cd src
+    python -m utils.threshold_sweep results.jsonl \\
+        --grid O_ABDOMEN=1.04:1.16:0.02 --grid INV_TRIANGLE=1.08,1.12,1.16 \\
+        [--gender female] [--top 5] [--out sweep.jsonl] [--include-estimated]
+
+--grid KEY=a:b:step (a~b, 끝 포함) 또는 KEY=v1,v2,...
+--out 에는 조합마다 {"thresh": {...}, "accuracy": .., "confusion": [[..]]} 한 줄씩 기록합니다.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from utils.classify import SHAPES, THRESH, classify_body_shape_array
+
+_COLUMNS = {"S": ("S", "shoulder"), "H": ("H", "pelvis"), "W": ("W", "waist"), "A": ("A", "abdomen")}
+
+
+def _estimated(row: dict) -> bool:
+    """from_mask 가 명시적으로 거짓인 행 (JSONL: false, CSV: 0/False). 열이 없으면 측정값으로 봄."""
+    v = row.get("from_mask")
+    if v is None or v == "":
+        return False
+    return str(v).strip().lower() in ("0", "false")
+
+
+def load_measures(path: str, default_gender: str = "male",
+                  include_estimated: bool = False) -> Tuple[Dict[str, np.ndarray], int]:
+    """
+    라벨과 S/H/W/A 가 모두 있는 행만 배열로. gender 열이 없으면 default_gender.
+    label 은 SHAPES 인덱스(int8)로 한 번만 바꿔 둡니다 (조합마다 문자열 변환 없음).
+    (배열, 추정값 행 수). include_estimated=False 면 추정값 행은 배열에서 빠집니다.
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+    else:
+        rows = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    continue   # 끊긴 줄
+
+    out = {k: [] for k in ("S", "H", "W", "A", "label", "gender")}
+    estimated = 0
+    for row in rows:
+        label = (row.get("label") or "").upper()
+        if label not in SHAPES:
+            continue
+        try:
+            vals = {k: float(next(row[c] for c in cols if row.get(c) not in (None, ""))) for k, cols in _COLUMNS.items()}
+        except (StopIteration, ValueError):
+            continue   # 측정 실패 행
+        if _estimated(row):
+            estimated += 1
+            if not include_estimated:
+                continue
+        for k, v in vals.items():
+            out[k].append(v)
+        out["label"].append(SHAPES.index(label))
+        out["gender"].append(row.get("gender") or default_gender)
+    data = {k: np.asarray(v) for k, v in out.items()}
+    data["label"] = data["label"].astype(np.int8)
+    return data, estimated
+
+
+def parse_grid(specs: List[str]) -> Dict[str, List[float]]:
+    grid = {}
+    for spec in specs:
+        key, _, values = spec.partition("=")
+        key = key.strip().upper()
+        if key not in THRESH:
+            raise SystemExit(f"알 수 없는 임계값: {key} (가능: {', '.join(THRESH)})")
+        if ":" in values:
+            a, b, step = (float(v) for v in values.split(":"))
+            grid[key] = [round(float(v), 6) for v in np.arange(a, b + step / 2.0, step)]
+        else:
+            grid[key] = [float(v) for v in values.split(",") if v.strip()]
+    return grid
+
+
+def confusion(labels: np.ndarray, preds: np.ndarray) -> np.ndarray:
+    """labels/preds 는 SHAPES 인덱스 배열. (len(SHAPES), len(SHAPES)) 행: 정답, 열: 판정."""
+    k = len(SHAPES)
+    return np.bincount(labels.astype(np.intp) * k + preds, minlength=k * k).reshape(k, k)
+
+
+def sweep(data: Dict[str, np.ndarray], grid: Dict[str, List[float]]) -> List[dict]:
+    """조합마다 {"thresh", "accuracy", "confusion"}. 정확도 내림차순."""
+    keys = list(grid)
+    results = []
+    for combo in itertools.product(*(grid[k] for k in keys)):
+        thresh = dict(THRESH)
+        thresh.update(zip(keys, combo))
+        preds = classify_body_shape_array(data["gender"], data["S"], data["H"], data["W"], data["A"], thresh=thresh)
+        cm = confusion(data["label"], preds)
+        results.append({
+            "thresh": {k: thresh[k] for k in keys},
+            "accuracy": round(float(np.trace(cm)) / max(1, int(cm.sum())), 4),
+            "confusion": cm.tolist(),
+        })
+    results.sort(key=lambda r: r["accuracy"], reverse=True)
+    return results
+
+
+def format_confusion(cm) -> str:
+    cm = np.asarray(cm)
+    used = [i for i in range(len(SHAPES)) if cm[i].sum() or cm[:, i].sum()]
+    head = "정답\\판정 " + "".join(f"{SHAPES[j]:>8}" for j in used)
+    lines = [head] + [f"{SHAPES[i]:<9}" + "".join(f"{cm[i, j]:>8}" for j in used) for i in used]
+    return "\n".join("    " + line for line in lines)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="classify.THRESH 격자 탐색 (혼동 행렬)")
+    ap.add_argument("data", help="라벨 있는 측정값 JSONL/CSV (batch_measure 결과 등)")
+    ap.add_argument("--grid", action="append", default=[], help="KEY=a:b:step 또는 KEY=v1,v2 (여러 번)")
+    ap.add_argument("--gender", choices=["male", "female"], default="male", help="gender 열이 없을 때")
+    ap.add_argument("--top", type=int, default=5, help="혼동 행렬을 출력할 상위 조합 수")
+    ap.add_argument("--out", help="조합별 결과 JSONL")
+    ap.add_argument("--include-estimated", action="store_true",
+                    help="from_mask 가 거짓인(허리/복부 추정값) 행도 포함")
+    args = ap.parse_args(argv)
+
+    data, estimated = load_measures(args.data, args.gender, include_estimated=args.include_estimated)
+    n = int(data["label"].size)
+    if estimated:
+        how = "포함" if args.include_estimated else "제외 (--include-estimated 로 포함)"
+        print(f"⚠️ 허리/복부 추정값(from_mask=false) 행 {estimated}건 {how}")
+    if n == 0:
+        raise SystemExit("라벨과 측정값이 모두 있는 행이 없습니다")
+    grid = parse_grid(args.grid)
+    combos = int(np.prod([len(v) for v in grid.values()])) if grid else 1
+    print(f"📊 라벨 있는 측정 {n}건, 조합 {combos}개")
+
+    base = sweep(data, {})[0]
+    results = sweep(data, grid)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for r in results:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+
+    print(f"\n현재 THRESH: 정확도 {base['accuracy']:.4f}")
+    print(format_confusion(base["confusion"]))
+    for rank, r in enumerate(results[:args.top], 1):
+        print(f"\n#{rank} 정확도 {r['accuracy']:.4f}  {r['thresh']}")
+        print(format_confusion(r["confusion"]))
+
+
+if __name__ == "__main__":
+    main()
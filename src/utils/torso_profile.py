@@ -0,0 +1,212 @@
+# utils/torso_profile.py
+"""
+몸통 가로 폭 프로파일 (허리 최소 / 복부 최대 측정).
+
+이진 마스크에서 샘플 행마다 (행 ±pad 범위를 OR 한 뒤) 가장 긴 연속 구간의 폭과 양 끝을 구합니다.
+행마다 파이썬 루프를 돌지 않고, 세로 OR 은 cv2.dilate 한 번, 연속 구간은 2D diff 한 번으로
+모든 샘플 행을 같이 계산합니다. 결과(RowProfile)에서 허리/복부는 배열 최소/최대로 고릅니다.
+
+    rows = np.union1d(band_rows(h, yW_top, yW_bot, 3), band_rows(h, yA_top, yA_bot, 3))
+    prof = RowProfile.measure(binmask, rows, pad=2)
+    w_min, x0, x1, y = prof.narrowest(yW_top, yW_bot, 3)
+    w_max, x0, x1, y = prof.widest(yA_top, yA_bot, 3)
+
+기존 행 루프(reference_profile_min_max)와 결과가 같습니다 (폭이 같으면 위쪽 행, 왼쪽 구간 우선).
+
+    cd src
+    python -m utils.torso_profile [--sizes 120x200,360x720] [--repeats 200]
+"""
+
+import argparse
+import time
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+Measure = Tuple[int, int, int, int]   # (폭, x0, x1, y)
+
+
+def band_rows(h: int, y_top: int, y_bottom: int, y_step: int = 4) -> np.ndarray:
+    """[y_top, y_bottom] 을 이미지 안으로 자르고 (뒤집혀 있으면 바꿔) y_step 간격 샘플 행."""
+    y_top = max(0, min(h - 1, int(y_top)))
+    y_bottom = max(0, min(h - 1, int(y_bottom)))
+    if y_top > y_bottom:
+        y_top, y_bottom = y_bottom, y_top
+    return np.arange(y_top, y_bottom + 1, max(1, int(y_step)))
+
+
+class RowProfile:
+    def __init__(self, ys: np.ndarray, widths: np.ndarray, x0: np.ndarray, x1: np.ndarray, h: int):
+        self.ys = ys
+        self.widths = widths
+        self.x0 = x0
+        self.x1 = x1
+        self.h = h
+
+    @classmethod
+    def measure(cls, binary_mask: np.ndarray, ys: np.ndarray, pad: int = 2) -> "RowProfile":
+        """ys(오름차순 행 번호)마다 가장 긴 연속 구간의 (폭, 시작, 끝)."""
+        h, w = binary_mask.shape[:2]
+        ys = np.asarray(ys, dtype=np.intp)
+        n = ys.size
+        widths = np.zeros(n, dtype=np.int32)
+        x0 = np.zeros(n, dtype=np.int32)
+        x1 = np.zeros(n, dtype=np.int32)
+        if n == 0 or w == 0:
+            return cls(ys, widths, x0, x1, h)
+
+        # 세로 ±pad OR: 필요한 행 범위만 잘라 세로 커널로 팽창 (범위 밖은 보지 않음 = 이미지 경계 처리와 같음)
+        lo, hi = max(0, int(ys[0]) - pad), min(h - 1, int(ys[-1]) + pad)
+        band = np.ascontiguousarray(binary_mask[lo:hi + 1])
+        if pad > 0:
+            band = cv2.dilate(band, np.ones((2 * pad + 1, 1), np.uint8),
+                              borderType=cv2.BORDER_CONSTANT, borderValue=0)
+        rows = band[ys - lo] > 0                                  # (n, w) bool
+
+        # 행마다 연속 구간: 양쪽에 0을 붙여 diff → 시작(+1) / 끝 다음 칸(-1). 행 우선 순서로 짝이 맞음
+        edges = np.diff(np.pad(rows, ((0, 0), (1, 1))).view(np.int8), axis=1)
+        r, starts = np.nonzero(edges == 1)
+        _, ends = np.nonzero(edges == -1)
+        if r.size == 0:
+            return cls(ys, widths, x0, x1, h)
+        lens = ends - starts
+        best = np.zeros(n, dtype=lens.dtype)
+        np.maximum.at(best, r, lens)
+        cand = np.flatnonzero(lens == best[r])
+        r_best, first = np.unique(r[cand], return_index=True)   # 같은 폭이면 왼쪽 구간
+        k = cand[first]
+
+        # 기존 구현과 같이 켜진 픽셀이 2개 미만인 행은 폭 0
+        ok = np.count_nonzero(rows, axis=1)[r_best] >= 2
+        r_best, k = r_best[ok], k[ok]
+        widths[r_best] = lens[k]
+        x0[r_best] = starts[k]
+        x1[r_best] = ends[k] - 1
+        return cls(ys, widths, x0, x1, h)
+
+    def _select(self, y_top: int, y_bottom: int, y_step: int) -> np.ndarray:
+        rows = band_rows(self.h, y_top, y_bottom, y_step)
+        if self.ys.size == 0:
+            return np.zeros(0, dtype=np.intp)
+        idx = np.minimum(np.searchsorted(self.ys, rows), self.ys.size - 1)
+        return idx[self.ys[idx] == rows]
+
+    def _pick(self, idx: np.ndarray, i) -> Measure:
+        j = idx[i]
+        return int(self.widths[j]), int(self.x0[j]), int(self.x1[j]), int(self.ys[j])
+
+    def narrowest(self, y_top: int, y_bottom: int, y_step: int = 4) -> Measure:
+        """구간에서 폭이 0보다 큰 가장 좁은 행. 없으면 (0, 0, 0, 구간 위쪽 행)."""
+        idx = self._select(y_top, y_bottom, y_step)
+        w = self.widths[idx]
+        if not np.any(w > 0):
+            return 0, 0, 0, int(band_rows(self.h, y_top, y_bottom, y_step)[0])
+        return self._pick(idx, np.argmin(np.where(w > 0, w, np.iinfo(w.dtype).max)))
+
+    def widest(self, y_top: int, y_bottom: int, y_step: int = 4) -> Measure:
+        """구간에서 가장 넓은 행. 없으면 (0, 0, 0, 구간 위쪽 행)."""
+        idx = self._select(y_top, y_bottom, y_step)
+        w = self.widths[idx]
+        if not np.any(w > 0):
+            return 0, 0, 0, int(band_rows(self.h, y_top, y_bottom, y_step)[0])
+        return self._pick(idx, np.argmax(w))
+
+
+def profile_min_max(binary_mask: np.ndarray, y_top: int, y_bottom: int, y_step: int = 4, pad: int = 2) -> Tuple[Measure, Measure]:
+    """한 구간의 (가장 좁은 행, 가장 넓은 행). 각각 (폭, x0, x1, y)."""
+    h = binary_mask.shape[0]
+    prof = RowProfile.measure(binary_mask, band_rows(h, y_top, y_bottom, y_step), pad=pad)
+    return prof.narrowest(y_top, y_bottom, y_step), prof.widest(y_top, y_bottom, y_step)
+
+
+# ----------------- 기존 행 루프 (벤치마크/검증 기준) -----------------
+def _largest_run_width(row_binary):
+    xs = np.where(row_binary)[0]
+    if xs.size < 2:
+        return 0, 0, 0
+    splits = np.where(np.diff(xs) > 1)[0]
+    starts = np.r_[xs[0], xs[splits + 1]]
+    ends = np.r_[xs[splits], xs[-1]]
+    lens = ends - starts + 1
+    k = np.argmax(lens)
+    return int(lens[k]), int(starts[k]), int(ends[k])
+
+
+def reference_profile_min_max(binary_mask, y_top, y_bottom, y_step=4, pad=2) -> Tuple[Measure, Measure]:
+    h, _ = binary_mask.shape
+    y_top = max(0, min(h - 1, int(y_top)))
+    y_bottom = max(0, min(h - 1, int(y_bottom)))
+    if y_top > y_bottom:
+        y_top, y_bottom = y_bottom, y_top
+    min_w = 10**9; min_pos = (0, 0, 0, y_top)
+    max_w = 0;     max_pos = (0, 0, 0, y_top)
+    for y in range(y_top, y_bottom + 1, y_step):
+        y0, y1 = max(0, y - pad), min(h - 1, y + pad)
+        col_any = np.max(binary_mask[y0:y1 + 1, :], axis=0) > 0
+        w, x0, x1 = _largest_run_width(col_any)
+        if w > 0 and w < min_w:
+            min_w, min_pos = w, (w, x0, x1, y)
+        if w > max_w:
+            max_w, max_pos = w, (w, x0, x1, y)
+    return min_pos, max_pos
+
+
+def _test_mask(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """몸통 실루엣 + 팔 + 잡티가 있는 테스트 마스크 (0/255)."""
+    rng = np.random.default_rng(seed)
+    m = np.zeros((height, width), dtype=np.uint8)
+    cx = width // 2
+    ys = np.arange(height)
+    half = (0.28 - 0.06 * np.sin(np.pi * ys / height)) * width   # 허리가 잘록한 몸통
+    for y in range(height):
+        m[y, max(0, int(cx - half[y])):min(width, int(cx + half[y]))] = 255
+    arm = max(2, width // 20)
+    m[:, max(0, cx - int(0.4 * width)):max(0, cx - int(0.4 * width)) + arm] = 255
+    m[:, min(width - 1, cx + int(0.4 * width)):min(width, cx + int(0.4 * width) + arm)] = 255
+    for _ in range(max(4, width * height // 4000)):   # 구멍/잡티
+        x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+        cv2.circle(m, (x, y), int(rng.integers(1, 4)), int(rng.choice([0, 255])), -1)
+    return m
+
+
+def benchmark(sizes: List[Tuple[int, int]], repeats: int = 200, y_step: int = 3, pad: int = 2):
+    """크기별 (기존 ms, 벡터화 ms, 결과 일치 여부). 측정 구간은 높이의 50%~84% (허리+복부 두 번)."""
+    rows = []
+    for w, h in sizes:
+        m = _test_mask(w, h)
+        bands = [(int(0.50 * h), int(0.72 * h)), (int(0.58 * h), int(0.84 * h))]
+
+        def old():
+            return [reference_profile_min_max(m, a, b, y_step, pad) for a, b in bands]
+
+        def new():
+            ys = np.union1d(band_rows(h, *bands[0], y_step), band_rows(h, *bands[1], y_step))
+            prof = RowProfile.measure(m, ys, pad=pad)
+            return [(prof.narrowest(a, b, y_step), prof.widest(a, b, y_step)) for a, b in bands]
+
+        same = old() == new()
+        times = []
+        for fn in (old, new):
+            t0 = time.perf_counter()
+            for _ in range(repeats):
+                fn()
+            times.append((time.perf_counter() - t0) / repeats * 1000.0)
+        rows.append(((w, h), times[0], times[1], same))
+    return rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="몸통 폭 프로파일 벤치마크 (기존 행 루프 대비)")
+    ap.add_argument("--sizes", default="120x200,240x400,360x720,640x720", help="ROI 마스크 크기 WxH 목록")
+    ap.add_argument("--repeats", type=int, default=200)
+    args = ap.parse_args(argv)
+    sizes = [tuple(int(v) for v in s.lower().split("x")) for s in args.sizes.split(",")]
+    print(f"허리(50~72%) + 복부(58~84%), y_step 3, pad 2, repeats {args.repeats}")
+    for (w, h), old_ms, new_ms, same in benchmark(sizes, args.repeats):
+        print(f"  {w:>4}x{h:<4} 루프 {old_ms:7.3f}ms  벡터화 {new_ms:7.3f}ms  x{old_ms / max(new_ms, 1e-6):5.1f}  "
+              f"{'결과 동일' if same else '결과 다름!'}")
+
+
+if __name__ == "__main__":
+    main()